@@ -0,0 +1,55 @@
+"""
+Benchmark do enriquecimento por CEP: IndiceCEP (searchsorted) x pandas (merge_asof + checagem da faixa).
+
+    python benchmarks/bench_cep.py --total 100000000 --lote 10000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "notebooks"))
+
+from src.cep import COLUNA_FIM, COLUNA_INICIO, IndiceCEP, cep_para_int  # noqa: E402
+
+
+def via_pandas(depara: pd.DataFrame, lote: pd.DataFrame) -> pd.DataFrame:
+    faixas = depara.assign(_ini=cep_para_int(depara[COLUNA_INICIO]), _fim=cep_para_int(depara[COLUNA_FIM]))
+    faixas = faixas.sort_values("_ini")
+    ordenado = lote.assign(_cep=cep_para_int(lote["cep"])).sort_values("_cep")
+    out = pd.merge_asof(ordenado, faixas, left_on="_cep", right_on="_ini", direction="backward")
+    return out[out["_cep"] <= out["_fim"]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depara", default=str(RAIZ / "datasets" / "DEPARA_CEP.parquet"))
+    parser.add_argument("--total", type=int, default=100_000_000)
+    parser.add_argument("--lote", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    depara = pd.read_parquet(args.depara)
+    indice = IndiceCEP.do_depara(depara)
+    rng = np.random.default_rng(42)
+
+    tempos = {"IndiceCEP": 0.0, "pandas": 0.0}
+    feitos = 0
+    while feitos < args.total:
+        n = min(args.lote, args.total - feitos)
+        ceps = rng.integers(1_000_000, 99_999_999, size=n)
+        lote = pd.DataFrame({"cep": pd.Series(ceps).map("{:08d}".format)})
+
+        t = time.perf_counter(); indice.enriquecer(lote, "cep"); tempos["IndiceCEP"] += time.perf_counter() - t
+        t = time.perf_counter(); via_pandas(depara, lote); tempos["pandas"] += time.perf_counter() - t
+        feitos += n
+
+    for nome, segundos in tempos.items():
+        print(f"{nome:>10}: {segundos:8.2f}s  ({args.total / segundos / 1e6:6.1f} M lookups/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark do esquema estrela: EsquemaEstrela (indexação direta + bincount) x `pd.merge` encadeado,
+receita por marca/loja/mês sobre order_items replicado N vezes.
+
+    python benchmarks/bench_estrela.py --escala 100
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "notebooks"))
+
+from src.estrela import EsquemaEstrela  # noqa: E402
+
+
+def via_merge(tabelas: dict[str, pd.DataFrame], fatos: pd.DataFrame) -> pd.DataFrame:
+    df = (fatos.merge(tabelas["orders"], on="order_id")
+          .merge(tabelas["products"].drop(columns="list_price"), on="product_id")
+          .merge(tabelas["brands"], on="brand_id")
+          .merge(tabelas["stores"][["store_id", "store_name"]], on="store_id"))
+    df["receita"] = df["list_price"] * df["quantity"] * (1 - df["discount"])
+    df["mes"] = pd.to_datetime(df["order_date"]).dt.strftime("%Y-%m")
+    return df.groupby(["brand_name", "store_name", "mes"], observed=True)["receita"].sum().reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pasta", default=str(RAIZ / "datasets"))
+    parser.add_argument("--escala", type=int, default=100)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    nomes = ["orders", "order_items", "products", "brands", "categories", "stores", "staffs", "customers"]
+    tabelas = {n: pd.read_csv(Path(args.pasta) / f"{n}.csv") for n in nomes}
+    fatos = pd.concat([tabelas.pop("order_items")] * args.escala, ignore_index=True)
+    print(f"fato: {len(fatos):,} linhas")
+
+    t = time.perf_counter(); esquema = EsquemaEstrela(fatos, tabelas); carga = time.perf_counter() - t
+    tempos = {"EsquemaEstrela": [], "pd.merge": []}
+    for _ in range(args.repeticoes):
+        esquema._cache.clear()  # mede a resolução das chaves, não só o cache
+        t = time.perf_counter(); rapido = esquema.agregar(["brand_name", "store_name", "mes"], ["receita"])
+        tempos["EsquemaEstrela"].append(time.perf_counter() - t)
+        t = time.perf_counter(); lento = via_merge(tabelas, fatos); tempos["pd.merge"].append(time.perf_counter() - t)
+
+    esperado = lento.set_index(["brand_name", "store_name", "mes"])["receita"].sort_index()
+    obtido = rapido.astype({c: str for c in ["brand_name", "store_name", "mes"]}) \
+        .set_index(["brand_name", "store_name", "mes"])["receita"].sort_index()
+    assert np.allclose(obtido.to_numpy(), esperado.to_numpy()), "resultados divergentes"
+
+    print(f"carga das dimensões: {carga:.3f}s")
+    for nome, ts in tempos.items():
+        print(f"{nome:>15}: {min(ts):8.3f}s  ({len(fatos) / min(ts) / 1e6:6.1f} M linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
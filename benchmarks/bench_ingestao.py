@@ -0,0 +1,78 @@
+"""
+Leitura completa (pickle / xlsx) x dataset colunar com projeção e pushdown de filtros.
+
+    python benchmarks/bench_ingestao.py --linhas 5000000
+    python benchmarks/bench_ingestao.py --xlsx datasets/insurance-rural.xlsx
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "notebooks"))
+
+from src.ingestao import converter_dataframe, converter_excel, converter_pickle, ler_colunar  # noqa: E402
+
+ESTADOS = ["SP", "RJ", "MG", "BA", "PR", "RS", "PE", "CE", "PA", "SC"]
+
+
+def cronometrar(nome: str, funcao, repeticoes: int = 3):
+    tempos = []
+    for _ in range(repeticoes):
+        t = time.perf_counter(); resultado = funcao(); tempos.append(time.perf_counter() - t)
+    print(f"{nome:>40}: {min(tempos):8.3f}s  ({len(resultado):,} linhas)")
+
+
+def snapshot_sintetico(linhas: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        "regiao": rng.choice(["Norte", "Nordeste", "Sudeste", "Sul", "Centro-Oeste"], linhas),
+        "estado": rng.choice(ESTADOS, linhas),
+        "data": pd.Timestamp("2020-03-01") + pd.to_timedelta(rng.integers(0, 900, linhas), unit="D"),
+        "casosAcumulado": rng.integers(0, 1_000_000, linhas),
+        "obitosAcumulado": rng.integers(0, 50_000, linhas),
+        "populacaoTCU2019": rng.integers(1_000, 12_000_000, linhas),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=5_000_000)
+    parser.add_argument("--xlsx", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        if args.xlsx:
+            t = time.perf_counter(); converter_excel(args.xlsx, str(pasta / "xlsx"))
+            print(f"conversão xlsx: {time.perf_counter() - t:.2f}s")
+            destino = next((pasta / "xlsx").iterdir())
+            cronometrar("pd.read_excel (completo)", lambda: pd.read_excel(args.xlsx))
+            cronometrar("ler_colunar (completo)", lambda: ler_colunar(str(destino)))
+            return
+
+        df = snapshot_sintetico(args.linhas)
+        df.to_pickle(pasta / "snapshot.pkl")
+        t = time.perf_counter()
+        converter_pickle(str(pasta / "snapshot.pkl"), str(pasta / "parquet"), particionar_por=["regiao"], ordenar_por=["data"])
+        print(f"conversão pickle -> parquet: {time.perf_counter() - t:.2f}s")
+        converter_dataframe(df, str(pasta / "feather"), particionar_por=["regiao"], ordenar_por=["data"], formato="feather")
+
+        filtros = [("regiao", "==", "Sudeste"), ("data", ">=", pd.Timestamp("2022-01-01"))]
+        colunas = ["estado", "data", "casosAcumulado"]
+        cronometrar("pd.read_pickle (completo)", lambda: pd.read_pickle(pasta / "snapshot.pkl"))
+        cronometrar("pickle + filtro em memória", lambda: (lambda d: d.loc[(d["regiao"] == "Sudeste")
+                                                                            & (d["data"] >= "2022-01-01"), colunas])
+                    (pd.read_pickle(pasta / "snapshot.pkl")))
+        cronometrar("parquet (completo)", lambda: ler_colunar(str(pasta / "parquet")))
+        cronometrar("parquet (projeção + pushdown)", lambda: ler_colunar(str(pasta / "parquet"), colunas, filtros))
+        cronometrar("feather (projeção + pushdown)", lambda: ler_colunar(str(pasta / "feather"), colunas, filtros))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Vazão do DetectorOutliers em eventos/segundo, pontuando e atualizando micro-lotes sintéticos
+com a distribuição de datasets/transactions.csv (ou direto do CSV com --csv).
+
+    python benchmarks/bench_outliers.py --eventos 10000000 --lote 100000 --contas 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "notebooks"))
+
+from src.outliers import COLUNAS_FRAUDE, DetectorOutliers  # noqa: E402
+
+
+def lotes_sinteticos(base: pd.DataFrame, eventos: int, tamanho: int, contas: int, rng):
+    for inicio in range(0, eventos, tamanho):
+        n = min(tamanho, eventos - inicio)
+        lote = base.iloc[rng.integers(0, len(base), size=n)].reset_index(drop=True)
+        lote["AccountID"] = rng.integers(0, contas, size=n)
+        yield lote
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=str(RAIZ / "datasets" / "transactions.csv"))
+    parser.add_argument("--eventos", type=int, default=10_000_000)
+    parser.add_argument("--lote", type=int, default=100_000)
+    parser.add_argument("--contas", type=int, default=100_000)
+    args = parser.parse_args()
+
+    base = pd.read_csv(args.csv, usecols=COLUNAS_FRAUDE)
+    detector = DetectorOutliers()
+    rng = np.random.default_rng(42)
+    outliers = 0
+    inicio = time.perf_counter()
+    for lote in lotes_sinteticos(base, args.eventos, args.lote, args.contas, rng):
+        outliers += int(detector.pontuar(lote)["outlier"].sum())
+    segundos = time.perf_counter() - inicio
+
+    print(f"eventos: {args.eventos:,}  lote: {args.lote:,}  contas: {args.contas:,}")
+    print(f"tempo: {segundos:.2f}s  ({args.eventos / segundos:,.0f} eventos/s)  outliers: {outliers:,}")
+    print(f"estado por conta: {sum(h.nbytes for h in detector.contas.values()) / 1e6:.1f} MB")
+    print(detector.resumo())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Fluxo do notebook 08 (CSV -> contrato de entrada -> processar -> Parquet) sequencial x em estágios.
+
+    python benchmarks/bench_pipeline.py --linhas 20000000 --lote 1000000 --processos 4
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "notebooks"))
+
+from src import contrato  # noqa: E402
+from src.pipeline_estagios import pipeline_csv  # noqa: E402
+from src.processamento import processar  # noqa: E402
+
+
+def sequencial(caminho: str, pasta: Path, lote: int) -> int:
+    pasta.mkdir(exist_ok=True)
+    for i, df in enumerate(pd.read_csv(caminho, chunksize=lote)):
+        processar(contrato.schema_entrada.validate(df, lazy=True)).to_parquet(pasta / f"parte-{i:05d}.parquet", index=False)
+    return i + 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=10_000_000)
+    parser.add_argument("--lote", type=int, default=1_000_000)
+    parser.add_argument("--processos", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        rng = np.random.default_rng(42)
+        csv = pasta / "entrada.csv"
+        pd.DataFrame({"val1": rng.normal(100, 15, args.linhas),
+                      "val2": rng.integers(0, 100, args.linhas).astype("float64")}).to_csv(csv, index=False)
+
+        t = time.perf_counter(); lotes = sequencial(str(csv), pasta / "seq", args.lote)
+        tempo_seq = time.perf_counter() - t
+        print(f"{'sequencial':>12}: {tempo_seq:8.2f}s  ({lotes} lotes)")
+
+        t = time.perf_counter()
+        arquivos, relatorio = pipeline_csv(str(csv), str(pasta / "estagios"), args.lote, processos=args.processos)
+        tempo_est = time.perf_counter() - t
+        print(f"{'estágios':>12}: {tempo_est:8.2f}s  ({len(arquivos)} lotes, {tempo_seq / tempo_est:.2f}x)")
+        for l in relatorio:
+            print(f"  {l['estagio']:>10}: utilização {l['utilizacao'] or 0:6.1%}  ocupado {l['ocupado_s']:7.2f}s  "
+                  f"espera entrada {l['espera_entrada_s']:7.2f}s  saída {l['espera_saida_s']:7.2f}s"
+                  f"{'  <- gargalo' if l['gargalo'] else ''}")
+        soma = sum(l["ocupado_s"] / l["trabalhadores"] for l in relatorio)
+        print(f"soma dos estágios: {soma:.2f}s; estágio mais lento: "
+              f"{max(l['ocupado_s'] / l['trabalhadores'] for l in relatorio):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
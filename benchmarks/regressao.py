@@ -0,0 +1,54 @@
+"""
+Comparação de resultados da suíte de benchmarks com um baseline JSON (só biblioteca padrão).
+
+Formato dos resultados: {"ambiente": {...}, "casos": {caso: {tamanho: {"min_s", "mediana_s", "repeticoes"}}}}
+"""
+import json
+
+
+def carregar(caminho: str) -> dict:
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def salvar(resultados: dict, caminho: str) -> None:
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def comparar(atual: dict, baseline: dict, limite: float = 0.10, metrica: str = "min_s") -> list[dict]:
+    """
+    Uma linha por (caso, tamanho) do resultado atual. `variacao` = atual/baseline - 1;
+    acima de `limite` é regressão, abaixo de -limite é melhora.
+    """
+    linhas = []
+    for caso, tamanhos in sorted(atual["casos"].items()):
+        for tamanho, medida in sorted(tamanhos.items(), key=lambda t: float(t[0])):
+            base = baseline.get("casos", {}).get(caso, {}).get(tamanho)
+            linha = {"caso": caso, "tamanho": tamanho, "atual_s": medida.get(metrica),
+                     "baseline_s": base.get(metrica) if base else None, "variacao": None}
+            if medida.get("pulado"):
+                linha["status"] = "pulado"
+            elif not base or not base.get(metrica):
+                linha["status"] = "novo"
+            else:
+                linha["variacao"] = medida[metrica] / base[metrica] - 1
+                linha["status"] = ("regressao" if linha["variacao"] > limite
+                                   else "melhora" if linha["variacao"] < -limite else "ok")
+            linhas.append(linha)
+    return linhas
+
+
+def relatorio_markdown(linhas: list[dict], limite: float) -> str:
+    def seg(v):
+        return "-" if v is None else f"{v:.4f}"
+
+    saida = [f"| caso | tamanho | baseline (s) | atual (s) | variação | status (limite {limite:.0%}) |",
+             "|---|---:|---:|---:|---:|---|"]
+    for l in linhas:
+        variacao = "-" if l["variacao"] is None else f"{l['variacao']:+.1%}"
+        saida.append(f"| {l['caso']} | {l['tamanho']} | {seg(l['baseline_s'])} | {seg(l['atual_s'])} | {variacao} | {l['status']} |")
+    regressoes = sum(l["status"] == "regressao" for l in linhas)
+    saida.append("")
+    saida.append(f"**{regressoes} regressão(ões)** em {len(linhas)} medições.")
+    return "\n".join(saida)
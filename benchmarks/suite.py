@@ -0,0 +1,172 @@
+"""
+Suíte de benchmarks de src/ e dos geradores de descritivos, com baseline JSON e gate de regressão.
+
+    python benchmarks/suite.py --tamanhos 1e4 1e6 1e7 --saida benchmarks/resultados/atual.json
+    python benchmarks/suite.py --tamanhos 1e4 1e6 --salvar-baseline benchmarks/baselines/baseline.json
+    python benchmarks/suite.py --comparar benchmarks/baselines/baseline.json --limite 0.10   # sai com 1 se regredir
+    python benchmarks/suite.py --casos processar visualizacao   # filtra por prefixo
+"""
+import argparse
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "notebooks"))
+sys.path.insert(0, str(RAIZ / "benchmarks"))
+
+import regressao  # noqa: E402
+
+CASOS: dict[str, tuple] = {}
+CAMPOS_GERADORES = 10_000
+PASTA_TEMP = tempfile.TemporaryDirectory(prefix="bench_")
+
+
+def caso(nome: str, escala: bool = True):
+    """Registra preparar(n) -> função a cronometrar. Casos sem escala rodam uma vez, no tamanho fixo."""
+    def registrar(preparar):
+        CASOS[nome] = (preparar, escala)
+        return preparar
+    return registrar
+
+
+def _df_valores(n: int, zeros: bool = True) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    val2 = rng.integers(0 if zeros else 1, 100, n).astype("float64")
+    return pd.DataFrame({"val1": rng.normal(100, 15, n), "val2": val2})
+
+
+for _modo in ("nan", "inf", "raise"):
+    @caso(f"processar[{_modo}]")
+    def _preparar_processar(n, modo=_modo):
+        from src.processamento import processar
+
+        df = _df_valores(n, zeros=modo != "raise")
+        return lambda: processar(df, ao_dividir_zero=modo)
+
+
+@caso("processar_validado")
+def _preparar_processar_validado(n):
+    from src.processamento_validado import processar_validado
+
+    df = _df_valores(n)
+    return lambda: processar_validado(df)
+
+
+for _grafico in ("histograma", "series", "boxplot"):
+    @caso(f"visualizacao.{_grafico}")
+    def _preparar_grafico(n, grafico=_grafico):
+        from src.visualizacao import plot_boxplot, plot_histograma, plot_series
+
+        df = _df_valores(n)
+        png = os.path.join(PASTA_TEMP.name, f"{grafico}.png")
+        if grafico == "boxplot":
+            return lambda: plot_boxplot(df, ["val1", "val2"], salvar_em=png, headless=True)
+        funcao = plot_histograma if grafico == "histograma" else plot_series
+        return lambda: funcao(df, "val1", salvar_em=png, headless=True)
+
+
+@caso("gerador_descritivos.gerar_lote", escala=False)
+def _preparar_gerador_campos(n):
+    from gerador_descritivos import GeradorDescritivos
+
+    tipos = ["string", "int", "float", "email", "date", "boolean", "decimal", "cpf"]
+    metadados = [{"nome": f"campo_{i}", "tipo": tipos[i % len(tipos)], "obrigatorio": i % 2 == 0,
+                  "tamanho_max": 255 if i % 8 == 0 else None, "valor_min": 0 if i % 8 == 1 else None}
+                 for i in range(n)]
+    destino = os.path.join(PASTA_TEMP.name, "campos")
+    return lambda: GeradorDescritivos().gerar_lote(metadados, f"{destino}.md", f"{destino}.json")
+
+
+@caso("gerador_tabelas.relatorio", escala=False)
+def _preparar_gerador_tabelas(n):
+    from gerar_descritivos_tabelas import GeradorDescritivosTabelas, classificar_tabela
+
+    prefixos = ["TB_CLIENTE", "TB_PEDIDO", "TB_PRODUTO", "TB_LOG_ACESSO", "TB_FATURA", "TB_ESTOQUE"]
+
+    def executar():
+        classificar_tabela.cache_clear()  # mede a classificação, não o cache
+        gerador = GeradorDescritivosTabelas()
+        for i in range(n):
+            gerador.adicionar_tabela(f"{prefixos[i % len(prefixos)]}_{i}", f"Tabela de cadastro e histórico {i}")
+        return gerador.gerar_relatorio_completo()
+    return executar
+
+
+def _orders_escalado(n: int) -> pd.DataFrame:
+    base = pd.read_csv(RAIZ / "datasets" / "orders.csv")
+    rng = np.random.default_rng(42)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    df["order_id"] = np.arange(1, n + 1)
+    return df
+
+
+for _formato in ("csv", "parquet"):
+    @caso(f"carga.orders[{_formato}]")
+    def _preparar_carga(n, formato=_formato):
+        caminho = os.path.join(PASTA_TEMP.name, f"orders_{n}.{formato}")
+        if not os.path.exists(caminho):
+            df = _orders_escalado(n)
+            df.to_csv(caminho, index=False) if formato == "csv" else df.to_parquet(caminho, index=False)
+        return (lambda: pd.read_csv(caminho)) if formato == "csv" else (lambda: pd.read_parquet(caminho))
+
+
+def executar_caso(nome: str, n: int, repeticoes: int) -> dict:
+    preparar, _ = CASOS[nome]
+    try:
+        funcao = preparar(n)
+    except ImportError as e:  # dependência opcional ausente (ex.: pandera, matplotlib, pyarrow)
+        return {"pulado": f"{type(e).__name__}: {e}"}
+    funcao()  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter(); funcao(); tempos.append(time.perf_counter() - inicio)
+    return {"min_s": min(tempos), "mediana_s": statistics.median(tempos), "repeticoes": repeticoes}
+
+
+def ambiente() -> dict:
+    return {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count(),
+            "numpy": np.__version__, "pandas": pd.__version__, "data": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tamanhos", nargs="+", type=float, default=[1e4, 1e6, 1e7])
+    parser.add_argument("--casos", nargs="*", default=None, help="prefixos dos casos a executar")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", default=None)
+    parser.add_argument("--salvar-baseline", default=None)
+    parser.add_argument("--comparar", default=None, help="baseline JSON para o relatório de regressão")
+    parser.add_argument("--limite", type=float, default=0.10)
+    args = parser.parse_args()
+
+    selecionados = [c for c in CASOS if not args.casos or c.startswith(tuple(args.casos))]
+    resultados = {"ambiente": ambiente(), "casos": {}}
+    for nome in selecionados:
+        _, escala = CASOS[nome]
+        tamanhos = [int(t) for t in args.tamanhos] if escala else [CAMPOS_GERADORES]
+        for n in tamanhos:
+            # casos grandes repetem menos para a suíte caber em uma execução noturna
+            medida = executar_caso(nome, n, args.repeticoes if n <= 1_000_000 else max(1, args.repeticoes // 2))
+            resultados["casos"].setdefault(nome, {})[str(n)] = medida
+            texto = medida.get("pulado") or f"{medida['min_s']:.4f}s (mediana {medida['mediana_s']:.4f}s)"
+            print(f"{nome:>35} n={n:>10,}: {texto}", flush=True)
+
+    for caminho in filter(None, [args.saida, args.salvar_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        regressao.salvar(resultados, caminho)
+    if args.comparar:
+        linhas = regressao.comparar(resultados, regressao.carregar(args.comparar), args.limite)
+        print(regressao.relatorio_markdown(linhas, args.limite))
+        sys.exit(1 if any(l["status"] == "regressao" for l in linhas) else 0)
+
+
+if __name__ == "__main__":
+    main()
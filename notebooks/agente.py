@@ -254,6 +254,12 @@ from validator import SparkValidationExecutor
 import uuid
 import time
 
+# Spans de instrumentação do repositório (no-op enquanto ENGDADOS_SPANS não estiver definido).
+# Pasta notebooks/ do repositório vem de ENGDADOS_NOTEBOOKS (padrão: clone no Workspace)
+sys.path.append(os.environ.get('ENGDADOS_NOTEBOOKS', '/Workspace/engDados-Solucoes/notebooks'))
+from src.instrumentacao import span
+from src.historico_qualidade import HistoricoQualidade
+
 print("✓ Módulos do agente importados com sucesso")
 
 # COMMAND ----------
@@ -268,8 +274,9 @@ class DatabricksDataQualityAgent:
     Agente completo para Databricks com integração Unity Catalog
     """
     
-    def __init__(self, config: AgentConfig):
+    def __init__(self, config: AgentConfig, historico: HistoricoQualidade | None = None):
         self.config = config
+        self.historico = historico  # rollups diários/semanais + alertas de drift por regra
         self.profiler = SparkDataProfiler(
             sample_size=config.sample_size,
             max_distinct_values=config.max_distinct_values
@@ -298,41 +305,58 @@ class DatabricksDataQualityAgent:
         
         # 1. Profiling
         print("[1/6] Profiling do dataset...")
-        profile = self.profiler.profile_spark_dataframe(spark_df, table_name)
+        with span("agente.profiling", tabela=table_name, execucao=execution_id) as s:
+            profile = self.profiler.profile_spark_dataframe(spark_df, table_name)
+            s.definir(linhas_entrada=profile.total_rows, colunas=profile.total_columns)
         print(f"      ✓ {profile.total_rows} linhas, {profile.total_columns} colunas analisadas")
         
         # 2. Geração de regras
         print("[2/6] Gerando regras de validação via LLM...")
-        self.generated_rules = self.llm_agent.generate_validation_rules(profile)
+        with span("agente.geracao_regras", tabela=table_name, execucao=execution_id) as s:
+            self.generated_rules = self.llm_agent.generate_validation_rules(profile)
+            s.definir(regras=len(self.generated_rules))
         print(f"      ✓ {len(self.generated_rules)} regras geradas")
         
         # 3. Armazenar regras no Unity Catalog
         if self.config.store_rules_in_catalog:
             print("[3/6] Armazenando regras no Unity Catalog...")
-            self._store_rules_in_catalog(table_name, self.generated_rules)
+            with span("agente.armazenamento_regras", tabela=table_name, execucao=execution_id):
+                self._store_rules_in_catalog(table_name, self.generated_rules)
             print(f"      ✓ Regras salvas em main.data_quality.validation_rules")
         else:
             print("[3/6] Armazenamento de regras desabilitado (pulando...)")
         
         # 4. Geração de SQL
         print("[4/6] Gerando queries SQL (Spark SQL)...")
-        self.generated_sql = self.llm_agent.generate_sql_queries(
-            self.generated_rules,
-            table_name,
-            dialect="spark"
-        )
+        with span("agente.geracao_sql", tabela=table_name, execucao=execution_id) as s:
+            self.generated_sql = self.llm_agent.generate_sql_queries(
+                self.generated_rules,
+                table_name,
+                dialect="spark"
+            )
+            s.definir(queries=len(self.generated_sql))
         print(f"      ✓ {len(self.generated_sql)} queries geradas")
         
         # 5. Executar validações
         print("[5/6] Executando validações...")
-        report = self._execute_validations_custom(spark_df, table_name, execution_id)
+        with span("agente.execucao", tabela=table_name, execucao=execution_id) as s:
+            report = self._execute_validations_custom(spark_df, table_name, execution_id)
+            s.definir(regras=report.total_rules, falhas=report.failed_rules)
         print(f"      ✓ Validações concluídas em {report.execution_time_seconds:.2f}s")
         
         # 6. Armazenar resultados
         print("[6/6] Armazenando resultados no Unity Catalog...")
-        self._store_report_in_catalog(report)
+        with span("agente.armazenamento_resultados", tabela=table_name, execucao=execution_id):
+            self._store_report_in_catalog(report)
         print(f"      ✓ Resultados salvos em main.data_quality.validation_reports")
         
+        if self.historico is not None:
+            with span("agente.historico", tabela=table_name, execucao=execution_id) as s:
+                alertas = self.historico.registrar(report)
+                s.definir(alertas=len(alertas))
+            for a in alertas:
+                print(f"      ⚠ Drift {a['metodo']} em {a['regra']}: {a['valor']:.2f} (média {a['media']:.2f})")
+        
         # Imprimir resumo
         self._print_summary(report)
         
@@ -6,7 +6,16 @@ Gera descrições completas e profissionais para campos de formulário/banco de
 """
 
 import json
-from typing import Dict, List, Optional
+import os
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from manifesto_descritivos import ManifestoDescritivos, calcular_hash, gravar_se_alterado
+
+VERSAO_GERADOR = "1.1"
 
 
 class GeradorDescritivos:
@@ -90,102 +99,128 @@ class GeradorDescritivos:
     
     def _gerar_descritivo(self, campo: Dict) -> str:
         """Gera o descritivo completo do campo"""
-        partes = []
+        return _renderizar_descritivo(campo)
+    
+    def gerar_relatorio_markdown(self, titulo: str = "Documentação de Campos") -> str:
+        """Gera um relatório completo em Markdown com todos os campos"""
+        linhas = _cabecalho_markdown(titulo, self._obter_data_atual())
         
-        # Nome formatado
-        nome_formatado = campo['nome'].replace('_', ' ').title()
+        for i, campo in enumerate(self.campos, 1):
+            linhas.extend(_secao_markdown(i, campo))
+        
+        return '\n'.join(linhas)
+    
+    def gerar_json(self) -> str:
+        """Exporta os campos em formato JSON"""
+        return json.dumps(self.campos, indent=2, ensure_ascii=False)
+    
+    def gerar_lote(self, metadados: Union[Iterable[Dict], Any],
+                   caminho_markdown: Optional[str] = None,
+                   caminho_json: Optional[str] = None,
+                   titulo: str = "Documentação de Campos",
+                   processos: int = 1, tamanho_lote: int = 5000,
+                   acumular: bool = False) -> int:
+        """
+        Gera descritivos em lote a partir de uma tabela de metadados de colunas
         
-        # Tipo do campo
-        tipo_desc = self.TIPOS_DESCRICAO.get(campo['tipo'].lower(), campo['tipo'])
-        partes.append(f"**{nome_formatado}** é um campo do tipo {tipo_desc} ")
+        Aceita um DataFrame pandas, uma tabela/RecordBatch do PyArrow ou qualquer
+        iterável de dicionários. As colunas podem seguir os nomes de
+        `adicionar_campo` ou do `information_schema.columns` (ver
+        MAPA_INFORMATION_SCHEMA). Markdown e JSON são gravados de forma
+        incremental, lote a lote, sem montar o documento inteiro em memória.
         
-        # Obrigatoriedade
-        if campo['obrigatorio']:
-            partes.append("de preenchimento **obrigatório** ")
-        else:
-            partes.append("de preenchimento **opcional** ")
+        Args:
+            metadados: Tabela ou iterável com os metadados das colunas
+            caminho_markdown: Arquivo Markdown de saída (opcional)
+            caminho_json: Arquivo JSON de saída (opcional)
+            titulo: Título do relatório Markdown
+            processos: Número de processos; acima de 1 os lotes são
+                renderizados em paralelo e gravados na ordem original
+            tamanho_lote: Quantidade de campos por lote
+            acumular: Se True, também guarda os campos em `self.campos`
         
-        # Restrições de tamanho para strings
-        if campo['tamanho_min'] or campo['tamanho_max']:
-            restricoes = []
-            if campo['tamanho_min']:
-                restricoes.append(f"mínimo de {campo['tamanho_min']} caracteres")
-            if campo['tamanho_max']:
-                restricoes.append(f"máximo de {campo['tamanho_max']} caracteres")
-            partes.append(f", com {' e '.join(restricoes)}")
+        Returns:
+            Quantidade de campos documentados
+        """
+        lotes = _iterar_lotes(metadados, tamanho_lote)
+        gerar_md = caminho_markdown is not None
+        gerar_json = caminho_json is not None
         
-        # Restrições de valor para números
-        if campo['valor_min'] is not None or campo['valor_max'] is not None:
-            restricoes = []
-            if campo['valor_min'] is not None:
-                restricoes.append(f"valor mínimo de {campo['valor_min']}")
-            if campo['valor_max'] is not None:
-                restricoes.append(f"valor máximo de {campo['valor_max']}")
-            partes.append(f", com {' e '.join(restricoes)}")
+        arq_md = open(caminho_markdown, 'w', encoding='utf-8') if gerar_md else None
+        arq_json = open(caminho_json, 'w', encoding='utf-8') if gerar_json else None
+        total = 0
+        try:
+            if arq_md:
+                arq_md.write('\n'.join(_cabecalho_markdown(titulo, self._obter_data_atual())))
+            if arq_json:
+                arq_json.write('[')
+            
+            for n, campos, md, js in _renderizar_lotes(lotes, gerar_md, gerar_json,
+                                                       acumular, processos):
+                if arq_md:
+                    arq_md.write(md)
+                if arq_json and n:
+                    arq_json.write((',\n' if total else '\n') + js)
+                self.campos.extend(campos)
+                total += n
+            
+            if arq_json:
+                arq_json.write('\n]' if total else ']')
+        finally:
+            if arq_md:
+                arq_md.close()
+            if arq_json:
+                arq_json.close()
         
-        # Opções válidas
-        if campo['opcoes']:
-            opcoes_str = ', '.join([f'"{op}"' for op in campo['opcoes']])
-            partes.append(f". As opções válidas são: {opcoes_str}")
-        else:
-            partes.append(".")
+        return total
+    
+    def gerar_incremental(self, metadados: Union[Iterable[Dict], Any],
+                          caminho_markdown: str, caminho_json: str,
+                          caminho_manifesto: Optional[str] = None,
+                          titulo: str = "Documentação de Campos") -> Dict[str, int]:
+        """
+        Regenera apenas os campos cujos metadados mudaram desde a última execução
         
-        # Unicidade
-        if campo['unico']:
-            partes.append(f" O valor deste campo deve ser **único** no sistema, não podendo haver duplicatas.")
+        Cada campo tem no manifesto o hash dos seus metadados (mais a versão do
+        gerador) e o resultado gerado. Campos inalterados são reaproveitados do
+        manifesto; os arquivos só são regravados se algum campo mudou.
         
-        # Valor padrão
-        if campo['padrao']:
-            partes.append(f" Caso não seja informado, o valor padrão será: **{campo['padrao']}**.")
+        Args:
+            metadados: Tabela ou iterável com os metadados (mesmo formato de `gerar_lote`)
+            caminho_markdown: Arquivo Markdown de saída
+            caminho_json: Arquivo JSON de saída
+            caminho_manifesto: Arquivo do manifesto (padrão: `<caminho_json>.manifesto.json`)
+            titulo: Título do relatório Markdown
         
-        # Descrição customizada
-        if campo['descricao_customizada']:
-            partes.append(f" {campo['descricao_customizada']}")
+        Returns:
+            Dicionário com total, regenerados, reaproveitados e removidos
+        """
+        manifesto = ManifestoDescritivos(caminho_manifesto or f"{caminho_json}.manifesto.json",
+                                         VERSAO_GERADOR)
+        self.campos = []
+        chaves = []
         
-        return ''.join(partes)
-    
-    def gerar_relatorio_markdown(self, titulo: str = "Documentação de Campos") -> str:
-        """Gera um relatório completo em Markdown com todos os campos"""
-        linhas = [
-            f"# {titulo}\n",
-            f"*Gerado automaticamente em {self._obter_data_atual()}*\n",
-            "---\n"
-        ]
+        for _, registros in _iterar_lotes(metadados, 5000):
+            for registro in registros:
+                campo = _normalizar_registro(registro)
+                chave = _chave_registro({str(k).lower(): v for k, v in registro.items()}, campo)
+                hash_campo = calcular_hash(campo, VERSAO_GERADOR)
+                
+                descritivo = manifesto.obter(chave, hash_campo)
+                if descritivo is None:
+                    descritivo = _renderizar_descritivo(campo)
+                    manifesto.registrar(chave, hash_campo, descritivo)
+                campo['descritivo'] = descritivo
+                
+                self.campos.append(campo)
+                chaves.append(chave)
         
-        for i, campo in enumerate(self.campos, 1):
-            linhas.append(f"\n## {i}. {campo['nome']}\n")
-            linhas.append(f"{campo['descritivo']}\n")
-            
-            # Tabela de especificações técnicas
-            linhas.append("\n### Especificações Técnicas\n")
-            linhas.append("| Propriedade | Valor |")
-            linhas.append("|-------------|-------|")
-            linhas.append(f"| **Nome do Campo** | `{campo['nome']}` |")
-            linhas.append(f"| **Tipo de Dados** | `{campo['tipo']}` |")
-            linhas.append(f"| **Obrigatório** | {'Sim' if campo['obrigatorio'] else 'Não'} |")
-            
-            if campo['tamanho_min']:
-                linhas.append(f"| **Tamanho Mínimo** | {campo['tamanho_min']} caracteres |")
-            if campo['tamanho_max']:
-                linhas.append(f"| **Tamanho Máximo** | {campo['tamanho_max']} caracteres |")
-            if campo['valor_min'] is not None:
-                linhas.append(f"| **Valor Mínimo** | {campo['valor_min']} |")
-            if campo['valor_max'] is not None:
-                linhas.append(f"| **Valor Máximo** | {campo['valor_max']} |")
-            if campo['padrao']:
-                linhas.append(f"| **Valor Padrão** | `{campo['padrao']}` |")
-            if campo['unico']:
-                linhas.append(f"| **Único** | Sim |")
-            if campo['opcoes']:
-                linhas.append(f"| **Opções Válidas** | {', '.join([f'`{op}`' for op in campo['opcoes']])} |")
-            
-            linhas.append("")
+        removidos = manifesto.salvar(chaves)
+        if manifesto.regenerados or removidos or not os.path.exists(caminho_markdown):
+            gravar_se_alterado(caminho_markdown, self.gerar_relatorio_markdown(titulo))
+        gravar_se_alterado(caminho_json, self.gerar_json())
         
-        return '\n'.join(linhas)
-    
-    def gerar_json(self) -> str:
-        """Exporta os campos em formato JSON"""
-        return json.dumps(self.campos, indent=2, ensure_ascii=False)
+        return manifesto.resumo(removidos)
     
     def _obter_data_atual(self) -> str:
         """Retorna a data atual formatada"""
@@ -193,6 +228,223 @@ class GeradorDescritivos:
         return datetime.now().strftime("%d/%m/%Y às %H:%M")
 
 
+# Mapeamento das colunas do information_schema.columns para os argumentos de adicionar_campo
+MAPA_INFORMATION_SCHEMA = {
+    'column_name': 'nome',
+    'data_type': 'tipo',
+    'character_maximum_length': 'tamanho_max',
+    'column_default': 'padrao',
+    'column_comment': 'descricao_customizada',
+    'comment': 'descricao_customizada',
+}
+
+CAMPOS_PADRAO = ('nome', 'tipo', 'obrigatorio', 'tamanho_min', 'tamanho_max',
+                 'valor_min', 'valor_max', 'padrao', 'unico',
+                 'descricao_customizada', 'opcoes')
+
+# Templates pré-compilados (formatados uma única vez por campo)
+TPL_INICIO = "**{nome}** é um campo do tipo {tipo} de preenchimento **{obrigatoriedade}** "
+TPL_TAMANHO_MIN = "mínimo de {} caracteres"
+TPL_TAMANHO_MAX = "máximo de {} caracteres"
+TPL_VALOR_MIN = "valor mínimo de {}"
+TPL_VALOR_MAX = "valor máximo de {}"
+TPL_RESTRICOES = ", com {}"
+TPL_OPCOES = ". As opções válidas são: {}"
+TXT_UNICO = " O valor deste campo deve ser **único** no sistema, não podendo haver duplicatas."
+TPL_PADRAO = " Caso não seja informado, o valor padrão será: **{}**."
+
+
+@lru_cache(maxsize=None)
+def _descrever_tipo(tipo: str) -> str:
+    """Traduz o tipo para português (memoizado, os tipos se repetem muito em catálogos)"""
+    return GeradorDescritivos.TIPOS_DESCRICAO.get(tipo.lower(), tipo)
+
+
+@lru_cache(maxsize=None)
+def _formatar_nome(nome: str) -> str:
+    return nome.replace('_', ' ').title()
+
+
+def _renderizar_descritivo(campo: Dict) -> str:
+    """Renderiza o descritivo de um campo a partir dos templates pré-compilados"""
+    partes = [TPL_INICIO.format(
+        nome=_formatar_nome(campo['nome']),
+        tipo=_descrever_tipo(campo['tipo']),
+        obrigatoriedade='obrigatório' if campo['obrigatorio'] else 'opcional',
+    )]
+    
+    tamanho_min, tamanho_max = campo['tamanho_min'], campo['tamanho_max']
+    if tamanho_min or tamanho_max:
+        restricoes = []
+        if tamanho_min:
+            restricoes.append(TPL_TAMANHO_MIN.format(tamanho_min))
+        if tamanho_max:
+            restricoes.append(TPL_TAMANHO_MAX.format(tamanho_max))
+        partes.append(TPL_RESTRICOES.format(' e '.join(restricoes)))
+    
+    valor_min, valor_max = campo['valor_min'], campo['valor_max']
+    if valor_min is not None or valor_max is not None:
+        restricoes = []
+        if valor_min is not None:
+            restricoes.append(TPL_VALOR_MIN.format(valor_min))
+        if valor_max is not None:
+            restricoes.append(TPL_VALOR_MAX.format(valor_max))
+        partes.append(TPL_RESTRICOES.format(' e '.join(restricoes)))
+    
+    if campo['opcoes']:
+        partes.append(TPL_OPCOES.format(', '.join([f'"{op}"' for op in campo['opcoes']])))
+    else:
+        partes.append(".")
+    
+    if campo['unico']:
+        partes.append(TXT_UNICO)
+    if campo['padrao']:
+        partes.append(TPL_PADRAO.format(campo['padrao']))
+    if campo['descricao_customizada']:
+        partes.append(f" {campo['descricao_customizada']}")
+    
+    return ''.join(partes)
+
+
+def _cabecalho_markdown(titulo: str, data: str) -> List[str]:
+    return [
+        f"# {titulo}\n",
+        f"*Gerado automaticamente em {data}*\n",
+        "---\n"
+    ]
+
+
+def _secao_markdown(i: int, campo: Dict) -> List[str]:
+    """Linhas Markdown da seção de um campo (descritivo + especificações técnicas)"""
+    linhas = [
+        f"\n## {i}. {campo['nome']}\n",
+        f"{campo['descritivo']}\n",
+        "\n### Especificações Técnicas\n",
+        "| Propriedade | Valor |",
+        "|-------------|-------|",
+        f"| **Nome do Campo** | `{campo['nome']}` |",
+        f"| **Tipo de Dados** | `{campo['tipo']}` |",
+        f"| **Obrigatório** | {'Sim' if campo['obrigatorio'] else 'Não'} |",
+    ]
+    
+    if campo['tamanho_min']:
+        linhas.append(f"| **Tamanho Mínimo** | {campo['tamanho_min']} caracteres |")
+    if campo['tamanho_max']:
+        linhas.append(f"| **Tamanho Máximo** | {campo['tamanho_max']} caracteres |")
+    if campo['valor_min'] is not None:
+        linhas.append(f"| **Valor Mínimo** | {campo['valor_min']} |")
+    if campo['valor_max'] is not None:
+        linhas.append(f"| **Valor Máximo** | {campo['valor_max']} |")
+    if campo['padrao']:
+        linhas.append(f"| **Valor Padrão** | `{campo['padrao']}` |")
+    if campo['unico']:
+        linhas.append("| **Único** | Sim |")
+    if campo['opcoes']:
+        linhas.append(f"| **Opções Válidas** | {', '.join([f'`{op}`' for op in campo['opcoes']])} |")
+    
+    linhas.append("")
+    return linhas
+
+
+def _valor(v: Any) -> Any:
+    """Converte nulos de pandas/NumPy (NaN, NaT, NA) em None"""
+    if v is None or type(v).__name__ == 'NAType':
+        return None
+    try:
+        return None if v != v else v
+    except (TypeError, ValueError):
+        return v
+
+
+def _normalizar_registro(registro: Dict) -> Dict:
+    """Converte uma linha de metadados (nomes próprios ou do information_schema) em campo"""
+    dados = {}
+    for chave, valor in registro.items():
+        chave = str(chave).lower()
+        dados[MAPA_INFORMATION_SCHEMA.get(chave, chave)] = _valor(valor)
+    
+    campo = {chave: dados.get(chave) for chave in CAMPOS_PADRAO}
+    if campo['obrigatorio'] is None and dados.get('is_nullable') is not None:
+        campo['obrigatorio'] = str(dados['is_nullable']).upper() in ('NO', 'N', 'FALSE')
+    campo['obrigatorio'] = bool(campo['obrigatorio'])
+    for chave in ('tamanho_min', 'tamanho_max'):
+        if isinstance(campo[chave], float) and campo[chave].is_integer():
+            campo[chave] = int(campo[chave])  # colunas inteiras com nulos chegam como float
+    campo['unico'] = bool(campo['unico'])
+    campo['tipo'] = str(campo['tipo'] or 'string')
+    if campo['opcoes'] is not None:
+        campo['opcoes'] = list(campo['opcoes'])
+    return campo
+
+
+def _chave_registro(registro: Dict, campo: Dict) -> str:
+    """Chave estável do campo no manifesto (inclui schema/tabela quando vêm do information_schema)"""
+    qualificadores = [str(registro[k]) for k in ('table_catalog', 'table_schema', 'table_name')
+                      if registro.get(k) is not None]
+    return '.'.join(qualificadores + [campo['nome']])
+
+
+def _iterar_lotes(metadados: Any, tamanho_lote: int) -> Iterator[Tuple[int, List[Dict]]]:
+    """Divide a entrada em lotes de dicionários, sem materializar a tabela inteira"""
+    if hasattr(metadados, 'to_batches'):  # pyarrow.Table
+        blocos = (b.to_pylist() for b in metadados.to_batches(max_chunksize=tamanho_lote))
+    elif hasattr(metadados, 'to_pylist'):  # pyarrow.RecordBatch
+        blocos = (metadados.slice(i, tamanho_lote).to_pylist()
+                  for i in range(0, metadados.num_rows, tamanho_lote))
+    elif hasattr(metadados, 'iloc') and hasattr(metadados, 'columns'):  # pandas.DataFrame
+        blocos = (metadados.iloc[i:i + tamanho_lote].to_dict('records')
+                  for i in range(0, len(metadados), tamanho_lote))
+    else:
+        iterador = iter(metadados)
+        blocos = iter(lambda: list(islice(iterador, tamanho_lote)), [])
+    
+    inicio = 1
+    for bloco in blocos:
+        if bloco:
+            yield inicio, bloco
+            inicio += len(bloco)
+
+
+def _renderizar_lote(tarefa: Tuple[int, List[Dict], bool, bool, bool]) -> Tuple[int, List[Dict], str, str]:
+    """Renderiza um lote (executado no processo principal ou em um worker)"""
+    inicio, registros, gerar_md, gerar_json, devolver_campos = tarefa
+    campos = [_normalizar_registro(r) for r in registros]
+    for campo in campos:
+        campo['descritivo'] = _renderizar_descritivo(campo)
+    
+    md = ''
+    if gerar_md:
+        md = ''.join('\n' + '\n'.join(_secao_markdown(i, c))
+                     for i, c in enumerate(campos, inicio))
+    js = ''
+    if gerar_json:
+        js = ',\n'.join(textwrap.indent(json.dumps(c, indent=2, ensure_ascii=False), '  ')
+                        for c in campos)
+    
+    return len(campos), campos if devolver_campos else [], md, js
+
+
+def _renderizar_lotes(lotes: Iterator[Tuple[int, List[Dict]]], gerar_md: bool,
+                      gerar_json: bool, devolver_campos: bool,
+                      processos: int) -> Iterator[Tuple[int, List[Dict], str, str]]:
+    """Renderiza os lotes em ordem; com processos > 1 mantém uma janela limitada em voo"""
+    tarefas = ((inicio, registros, gerar_md, gerar_json, devolver_campos)
+               for inicio, registros in lotes)
+    
+    if processos <= 1:
+        yield from map(_renderizar_lote, tarefas)
+        return
+    
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        pendentes = [executor.submit(_renderizar_lote, t) for t in islice(tarefas, processos * 2)]
+        while pendentes:
+            resultado = pendentes.pop(0).result()
+            proxima = next(tarefas, None)
+            if proxima is not None:
+                pendentes.append(executor.submit(_renderizar_lote, proxima))
+            yield resultado
+
+
 def exemplo_uso():
     """Exemplo de uso do gerador de descritivos"""
     print("=" * 70)
@@ -262,27 +514,24 @@ def exemplo_uso():
         descricao_customizada="Valor em reais (R$)."
     )
     
-    # Gerar relatório
-    relatorio = gerador.gerar_relatorio_markdown("Documentação de Campos do Sistema")
-    
-    # Salvar em arquivo
-    with open('/home/ubuntu/descritivos_campos.md', 'w', encoding='utf-8') as f:
-        f.write(relatorio)
+    # Gerar relatório e JSON (apenas campos alterados desde a última execução são regenerados)
+    resumo = gerador.gerar_incremental(
+        list(gerador.campos),
+        caminho_markdown='/home/ubuntu/descritivos_campos.md',
+        caminho_json='/home/ubuntu/descritivos_campos.json',
+        titulo="Documentação de Campos do Sistema"
+    )
     
     print("✓ Relatório gerado com sucesso!")
     print("✓ Arquivo salvo: /home/ubuntu/descritivos_campos.md")
+    print(f"✓ {resumo['regenerados']} campos regenerados, {resumo['reaproveitados']} reaproveitados do manifesto")
     print()
     print("Campos processados:")
     for campo in gerador.campos:
         print(f"  • {campo['nome']}")
     print()
-    
-    # Também salvar JSON
-    with open('/home/ubuntu/descritivos_campos.json', 'w', encoding='utf-8') as f:
-        f.write(gerador.gerar_json())
     print("✓ Arquivo JSON salvo: /home/ubuntu/descritivos_campos.json")
     print()
 
-
 if __name__ == "__main__":
     exemplo_uso()
@@ -6,8 +6,178 @@ Transforma descrições básicas em documentação completa e profissional
 """
 
 import json
+import os
+import re
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from manifesto_descritivos import ManifestoDescritivos, calcular_hash, gravar_se_alterado
+
+VERSAO_GERADOR = "1.1"
+
+
+# Regras declarativas de classificação. Cada regra dispara quando alguma palavra-chave
+# de 'nome' aparece no nome lógico ou alguma de 'descricao' aparece na descrição
+# (ambos em minúsculas). Para acrescentar domínios basta incluir novas regras.
+
+# Aplicadas em ordem; regras posteriores sobrescrevem tipo, domínio e importância
+REGRAS_CONTEXTO = (
+    {'nome': ('dependente',), 'descricao': ('dependente',),
+     'tipo_entidade': 'entidade dependente',
+     'relacionamento': 'relacionada a titular ou beneficiário principal'},
+    {'nome': ('endereco',), 'descricao': ('endereço',),
+     'tipo_entidade': 'dados de localização',
+     'relacionamento': 'pode estar vinculada a pessoas, empresas ou estabelecimentos'},
+    {'nome': ('faturamento',), 'descricao': ('fatura',),
+     'tipo_entidade': 'transação financeira', 'dominio': 'financeiro', 'importancia': 'alta',
+     'relacionamento': 'relacionada a apólices e seguros'},
+    {'nome': ('medico',), 'descricao': ('médico',),
+     'tipo_entidade': 'cadastro de profissional', 'dominio': 'saúde',
+     'relacionamento': 'referenciado em atendimentos e procedimentos'},
+    {'descricao': ('apolice', 'seguro'),
+     'dominio': 'seguros', 'importancia': 'alta'},
+)
+
+# Vale a primeira regra que disparar
+REGRAS_FINALIDADE = (
+    {'nome': ('dependente',), 'finalidades': (
+        "Cadastro e gestão de dependentes vinculados a titulares de planos ou seguros",
+        "Controle de elegibilidade e direitos dos dependentes",
+        "Geração de relatórios familiares e análises demográficas",
+    )},
+    {'nome': ('endereco',), 'finalidades': (
+        "Registro de endereços para correspondências e comunicações oficiais",
+        "Validação de localização geográfica para cobertura de serviços",
+        "Análises de distribuição geográfica e regionalização",
+    )},
+    {'nome': ('faturamento',), 'finalidades': (
+        "Registro de todas as transações de faturamento de apólices e seguros",
+        "Controle financeiro e conciliação de pagamentos",
+        "Base para relatórios gerenciais, auditorias e análises de receita",
+        "Suporte a processos de cobrança e gestão de inadimplência",
+    )},
+    {'nome': ('medico',), 'finalidades': (
+        "Cadastro completo de médicos e profissionais de saúde credenciados",
+        "Controle de especialidades, credenciamentos e vínculos",
+        "Suporte à rede referenciada e direcionamento de atendimentos",
+        "Base para análises de utilização e gestão da rede credenciada",
+    )},
+)
+
+FINALIDADES_PADRAO = (
+    "Armazenamento estruturado de informações essenciais ao negócio",
+    "Suporte a operações transacionais e consultas do sistema",
+    "Base para relatórios e análises gerenciais",
+)
+
+# Todas as regras que dispararem contribuem, na ordem da tabela
+REGRAS_CONSIDERACOES = (
+    {'nome': ('faturamento', 'financeiro', 'pagamento'),
+     'descricao': ('faturamento', 'financeiro', 'pagamento'),
+     'consideracoes': ("**Segurança**: Esta tabela contém dados financeiros sensíveis e deve ter controles de acesso rigorosos e auditoria habilitada",)},
+    {'nome': ('medico',), 'descricao': ('profissional',),
+     'consideracoes': ("**Privacidade**: Dados de profissionais de saúde estão sujeitos à LGPD e regulamentações do setor de saúde",)},
+    {'nome': ('dependente',),
+     'consideracoes': ("**Privacidade**: Contém dados pessoais protegidos pela LGPD, especialmente quando envolvem menores de idade",)},
+    {'nome': ('faturamento',),
+     'consideracoes': ("**Performance**: Tabela com alto volume de transações, recomenda-se particionamento por período e índices otimizados",
+                       "**Retenção**: Definir política de arquivamento para dados históricos conforme requisitos legais e fiscais")},
+    {'nome': ('endereco',),
+     'consideracoes': ("**Integridade**: Implementar validações de CEP, normalização de endereços e integração com APIs de geolocalização",)},
+    {'nome': ('dependente', 'medico'),
+     'consideracoes': ("**Integridade Referencial**: Manter chaves estrangeiras e constraints para garantir consistência dos relacionamentos",)},
+)
+
+
+def _padrao_trie(palavras: Iterable[str]) -> str:
+    """Monta uma regex em forma de trie: o custo por posição depende do tamanho da palavra, não da quantidade"""
+    trie: Dict = {}
+    for palavra in palavras:
+        no = trie
+        for caractere in palavra:
+            no = no.setdefault(caractere, {})
+        no[''] = {}
+    
+    def montar(no: Dict) -> str:
+        ramos = [re.escape(c) + montar(filho) for c, filho in sorted(no.items()) if c]
+        if not ramos:
+            return ''
+        corpo = ramos[0] if len(ramos) == 1 else f"(?:{'|'.join(ramos)})"
+        return f"(?:{corpo})?" if '' in no else corpo
+    
+    return montar(trie)
+
+
+class ClassificadorPalavrasChave:
+    """Compila as palavras-chave de todas as regras em um único autômato e indexa regra por palavra"""
+    
+    def __init__(self, **grupos: Tuple[Dict, ...]):
+        palavras = {p for regras in grupos.values() for regra in regras
+                    for campo in ('nome', 'descricao') for p in regra.get(campo, ())}
+        # Lookahead para achar ocorrências sobrepostas; a trie devolve a maior palavra em cada posição
+        self._automato = re.compile(f"(?=({_padrao_trie(palavras)}))")
+        # Palavras contidas em outras ("fatura" em "faturamento") são implicadas pela maior
+        self._contidas = {p: frozenset(q for q in palavras if q in p) for p in palavras}
+        # (campo, palavra) -> índices das regras de cada grupo
+        self._indice: Dict[str, Dict[Tuple[str, str], List[int]]] = {}
+        for grupo, regras in grupos.items():
+            indice = self._indice[grupo] = {}
+            for i, regra in enumerate(regras):
+                for campo in ('nome', 'descricao'):
+                    for palavra in regra.get(campo, ()):
+                        indice.setdefault((campo, palavra), []).append(i)
+    
+    def regras_disparadas(self, nome: str, descricao: str) -> Dict[str, List[int]]:
+        """Varre nome e descrição uma única vez e devolve, por grupo, os índices das regras disparadas"""
+        texto = f"{nome}\x00{descricao}"
+        limite = len(nome)
+        achados: Set[Tuple[str, str]] = set()
+        for m in self._automato.finditer(texto):
+            campo = 'nome' if m.start() < limite else 'descricao'
+            achados.update((campo, p) for p in self._contidas[m.group(1)])
+        
+        return {
+            grupo: sorted({i for chave in achados for i in indice.get(chave, ())})
+            for grupo, indice in self._indice.items()
+        }
+
+
+CLASSIFICADOR = ClassificadorPalavrasChave(
+    contexto=REGRAS_CONTEXTO,
+    finalidades=REGRAS_FINALIDADE,
+    consideracoes=REGRAS_CONSIDERACOES,
+)
+
+
+@lru_cache(maxsize=65536)
+def classificar_tabela(nome_logico: str, descricao: str) -> Dict:
+    """Calcula, em uma passada, contexto, finalidades e considerações técnicas da tabela (memoizado)"""
+    disparadas = CLASSIFICADOR.regras_disparadas(nome_logico.lower(), descricao.lower())
+    
+    contexto = {
+        'tipo_entidade': 'dados',
+        'dominio': 'geral',
+        'relacionamentos': [],
+        'importancia': 'média'
+    }
+    for i in disparadas['contexto']:
+        regra = REGRAS_CONTEXTO[i]
+        for atributo in ('tipo_entidade', 'dominio', 'importancia'):
+            if atributo in regra:
+                contexto[atributo] = regra[atributo]
+        if 'relacionamento' in regra:
+            contexto['relacionamentos'].append(regra['relacionamento'])
+    contexto['relacionamentos'] = tuple(contexto['relacionamentos'])
+    
+    regras_finalidade = disparadas['finalidades']
+    finalidades = (REGRAS_FINALIDADE[regras_finalidade[0]]['finalidades']
+                   if regras_finalidade else FINALIDADES_PADRAO)
+    
+    consideracoes = tuple(c for i in disparadas['consideracoes']
+                          for c in REGRAS_CONSIDERACOES[i]['consideracoes'])
+    
+    return {'contexto': contexto, 'finalidades': finalidades, 'consideracoes': consideracoes}
 
 
 class GeradorDescritivosTabelas:
@@ -38,41 +208,8 @@ class GeradorDescritivosTabelas:
     
     def _inferir_contexto(self, nome_logico: str, descricao: str) -> Dict:
         """Infere informações contextuais sobre a tabela"""
-        contexto = {
-            'tipo_entidade': 'dados',
-            'dominio': 'geral',
-            'relacionamentos': [],
-            'importancia': 'média'
-        }
-        
-        nome_lower = nome_logico.lower()
-        desc_lower = descricao.lower()
-        
-        # Identificar tipo de entidade
-        if 'dependente' in nome_lower or 'dependente' in desc_lower:
-            contexto['tipo_entidade'] = 'entidade dependente'
-            contexto['relacionamentos'].append('relacionada a titular ou beneficiário principal')
-        
-        if 'endereco' in nome_lower or 'endereço' in desc_lower:
-            contexto['tipo_entidade'] = 'dados de localização'
-            contexto['relacionamentos'].append('pode estar vinculada a pessoas, empresas ou estabelecimentos')
-        
-        if 'faturamento' in nome_lower or 'fatura' in desc_lower:
-            contexto['tipo_entidade'] = 'transação financeira'
-            contexto['dominio'] = 'financeiro'
-            contexto['importancia'] = 'alta'
-            contexto['relacionamentos'].append('relacionada a apólices e seguros')
-        
-        if 'medico' in nome_lower or 'médico' in desc_lower:
-            contexto['tipo_entidade'] = 'cadastro de profissional'
-            contexto['dominio'] = 'saúde'
-            contexto['relacionamentos'].append('referenciado em atendimentos e procedimentos')
-        
-        if 'apolice' in desc_lower or 'seguro' in desc_lower:
-            contexto['dominio'] = 'seguros'
-            contexto['importancia'] = 'alta'
-        
-        return contexto
+        contexto = classificar_tabela(nome_logico, descricao)['contexto']
+        return dict(contexto, relacionamentos=list(contexto['relacionamentos']))
     
     def _gerar_descritivo_expandido(self, tabela: Dict) -> str:
         """Gera descritivo expandido e profissional da tabela"""
@@ -110,73 +247,64 @@ class GeradorDescritivosTabelas:
         
         return ''.join(partes)
     
-    def _gerar_finalidade_uso(self, tabela: Dict) -> str:
+    def _gerar_finalidade_uso(self, tabela: Dict) -> List[str]:
         """Gera descrição de finalidade e uso da tabela"""
-        nome_lower = tabela['nome_logico'].lower()
-        desc_lower = tabela['descricao_basica'].lower()
-        
-        finalidades = []
-        
-        if 'dependente' in nome_lower:
-            finalidades.append("Cadastro e gestão de dependentes vinculados a titulares de planos ou seguros")
-            finalidades.append("Controle de elegibilidade e direitos dos dependentes")
-            finalidades.append("Geração de relatórios familiares e análises demográficas")
-        
-        elif 'endereco' in nome_lower:
-            finalidades.append("Registro de endereços para correspondências e comunicações oficiais")
-            finalidades.append("Validação de localização geográfica para cobertura de serviços")
-            finalidades.append("Análises de distribuição geográfica e regionalização")
-        
-        elif 'faturamento' in nome_lower:
-            finalidades.append("Registro de todas as transações de faturamento de apólices e seguros")
-            finalidades.append("Controle financeiro e conciliação de pagamentos")
-            finalidades.append("Base para relatórios gerenciais, auditorias e análises de receita")
-            finalidades.append("Suporte a processos de cobrança e gestão de inadimplência")
-        
-        elif 'medico' in nome_lower:
-            finalidades.append("Cadastro completo de médicos e profissionais de saúde credenciados")
-            finalidades.append("Controle de especialidades, credenciamentos e vínculos")
-            finalidades.append("Suporte à rede referenciada e direcionamento de atendimentos")
-            finalidades.append("Base para análises de utilização e gestão da rede credenciada")
-        
-        else:
-            finalidades.append("Armazenamento estruturado de informações essenciais ao negócio")
-            finalidades.append("Suporte a operações transacionais e consultas do sistema")
-            finalidades.append("Base para relatórios e análises gerenciais")
-        
-        return finalidades
+        return list(classificar_tabela(tabela['nome_logico'], tabela['descricao_basica'])['finalidades'])
     
     def _gerar_consideracoes_tecnicas(self, tabela: Dict) -> List[str]:
         """Gera considerações técnicas sobre a tabela"""
-        consideracoes = []
-        nome_lower = tabela['nome_logico'].lower()
-        desc_lower = tabela['descricao_basica'].lower()
+        return list(classificar_tabela(tabela['nome_logico'], tabela['descricao_basica'])['consideracoes'])
+    
+    def _gerar_artefatos(self, tabela: Dict) -> Dict:
+        """Gera todas as partes derivadas de uma tabela (descritivo, finalidades, considerações, contexto)"""
+        return {
+            'descritivo': self._gerar_descritivo_expandido(tabela),
+            'finalidades': self._gerar_finalidade_uso(tabela),
+            'consideracoes': self._gerar_consideracoes_tecnicas(tabela),
+            'contexto': self._inferir_contexto(tabela['nome_logico'], tabela['descricao_basica']),
+        }
+    
+    def _secao_tabela(self, i: int, tabela: Dict, artefatos: Dict) -> List[str]:
+        """Linhas Markdown do detalhamento de uma tabela"""
+        nome_logico = tabela['nome_logico']
+        nome_amigavel = self._gerar_nome_amigavel(nome_logico)
+        
+        linhas = [f"\n## {i}. {nome_logico}\n", f"### {nome_amigavel}\n"]
         
-        # Considerações de segurança
-        if any(palavra in nome_lower or palavra in desc_lower for palavra in ['faturamento', 'financeiro', 'pagamento']):
-            consideracoes.append("**Segurança**: Esta tabela contém dados financeiros sensíveis e deve ter controles de acesso rigorosos e auditoria habilitada")
+        # Informações básicas
+        linhas.append("\n#### 📋 Informações Básicas\n")
+        linhas.append(f"**Nome Lógico:** `{nome_logico}`\n\n")
+        linhas.append(f"**Descrição Original:** {tabela['descricao_basica']}\n")
         
-        if 'medico' in nome_lower or 'profissional' in desc_lower:
-            consideracoes.append("**Privacidade**: Dados de profissionais de saúde estão sujeitos à LGPD e regulamentações do setor de saúde")
+        # Descritivo expandido
+        linhas.append("\n#### 📖 Descritivo Detalhado\n")
+        linhas.append(f"{artefatos['descritivo']}\n")
         
-        if 'dependente' in nome_lower:
-            consideracoes.append("**Privacidade**: Contém dados pessoais protegidos pela LGPD, especialmente quando envolvem menores de idade")
+        # Finalidade e uso
+        linhas.append("\n#### 🎯 Finalidade e Uso\n")
+        for finalidade in artefatos['finalidades']:
+            linhas.append(f"- {finalidade}\n")
         
-        # Considerações de performance
-        if 'faturamento' in nome_lower:
-            consideracoes.append("**Performance**: Tabela com alto volume de transações, recomenda-se particionamento por período e índices otimizados")
-            consideracoes.append("**Retenção**: Definir política de arquivamento para dados históricos conforme requisitos legais e fiscais")
+        # Considerações técnicas
+        if artefatos['consideracoes']:
+            linhas.append("\n#### ⚙️ Considerações Técnicas\n")
+            for consideracao in artefatos['consideracoes']:
+                linhas.append(f"- {consideracao}\n")
         
-        # Considerações de integridade
-        if 'endereco' in nome_lower:
-            consideracoes.append("**Integridade**: Implementar validações de CEP, normalização de endereços e integração com APIs de geolocalização")
+        # Contexto adicional
+        contexto = artefatos['contexto']
+        linhas.append("\n#### 🔗 Contexto no Sistema\n")
+        linhas.append(f"- **Domínio:** {contexto['dominio'].title()}\n")
+        linhas.append(f"- **Tipo de Entidade:** {contexto['tipo_entidade'].title()}\n")
+        linhas.append(f"- **Importância:** {contexto['importancia'].title()}\n")
         
-        if any(palavra in nome_lower for palavra in ['dependente', 'medico']):
-            consideracoes.append("**Integridade Referencial**: Manter chaves estrangeiras e constraints para garantir consistência dos relacionamentos")
+        if i < len(self.tabelas):
+            linhas.append("\n---\n")
         
-        return consideracoes
+        return linhas
     
-    def gerar_relatorio_completo(self, titulo: str = "Documentação de Tabelas do Banco de Dados") -> str:
+    def gerar_relatorio_completo(self, titulo: str = "Documentação de Tabelas do Banco de Dados",
+                                 artefatos_por_tabela: Optional[List[Dict]] = None) -> str:
         """Gera relatório completo em Markdown"""
         linhas = [
             f"# {titulo}\n",
@@ -198,44 +326,8 @@ class GeradorDescritivosTabelas:
         
         # Detalhamento de cada tabela
         for i, tabela in enumerate(self.tabelas, 1):
-            nome_logico = tabela['nome_logico']
-            nome_amigavel = self._gerar_nome_amigavel(nome_logico)
-            
-            linhas.append(f"\n## {i}. {nome_logico}\n")
-            linhas.append(f"### {nome_amigavel}\n")
-            
-            # Informações básicas
-            linhas.append("\n#### 📋 Informações Básicas\n")
-            linhas.append(f"**Nome Lógico:** `{nome_logico}`\n\n")
-            linhas.append(f"**Descrição Original:** {tabela['descricao_basica']}\n")
-            
-            # Descritivo expandido
-            linhas.append("\n#### 📖 Descritivo Detalhado\n")
-            descritivo = self._gerar_descritivo_expandido(tabela)
-            linhas.append(f"{descritivo}\n")
-            
-            # Finalidade e uso
-            linhas.append("\n#### 🎯 Finalidade e Uso\n")
-            finalidades = self._gerar_finalidade_uso(tabela)
-            for finalidade in finalidades:
-                linhas.append(f"- {finalidade}\n")
-            
-            # Considerações técnicas
-            consideracoes = self._gerar_consideracoes_tecnicas(tabela)
-            if consideracoes:
-                linhas.append("\n#### ⚙️ Considerações Técnicas\n")
-                for consideracao in consideracoes:
-                    linhas.append(f"- {consideracao}\n")
-            
-            # Contexto adicional
-            contexto = self._inferir_contexto(nome_logico, tabela['descricao_basica'])
-            linhas.append("\n#### 🔗 Contexto no Sistema\n")
-            linhas.append(f"- **Domínio:** {contexto['dominio'].title()}\n")
-            linhas.append(f"- **Tipo de Entidade:** {contexto['tipo_entidade'].title()}\n")
-            linhas.append(f"- **Importância:** {contexto['importancia'].title()}\n")
-            
-            if i < len(self.tabelas):
-                linhas.append("\n---\n")
+            artefatos = artefatos_por_tabela[i - 1] if artefatos_por_tabela else self._gerar_artefatos(tabela)
+            linhas.extend(self._secao_tabela(i, tabela, artefatos))
         
         # Rodapé
         linhas.append("\n---\n")
@@ -246,6 +338,37 @@ class GeradorDescritivosTabelas:
         
         return ''.join(linhas)
     
+    def gerar_relatorio_incremental(self, caminho_saida: str,
+                                    caminho_manifesto: Optional[str] = None,
+                                    titulo: str = "Documentação de Tabelas do Banco de Dados") -> Dict[str, int]:
+        """
+        Gera o relatório regenerando apenas as tabelas cujos metadados mudaram
+        
+        O manifesto guarda, por `nome_logico`, o hash da tabela (mais a versão do
+        gerador) e as partes já geradas. O arquivo só é regravado se alguma
+        tabela foi incluída, alterada ou removida.
+        
+        Returns:
+            Dicionário com total, regenerados, reaproveitados e removidos
+        """
+        manifesto = ManifestoDescritivos(caminho_manifesto or f"{caminho_saida}.manifesto.json",
+                                         VERSAO_GERADOR)
+        artefatos_por_tabela = []
+        
+        for tabela in self.tabelas:
+            hash_tabela = calcular_hash(tabela, VERSAO_GERADOR)
+            artefatos = manifesto.obter(tabela['nome_logico'], hash_tabela)
+            if artefatos is None:
+                artefatos = self._gerar_artefatos(tabela)
+                manifesto.registrar(tabela['nome_logico'], hash_tabela, artefatos)
+            artefatos_por_tabela.append(artefatos)
+        
+        removidos = manifesto.salvar(t['nome_logico'] for t in self.tabelas)
+        if manifesto.regenerados or removidos or not os.path.exists(caminho_saida):
+            gravar_se_alterado(caminho_saida, self.gerar_relatorio_completo(titulo, artefatos_por_tabela))
+        
+        return manifesto.resumo(removidos)
+    
     def _obter_data_atual(self) -> str:
         """Retorna a data atual formatada"""
         return datetime.now().strftime("%d/%m/%Y às %H:%M")
@@ -274,17 +397,15 @@ def main():
     
     # Gerar relatório completo
     print("📝 Gerando documentação completa...")
-    relatorio = gerador.gerar_relatorio_completo(
-        "Documentação Detalhada de Tabelas - Bradesco Saúde"
-    )
-    
-    # Salvar em arquivo
     caminho_saida = '/home/ubuntu/descritivos_tabelas_completo.md'
-    with open(caminho_saida, 'w', encoding='utf-8') as f:
-        f.write(relatorio)
+    resumo = gerador.gerar_relatorio_incremental(
+        caminho_saida,
+        titulo="Documentação Detalhada de Tabelas - Bradesco Saúde"
+    )
     
     print(f"✓ Documentação gerada com sucesso!")
     print(f"✓ Arquivo salvo: {caminho_saida}")
+    print(f"✓ {resumo['regenerados']} tabelas regeneradas, {resumo['reaproveitados']} reaproveitadas do manifesto")
     print()
     print("=" * 80)
     print("PROCESSO CONCLUÍDO COM SUCESSO!")
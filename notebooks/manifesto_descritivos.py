@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifesto de Hashes para Regeneração Incremental de Descritivos
+Guarda, por campo/tabela, o hash dos metadados de entrada e o resultado gerado
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+
+def calcular_hash(dados: Any, versao: str) -> str:
+    """Hash estável dos metadados de entrada combinados com a versão do gerador"""
+    conteudo = json.dumps(dados, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{versao}\x00{conteudo}".encode('utf-8')).hexdigest()
+
+
+def gravar_se_alterado(caminho: str, conteudo: str) -> bool:
+    """Grava o arquivo de forma atômica apenas se o conteúdo mudou"""
+    if os.path.exists(caminho):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            if f.read() == conteudo:
+                return False
+
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+    return True
+
+
+class ManifestoDescritivos:
+    """Manifesto persistido em JSON com hash e resultado de cada entrada documentada"""
+
+    def __init__(self, caminho: str, versao: str):
+        self.caminho = caminho
+        self.versao = versao
+        self.entradas: Dict[str, Dict] = {}
+        self.regenerados = 0
+        self.reaproveitados = 0
+
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            # Mudança de versão do gerador invalida todo o manifesto
+            if dados.get('versao') == versao:
+                self.entradas = dados.get('entradas', {})
+
+    def obter(self, chave: str, hash_entrada: str) -> Optional[Any]:
+        """Retorna o resultado salvo se o hash da entrada não mudou"""
+        entrada = self.entradas.get(chave)
+        if entrada is not None and entrada['hash'] == hash_entrada:
+            self.reaproveitados += 1
+            return entrada['resultado']
+        return None
+
+    def registrar(self, chave: str, hash_entrada: str, resultado: Any):
+        """Registra o resultado recém-gerado de uma entrada"""
+        self.entradas[chave] = {'hash': hash_entrada, 'resultado': resultado}
+        self.regenerados += 1
+
+    def salvar(self, chaves_ativas: Iterable[str]) -> int:
+        """Remove entradas que saíram do catálogo, grava o manifesto e retorna quantas foram removidas"""
+        ativas = set(chaves_ativas)
+        removidas = [chave for chave in self.entradas if chave not in ativas]
+        for chave in removidas:
+            del self.entradas[chave]
+
+        gravar_se_alterado(self.caminho, json.dumps(
+            {'versao': self.versao, 'entradas': self.entradas},
+            ensure_ascii=False, indent=1, default=str
+        ))
+        return len(removidas)
+
+    def resumo(self, removidos: int = 0) -> Dict[str, int]:
+        return {
+            'total': self.regenerados + self.reaproveitados,
+            'regenerados': self.regenerados,
+            'reaproveitados': self.reaproveitados,
+            'removidos': removidos,
+        }
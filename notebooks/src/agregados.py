@@ -0,0 +1,150 @@
+# e:\engDados-Solucoes\notebooks\src\agregados.py
+"""
+Agregados materializados de vendas (orders + order_items) em Parquet, particionados pelo
+período de `order_date`. Cada partição guarda uma impressão digital das linhas de origem;
+`atualizar` faz upsert das partições recebidas (recalcula só as novas ou alteradas) e os relatórios
+leem os agregados prontos; remoção só quando pedida.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# nome -> dimensões do group-by e medidas {saída: (coluna, função)}
+AGREGADOS = {
+    "receita_loja_dia": {
+        "por": ["store_id", "order_date"],
+        "medidas": {"receita": ("receita", "sum"), "quantidade": ("quantity", "sum"), "pedidos": ("order_id", "nunique")},
+    },
+    "receita_produto_dia": {
+        "por": ["product_id", "order_date"],
+        "medidas": {"receita": ("receita", "sum"), "quantidade": ("quantity", "sum")},
+    },
+    "receita_dia": {
+        "por": ["order_date"],
+        "medidas": {"receita": ("receita", "sum"), "itens": ("item_id", "count"), "pedidos": ("order_id", "nunique")},
+    },
+}
+
+# "M" = uma partição por mês de order_date; "D" = por dia
+GRANULARIDADES = {"M": "%Y-%m", "D": "%Y-%m-%d"}
+
+
+def particao_pedidos(orders: pd.DataFrame, granularidade: str = "M") -> pd.Series:
+    return pd.to_datetime(orders["order_date"]).dt.strftime(GRANULARIDADES[granularidade])
+
+
+def impressoes_particoes(orders: pd.DataFrame, order_items: pd.DataFrame, particoes: pd.Series) -> dict[str, str]:
+    """Impressão digital por partição: soma dos hashes das linhas de pedidos e itens (independe da ordem)."""
+    linha_pedido = pd.Series(particoes.to_numpy(), index=orders["order_id"].to_numpy())
+    particao_item = order_items["order_id"].map(linha_pedido)
+    partes = pd.concat([
+        pd.DataFrame({"p": particoes.to_numpy(), "h": pd.util.hash_pandas_object(orders, index=False).to_numpy()}),
+        pd.DataFrame({"p": particao_item.to_numpy(), "h": pd.util.hash_pandas_object(order_items, index=False).to_numpy()}),
+    ]).dropna(subset=["p"])
+    return {p: f"{int(h.to_numpy().sum(dtype=np.uint64)):016x}-{len(h)}" for p, h in partes.groupby("p")["h"]}
+
+
+def preparar_fatos(orders: pd.DataFrame, order_items: pd.DataFrame) -> pd.DataFrame:
+    fatos = order_items.merge(orders, on="order_id", how="inner")
+    fatos["receita"] = fatos["list_price"] * fatos["quantity"] * (1 - fatos["discount"])
+    return fatos
+
+
+def _hash_definicao(definicao: dict) -> str:
+    return hashlib.sha256(json.dumps(definicao, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class CacheAgregados:
+    """Agregados em `<raiz>/<nome>/particao=<p>.parquet` + `<raiz>/_estado.json` com as impressões."""
+
+    def __init__(self, raiz: str, definicoes: dict | None = None, granularidade: str = "M"):
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(f"granularidade deve ser uma de {sorted(GRANULARIDADES)}.")
+        self.raiz, self.definicoes, self.granularidade = raiz, definicoes or AGREGADOS, granularidade
+        self.caminho_estado = os.path.join(raiz, "_estado.json")
+        self.estado = {"granularidade": granularidade, "particoes": {}, "definicoes": {}}
+        if os.path.exists(self.caminho_estado):
+            with open(self.caminho_estado, encoding="utf-8") as f:
+                salvo = json.load(f)
+            if salvo.get("granularidade") == granularidade:
+                self.estado = salvo
+
+    def _arquivo(self, nome: str, particao: str) -> str:
+        return os.path.join(self.raiz, nome, f"particao={particao}.parquet")
+
+    def atualizar(self, orders: pd.DataFrame, order_items: pd.DataFrame, completo: bool = False,
+                  remover: list[str] | None = None) -> dict:
+        """
+        Upsert por partição: cada partição presente em `orders` deve vir completa (todos os pedidos
+        do período e seus itens); só elas são comparadas e recalculadas se mudaram. Partições
+        ausentes da entrada ficam intactas. Para apagar, passe `remover=[...]` ou, com a carga
+        inteira, `completo=True` (remove as partições que não vieram). Agregado novo ou com
+        definição alterada precisa de `completo=True`, pois é recalculado em todas as partições.
+        """
+        particoes = particao_pedidos(orders, self.granularidade)
+        pedidos = order_items["order_id"].isin(orders["order_id"]).to_numpy()
+        order_items = order_items[pedidos] if not pedidos.all() else order_items
+        impressoes = impressoes_particoes(orders, order_items, particoes)
+        anteriores = self.estado["particoes"]
+        alteradas = {p for p, h in impressoes.items() if anteriores.get(p) != h}
+        removidas = set(remover or ()) | (set(anteriores) - set(impressoes) if completo else set())
+        removidas &= set(anteriores)
+
+        hashes = {nome: _hash_definicao(d) for nome, d in self.definicoes.items()}
+        redefinidos = {nome for nome, h in hashes.items() if self.estado["definicoes"].get(nome) != h}
+        if redefinidos and anteriores and not completo:
+            raise ValueError(f"agregados novos ou redefinidos {sorted(redefinidos)} exigem completo=True.")
+        recalcular = {nome: (set(impressoes) if nome in redefinidos else alteradas) - removidas for nome in self.definicoes}
+
+        todas = set().union(*recalcular.values()) if recalcular else set()
+        if todas:
+            selecao = particoes.isin(todas).to_numpy()
+            fatos = preparar_fatos(orders[selecao], order_items)
+            fatos["particao"] = particao_pedidos(fatos, self.granularidade)
+            for nome, definicao in self.definicoes.items():
+                self._materializar(nome, definicao, fatos[fatos["particao"].isin(recalcular[nome])], recalcular[nome])
+        for nome in self.definicoes:
+            for p in removidas:
+                if os.path.exists(self._arquivo(nome, p)):
+                    os.remove(self._arquivo(nome, p))
+
+        novas = {**anteriores, **impressoes}
+        self.estado["particoes"] = {p: h for p, h in novas.items() if p not in removidas}
+        self.estado["definicoes"] = {**self.estado["definicoes"], **hashes}
+        os.makedirs(self.raiz, exist_ok=True)
+        temporario = f"{self.caminho_estado}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, indent=1)
+        os.replace(temporario, self.caminho_estado)
+        return {"particoes": len(self.estado["particoes"]), "alteradas": sorted(alteradas - removidas),
+                "removidas": sorted(removidas), "redefinidos": sorted(redefinidos)}
+
+    def _materializar(self, nome: str, definicao: dict, fatos: pd.DataFrame, particoes: set[str]):
+        os.makedirs(os.path.join(self.raiz, nome), exist_ok=True)
+        agregado = fatos.groupby(["particao", *definicao["por"]], sort=True).agg(**definicao["medidas"]).reset_index()
+        for p, grupo in agregado.groupby("particao", sort=False):
+            temporario = f"{self._arquivo(nome, p)}.tmp"
+            grupo.drop(columns="particao").to_parquet(temporario, index=False)
+            os.replace(temporario, self._arquivo(nome, p))
+        for p in particoes - set(agregado["particao"]):  # partição ficou sem itens
+            if os.path.exists(self._arquivo(nome, p)):
+                os.remove(self._arquivo(nome, p))
+
+    def particoes(self, nome: str) -> list[str]:
+        pasta = os.path.join(self.raiz, nome)
+        if not os.path.isdir(pasta):
+            return []
+        return sorted(a[len("particao="):-len(".parquet")] for a in os.listdir(pasta) if a.endswith(".parquet"))
+
+    def ler(self, nome: str, inicio: str | None = None, fim: str | None = None,
+            colunas: list[str] | None = None) -> pd.DataFrame:
+        """Lê o agregado, opcionalmente só as partições em [inicio, fim] (ex.: '2017-01', '2017-06')."""
+        selecionadas = [p for p in self.particoes(nome) if (inicio is None or p >= inicio) and (fim is None or p <= fim)]
+        if not selecionadas:
+            d = self.definicoes[nome]
+            return pd.DataFrame(columns=colunas or [*d["por"], *d["medidas"]])
+        return pd.concat([pd.read_parquet(self._arquivo(nome, p), columns=colunas) for p in selecionadas],
+                         ignore_index=True)
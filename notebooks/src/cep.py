@@ -0,0 +1,51 @@
+# e:\engDados-Solucoes\notebooks\src\cep.py
+"""
+Enriquecimento por CEP com faixas ordenadas (DEPARA_CEP.parquet) e `np.searchsorted`.
+O depara é carregado uma vez em arrays int32 compactos; lotes inteiros são resolvidos
+sem `pd.merge`. `salvar`/`carregar(mmap=True)` compartilham o índice entre processos.
+"""
+import numpy as np
+import pandas as pd
+
+from src.faixas import IndiceFaixas
+
+COLUNA_INICIO = "Faixa de CEP Inicial"
+COLUNA_FIM = "Faixa de CEP final"
+
+
+def cep_para_int(ceps) -> np.ndarray:
+    """CEPs texto ('01310-100', '1310100', 1310100) -> int32; inválidos viram -1."""
+    serie = pd.Series(ceps, copy=False)
+    if not pd.api.types.is_numeric_dtype(serie):
+        serie = pd.to_numeric(serie.astype("string").str.replace(r"\D", "", regex=True), errors="coerce")
+    serie = serie.where((serie >= 0) & (serie <= 99_999_999))
+    return serie.fillna(-1).to_numpy(dtype=np.int32)
+
+
+class IndiceCEP(IndiceFaixas):
+    """Faixas de CEP (int32) com os atributos do depara (estado, região...) como categorias."""
+
+    @classmethod
+    def do_depara(cls, depara: pd.DataFrame, coluna_inicio: str = COLUNA_INICIO, coluna_fim: str = COLUNA_FIM,
+                  colunas: list[str] | None = None) -> "IndiceCEP":
+        colunas = colunas or [c for c in depara.columns if c not in {coluna_inicio, coluna_fim}]
+        inicios, fins = cep_para_int(depara[coluna_inicio]), cep_para_int(depara[coluna_fim])
+        validas = (inicios >= 0) & (fins >= inicios)
+        return cls.de_faixas(inicios[validas], fins[validas], depara.loc[validas, colunas])
+
+    @classmethod
+    def de_parquet(cls, caminho: str, **kwargs) -> "IndiceCEP":
+        return cls.do_depara(pd.read_parquet(caminho), **kwargs)
+
+    def resolver(self, ceps) -> np.ndarray:
+        """Posição da faixa de cada CEP no índice (-1 se fora de todas as faixas)."""
+        ceps = ceps if isinstance(ceps, np.ndarray) and ceps.dtype == np.int32 else cep_para_int(ceps)
+        return self.posicoes(ceps, ceps >= 0)
+
+    def enriquecer(self, df: pd.DataFrame, coluna_cep: str, colunas: list[str] | None = None,
+                   sufixo: str = "") -> pd.DataFrame:
+        """Acrescenta ao lote os atributos do depara (como `category`), sem merge."""
+        out = df.copy()
+        for c, valores in self.atributos(self.resolver(df[coluna_cep]), colunas).items():
+            out[f"{c}{sufixo}"] = valores
+        return out
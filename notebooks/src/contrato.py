@@ -1,13 +1,26 @@
 # e:\engDados-Solucoes\notebooks\src\contrato.py
-import pandera.pandas as pa
-
-schema_entrada = pa.DataFrameSchema({
-    "val1": pa.Column(float, coerce=True, nullable=True),
-    "val2": pa.Column(float, coerce=True, nullable=True),
-})
-
-schema_saida = pa.DataFrameSchema({
-    "val1": pa.Column(float, nullable=True),
-    "val2": pa.Column(float, nullable=True),
-    "val3": pa.Column(float, nullable=True),  # pode ser NaN se zero/zero
-})
\ No newline at end of file
+# pandera só é importado no primeiro acesso a schema_entrada/schema_saida (PEP 562)
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _schemas() -> dict:
+    import pandera.pandas as pa
+
+    return {
+        "schema_entrada": pa.DataFrameSchema({
+            "val1": pa.Column(float, coerce=True, nullable=True),
+            "val2": pa.Column(float, coerce=True, nullable=True),
+        }),
+        "schema_saida": pa.DataFrameSchema({
+            "val1": pa.Column(float, nullable=True),
+            "val2": pa.Column(float, nullable=True),
+            "val3": pa.Column(float, nullable=True),  # pode ser NaN se zero/zero
+        }),
+    }
+
+
+def __getattr__(nome: str):
+    if nome in {"schema_entrada", "schema_saida"}:
+        return _schemas()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
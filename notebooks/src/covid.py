@@ -0,0 +1,144 @@
+# e:\engDados-Solucoes\notebooks\src\covid.py
+"""
+Snapshots COVID (09.AnalyticsCovid) com download paralelo e cache local endereçado por
+chave S3 + ETag. Cada .pkl é convertido uma única vez para Parquet (lido com o unpickler restrito
+de src.ingestao: o arquivo vem da rede) e só é lido quando a data é selecionada; apenas os últimos
+`max_em_memoria` DataFrames ficam em memória.
+"""
+import hashlib
+import os
+import re
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+BASE_URL = "https://covid19br.s3-sa-east-1.amazonaws.com"
+MESES = ["jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez"]
+TAMANHO_BLOCO = 1 << 20
+
+
+def data_snapshot(chave: str) -> date | None:
+    """'pkl/HIST_PAINEL_COVIDBR_05jun2020.xlsx.pkl' -> date(2020, 6, 5); None se a chave não segue o padrão."""
+    partes = re.match(r"^.*COVIDBR_(\d{2})([a-z]{3})(\d{4})\.xlsx\.pkl$", chave)
+    if partes is None or partes.group(2) not in MESES:
+        return None
+    try:
+        return date(int(partes.group(3)), MESES.index(partes.group(2)) + 1, int(partes.group(1)))
+    except ValueError:  # ex.: 31fev2020
+        return None
+
+
+def _texto(elemento, nome: str) -> str | None:
+    filho = elemento.find(f"{{*}}{nome}")
+    if filho is None:
+        filho = elemento.find(nome)
+    return None if filho is None else filho.text
+
+
+def listar_snapshots(base_url: str = BASE_URL, prefixo: str = "pkl/", timeout: float = 30) -> list[dict]:
+    """Lista os .pkl do bucket (com paginação) como {chave, etag, tamanho, data}, ordenados por data."""
+    snapshots, marcador = [], None
+    while True:
+        params = {"delimiter": "/", "prefix": prefixo, **({"marker": marcador} if marcador else {})}
+        with urllib.request.urlopen(f"{base_url}/?{urllib.parse.urlencode(params)}", timeout=timeout) as r:
+            raiz = ET.fromstring(r.read())
+        conteudos = raiz.findall("{*}Contents") or raiz.findall("Contents")
+        for c in conteudos:
+            chave = _texto(c, "Key")
+            data = data_snapshot(chave) if chave.endswith(".pkl") else None
+            if data is not None:  # .pkl fora do padrão de nome (cópias, testes) é ignorado
+                snapshots.append({"chave": chave, "etag": (_texto(c, "ETag") or "").strip('"'),
+                                  "tamanho": int(_texto(c, "Size") or 0), "data": data})
+        if (_texto(raiz, "IsTruncated") or "false").lower() != "true" or not conteudos:
+            break
+        marcador = _texto(raiz, "NextMarker") or _texto(conteudos[-1], "Key")
+    return sorted(snapshots, key=lambda s: s["data"])
+
+
+class CacheSnapshots:
+    """Cache em `pasta/<sha256(chave + etag)>.{pkl,parquet}`: ETag novo na origem gera novo download."""
+
+    def __init__(self, pasta: str, base_url: str = BASE_URL, max_em_memoria: int = 2, timeout: float = 60):
+        self.pasta, self.base_url, self.timeout = pasta, base_url, timeout
+        self.max_em_memoria = max_em_memoria
+        self._memoria: OrderedDict = OrderedDict()
+        os.makedirs(pasta, exist_ok=True)
+
+    def _base(self, snapshot: dict) -> str:
+        return os.path.join(self.pasta, hashlib.sha256(f"{snapshot['chave']}\x00{snapshot['etag']}".encode()).hexdigest()[:32])
+
+    def em_cache(self, snapshot: dict) -> bool:
+        base = self._base(snapshot)
+        return os.path.exists(f"{base}.parquet") or os.path.exists(f"{base}.pkl")
+
+    def baixar(self, snapshot: dict) -> str:
+        """Baixa o .pkl em streaming (arquivo temporário + rename atômico) e confere o MD5 do ETag."""
+        destino = f"{self._base(snapshot)}.pkl"
+        if os.path.exists(destino) or os.path.exists(f"{self._base(snapshot)}.parquet"):
+            return destino
+        temporario, md5 = f"{destino}.{os.getpid()}.tmp", hashlib.md5()
+        url = f"{self.base_url}/{urllib.parse.quote(snapshot['chave'])}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as r, open(temporario, "wb") as f:
+            while bloco := r.read(TAMANHO_BLOCO):
+                f.write(bloco); md5.update(bloco)
+        etag = snapshot["etag"]
+        if etag and "-" not in etag and md5.hexdigest() != etag:  # ETag com '-' = upload multipart, não é MD5
+            os.remove(temporario)
+            raise IOError(f"conteúdo de {snapshot['chave']} não confere com o ETag {etag}.")
+        os.replace(temporario, destino)
+        return destino
+
+    def converter(self, snapshot: dict) -> str:
+        """
+        Garante o Parquet do snapshot (baixa e converte na primeira vez; o .pkl é descartado).
+        Pickle com classes fora da lista de src.ingestao levanta UnpicklingError e é apagado do cache.
+        """
+        parquet = f"{self._base(snapshot)}.parquet"
+        if not os.path.exists(parquet):
+            import pickle
+
+            from src.ingestao import ler_pickle_seguro
+
+            pkl = self.baixar(snapshot)
+            try:
+                df = ler_pickle_seguro(pkl)
+            except (pickle.UnpicklingError, TypeError):
+                os.remove(pkl)
+                raise
+            temporario = f"{parquet}.{os.getpid()}.tmp"
+            df.to_parquet(temporario, index=False)
+            os.replace(temporario, parquet)
+            os.remove(pkl)
+        return parquet
+
+    def pre_carregar(self, snapshots: list[dict], processos: int = 8, converter: bool = True) -> list[str]:
+        """Aquece o cache em paralelo (pool limitado); snapshots já em cache não geram requisição."""
+        tarefa = self.converter if converter else self.baixar
+        with ThreadPoolExecutor(max_workers=processos) as executor:
+            return list(executor.map(tarefa, snapshots))
+
+    def carregar(self, snapshot: dict, colunas: list[str] | None = None):
+        """DataFrame do snapshot, lido do Parquet sob demanda e mantido em um LRU pequeno."""
+        import pandas as pd
+
+        chave = (snapshot["chave"], snapshot["etag"], tuple(colunas or ()))
+        if chave in self._memoria:
+            self._memoria.move_to_end(chave)
+            return self._memoria[chave]
+        df = pd.read_parquet(self.converter(snapshot), columns=colunas)
+        self._memoria[chave] = df
+        while len(self._memoria) > self.max_em_memoria:
+            self._memoria.popitem(last=False)
+        return df
+
+    def remover_obsoletos(self, snapshots: list[dict]) -> int:
+        """Apaga arquivos de versões (chave + ETag) que não estão mais na listagem."""
+        ativos = {os.path.basename(self._base(s)) for s in snapshots}
+        removidos = 0
+        for arquivo in os.listdir(self.pasta):
+            if arquivo.split(".")[0] not in ativos:
+                os.remove(os.path.join(self.pasta, arquivo)); removidos += 1
+        return removidos
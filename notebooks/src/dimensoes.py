@@ -0,0 +1,141 @@
+# e:\engDados-Solucoes\notebooks\src\dimensoes.py
+"""
+Manutenção de dimensões Delta com surrogate key incremental (delta-rs, roda sem Spark).
+O próximo valor da SK vem de um high-water-mark persistido ou das estatísticas do log,
+sem `max(sk)` sobre a tabela inteira (notebook 008).
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def _col(alias: str, coluna: str) -> str:
+    return f'{alias}."{coluna}"'
+
+
+def _caminho_hwm(caminho_tabela: str, coluna_sk: str) -> str:
+    # Prefixo "_" para o VACUUM não tratar o arquivo como dado órfão
+    return os.path.join(caminho_tabela, f"_hwm_{coluna_sk}.json")
+
+
+def ler_hwm_estatisticas(dt, coluna_sk: str) -> int:
+    """
+    Maior SK segundo as estatísticas max dos arquivos ativos (só lê o log). Arquivos sem a
+    estatística (coleta desligada, coluna além de dataSkippingNumIndexedCols, checkpoints
+    antigos) têm só a coluna SK lida, para nunca reemitir uma SK existente.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    acoes = pa.table(dt.get_add_actions(flatten=True)).to_pydict()  # pyarrow ou arro3 (deltalake >= 1.0)
+    maximos = acoes.get(f"max.{coluna_sk}", [None] * len(acoes["path"]))
+    sem_estatistica = {p for p, m, n in zip(acoes["path"], maximos, acoes["num_records"]) if m is None and n != 0}
+    valores = [int(m) for m in maximos if m is not None]
+    if sem_estatistica:
+        for fragmento in dt.to_pyarrow_dataset().get_fragments():
+            if any(fragmento.path.endswith(p) for p in sem_estatistica):
+                maximo = pc.max(fragmento.to_table(columns=[coluna_sk]).column(0)).as_py()
+                if maximo is not None:
+                    valores.append(int(maximo))
+    return max(valores, default=0)
+
+
+def ler_hwm(dt, caminho_tabela: str, coluna_sk: str) -> int:
+    """High-water-mark da SK: arquivo persistido se estiver em dia com a versão da tabela, senão estatísticas."""
+    caminho = _caminho_hwm(caminho_tabela, coluna_sk)
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            salvo = json.load(f)
+        if salvo.get("versao") == dt.version():
+            return int(salvo["valor"])
+        # Tabela alterada por outro processo: nunca reutilizar uma SK já emitida
+        return max(int(salvo["valor"]), ler_hwm_estatisticas(dt, coluna_sk))
+    return ler_hwm_estatisticas(dt, coluna_sk)
+
+
+def gravar_hwm(caminho_tabela: str, coluna_sk: str, valor: int, versao: int) -> None:
+    caminho = _caminho_hwm(caminho_tabela, coluna_sk)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump({"valor": int(valor), "versao": int(versao)}, f)
+    os.replace(temporario, caminho)
+
+
+def atualizar_dimensao(
+    caminho_tabela: str,
+    fonte: pd.DataFrame,
+    chave_natural: str,
+    coluna_sk: str,
+    colunas_atributo: list[str] | None = None,
+    coluna_atualizacao: str | None = "data_atualizacao",
+) -> dict:
+    """
+    Aplica `fonte` na dimensão Delta em `caminho_tabela` (cria a tabela se não existir).
+
+    - deduplica apenas o lote de entrada pela chave natural (última ocorrência vence);
+    - consulta na dimensão só as colunas chave natural/SK dos membros do lote;
+    - atribui SKs sequenciais, em bloco, apenas aos membros novos;
+    - executa um único MERGE: atualiza atributos alterados e insere os novos.
+
+    Retorna métricas: inseridos, atualizados (segundo o MERGE) e hwm.
+    """
+    from deltalake import DeltaTable, write_deltalake
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if colunas_atributo is None:
+        colunas_atributo = [c for c in fonte.columns if c not in {chave_natural, coluna_sk, coluna_atualizacao}]
+    lote = fonte[[chave_natural, *colunas_atributo]].drop_duplicates(subset=[chave_natural], keep="last")
+    lote = lote.reset_index(drop=True)
+    if coluna_atualizacao:
+        lote[coluna_atualizacao] = pd.Timestamp.now(tz="UTC")
+
+    if not DeltaTable.is_deltatable(caminho_tabela):
+        lote[coluna_sk] = np.arange(1, len(lote) + 1, dtype="int64")
+        write_deltalake(caminho_tabela, pa.Table.from_pandas(lote, preserve_index=False))
+        gravar_hwm(caminho_tabela, coluna_sk, len(lote), DeltaTable(caminho_tabela).version())
+        return {"inseridos": len(lote), "atualizados": 0, "hwm": len(lote)}
+
+    dt = DeltaTable(caminho_tabela)
+    hwm = ler_hwm(dt, caminho_tabela, coluna_sk)
+
+    # Projeção + filtro: lê só as chaves do lote, não a dimensão inteira
+    existentes = dt.to_pyarrow_dataset().to_table(
+        columns=[chave_natural, coluna_sk],
+        filter=ds.field(chave_natural).isin(pa.array(lote[chave_natural])),
+    ).to_pandas()
+    mapa_sk = pd.Series(existentes[coluna_sk].to_numpy(), index=existentes[chave_natural].to_numpy())
+
+    sk = lote[chave_natural].map(mapa_sk)
+    novos = sk.isna().to_numpy()
+    novo_hwm = hwm + int(novos.sum())
+    sk.loc[novos] = np.arange(hwm + 1, novo_hwm + 1, dtype="int64")
+    lote[coluna_sk] = sk.astype("int64")
+
+    alterado = " OR ".join(
+        f"{_col('target', c)} IS DISTINCT FROM {_col('source', c)}" for c in colunas_atributo
+    ) or None
+    atualizacoes = {c: _col("source", c) for c in colunas_atributo}
+    if coluna_atualizacao:
+        atualizacoes[coluna_atualizacao] = _col("source", coluna_atualizacao)
+
+    metricas = (
+        dt.merge(
+            source=pa.Table.from_pandas(lote, preserve_index=False),
+            predicate=f"{_col('target', chave_natural)} = {_col('source', chave_natural)}",
+            source_alias="source",
+            target_alias="target",
+        )
+        .when_matched_update(updates=atualizacoes, predicate=alterado)
+        .when_not_matched_insert(updates={c: _col("source", c) for c in lote.columns})
+        .execute()
+    )
+
+    gravar_hwm(caminho_tabela, coluna_sk, novo_hwm, DeltaTable(caminho_tabela).version())
+    return {
+        "inseridos": int(metricas.get("num_target_rows_inserted", novos.sum())),
+        "atualizados": int(metricas.get("num_target_rows_updated", 0)),
+        "hwm": novo_hwm,
+    }
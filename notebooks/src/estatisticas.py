@@ -0,0 +1,355 @@
+# e:\engDados-Solucoes\notebooks\src\estatisticas.py
+"""
+Estatísticas incrementais e mescláveis para histogramas e boxplots.
+Atualizadas por lote (record batches, row groups Parquet, partições Spark) e combinadas com
+`mesclar`, sem coletar os valores brutos; `para_dict`/`de_dict` serializam entre processos.
+"""
+import math
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+MAX_EXTREMOS = 500
+
+
+def _valores(lote) -> np.ndarray:
+    """Converte lote (Series, array PyArrow, ndarray, lista) em float64, descartando nulos e não finitos."""
+    if hasattr(lote, "to_pandas") and not isinstance(lote, pd.Series):
+        lote = lote.to_pandas()  # pyarrow.Array / ChunkedArray
+    if isinstance(lote, pd.Series) and not pd.api.types.is_numeric_dtype(lote):
+        lote = pd.to_numeric(lote, errors="coerce")
+    v = np.asarray(lote, dtype="float64")
+    return v[np.isfinite(v)]
+
+
+class HistogramaFixo:
+    """Histograma de bordas fixas; contagens de lotes diferentes somam diretamente."""
+
+    def __init__(self, minimo: float, maximo: float, bins: int = 20):
+        if not maximo > minimo:
+            maximo = minimo + 1.0
+        self.bordas = np.linspace(minimo, maximo, bins + 1)
+        self.contagens = np.zeros(bins, dtype=np.int64)
+        self.abaixo = self.acima = self.nulos = 0
+
+    def atualizar(self, lote) -> "HistogramaFixo":
+        total = len(lote)
+        v = _valores(lote)
+        self.nulos += total - len(v)
+        self.abaixo += int((v < self.bordas[0]).sum())
+        self.acima += int((v > self.bordas[-1]).sum())
+        self.contagens += np.histogram(v, bins=self.bordas)[0]
+        return self
+
+    def mesclar(self, outro: "HistogramaFixo") -> "HistogramaFixo":
+        if not np.array_equal(self.bordas, outro.bordas):
+            raise ValueError("só é possível mesclar histogramas com as mesmas bordas.")
+        self.contagens += outro.contagens
+        self.abaixo += outro.abaixo; self.acima += outro.acima; self.nulos += outro.nulos
+        return self
+
+    @classmethod
+    def de_valores(cls, valores, bins: int = 20) -> "HistogramaFixo":
+        v = _valores(valores)
+        minimo, maximo = (float(v.min()), float(v.max())) if len(v) else (0.0, 1.0)
+        return cls(minimo, maximo, bins).atualizar(v)
+
+    def para_dict(self) -> dict:
+        return {"bordas": self.bordas.tolist(), "contagens": self.contagens.tolist(),
+                "abaixo": self.abaixo, "acima": self.acima, "nulos": self.nulos}
+
+    @classmethod
+    def de_dict(cls, d: dict) -> "HistogramaFixo":
+        h = cls(d["bordas"][0], d["bordas"][-1], len(d["contagens"]))
+        h.bordas = np.asarray(d["bordas"], dtype="float64")
+        h.contagens = np.asarray(d["contagens"], dtype=np.int64)
+        h.abaixo, h.acima, h.nulos = d["abaixo"], d["acima"], d["nulos"]
+        return h
+
+
+class EsbocoQuantis:
+    """
+    Esboço de quantis com erro relativo `alfa` (DDSketch): buckets logarítmicos cujas contagens
+    somam na mescla. Também guarda min/max exatos e os MAX_EXTREMOS menores/maiores valores,
+    usados como outliers desenhados no boxplot.
+    """
+
+    def __init__(self, alfa: float = 0.01):
+        self.alfa = alfa
+        self._ln_gama = math.log((1 + alfa) / (1 - alfa))
+        self.positivos: dict[int, int] = {}
+        self.negativos: dict[int, int] = {}
+        self.zeros = self.n = self.nulos = 0
+        self.minimo, self.maximo = math.inf, -math.inf
+        self.menores = np.empty(0); self.maiores = np.empty(0)
+
+    def _indices(self, v: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(v) / self._ln_gama).astype(np.int64)
+
+    def _valor(self, k: np.ndarray) -> np.ndarray:
+        gama = math.exp(self._ln_gama)
+        return 2 * np.power(gama, k.astype("float64")) / (gama + 1)
+
+    @staticmethod
+    def _somar(destino: dict, chaves, contagens):
+        for k, c in zip(chaves.tolist(), contagens.tolist()):
+            destino[k] = destino.get(k, 0) + c
+
+    def atualizar(self, lote) -> "EsbocoQuantis":
+        total = len(lote)
+        v = _valores(lote)
+        self.nulos += total - len(v)
+        if not len(v):
+            return self
+        self.n += len(v)
+        self.minimo = min(self.minimo, float(v.min())); self.maximo = max(self.maximo, float(v.max()))
+        pos, neg = v[v > 1e-12], -v[v < -1e-12]
+        self.zeros += len(v) - len(pos) - len(neg)
+        self._somar(self.positivos, *np.unique(self._indices(pos), return_counts=True))
+        self._somar(self.negativos, *np.unique(self._indices(neg), return_counts=True))
+        self._guardar_extremos(v)
+        return self
+
+    def _guardar_extremos(self, v: np.ndarray):
+        menores = np.concatenate([self.menores, v]); maiores = np.concatenate([self.maiores, v])
+        if len(menores) > MAX_EXTREMOS:
+            menores = np.partition(menores, MAX_EXTREMOS - 1)[:MAX_EXTREMOS]
+            maiores = np.partition(maiores, len(maiores) - MAX_EXTREMOS)[-MAX_EXTREMOS:]
+        self.menores, self.maiores = np.sort(menores), np.sort(maiores)
+
+    def mesclar(self, outro: "EsbocoQuantis") -> "EsbocoQuantis":
+        if outro.alfa != self.alfa:
+            raise ValueError("só é possível mesclar esboços com o mesmo alfa.")
+        for destino, origem in ((self.positivos, outro.positivos), (self.negativos, outro.negativos)):
+            for k, c in origem.items():
+                destino[k] = destino.get(k, 0) + c
+        self.zeros += outro.zeros; self.n += outro.n; self.nulos += outro.nulos
+        self.minimo = min(self.minimo, outro.minimo); self.maximo = max(self.maximo, outro.maximo)
+        self.menores = np.sort(np.concatenate([self.menores, outro.menores]))[:MAX_EXTREMOS]
+        self.maiores = np.sort(np.concatenate([self.maiores, outro.maiores]))[-MAX_EXTREMOS:]
+        return self
+
+    def _ordenado(self) -> tuple[np.ndarray, np.ndarray]:
+        """Valores representativos em ordem crescente e contagens acumuladas."""
+        kn = np.array(sorted(self.negativos, reverse=True), dtype=np.int64)
+        kp = np.array(sorted(self.positivos), dtype=np.int64)
+        valores = np.concatenate([-self._valor(kn), [0.0] if self.zeros else [], self._valor(kp)])
+        contagens = np.array([self.negativos[k] for k in kn.tolist()] + ([self.zeros] if self.zeros else [])
+                             + [self.positivos[k] for k in kp.tolist()], dtype=np.int64)
+        return valores, np.cumsum(contagens)
+
+    def quantis(self, qs) -> np.ndarray:
+        qs = np.atleast_1d(np.asarray(qs, dtype="float64"))
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        valores, acumulado = self._ordenado()
+        posicoes = np.searchsorted(acumulado, qs * (self.n - 1), side="right")
+        return np.clip(valores[np.minimum(posicoes, len(valores) - 1)], self.minimo, self.maximo)
+
+    def contar_menores(self, x: float) -> int:
+        """Quantidade aproximada de valores menores que x (resolução do bucket)."""
+        if not self.n:
+            return 0
+        valores, acumulado = self._ordenado()
+        i = np.searchsorted(valores, x, side="left")
+        return int(acumulado[i - 1]) if i else 0
+
+    def mediana_mad(self) -> tuple[float, float]:
+        """Mediana e MAD (mediana de |x - mediana|) calculados sobre os buckets."""
+        if not self.n:
+            return math.nan, math.nan
+        valores, acumulado = self._ordenado()
+        mediana = float(self.quantis(0.5)[0])
+        distancias = np.abs(valores - mediana)
+        ordem = np.argsort(distancias, kind="stable")
+        acumulado = np.cumsum(np.diff(acumulado, prepend=0)[ordem])
+        i = min(int(np.searchsorted(acumulado, (self.n - 1) / 2, side="right")), len(ordem) - 1)
+        return mediana, float(distancias[ordem[i]])
+
+    def boxplot(self, rotulo: str) -> dict:
+        """Estatísticas no formato de `Axes.bxp` (whiskers 1.5*IQR), sem os valores brutos."""
+        if not self.n:
+            return {"label": rotulo, "med": np.nan, "q1": np.nan, "q3": np.nan,
+                    "whislo": np.nan, "whishi": np.nan, "fliers": [], "n_outliers": 0}
+        q1, med, q3 = self.quantis([0.25, 0.5, 0.75])
+        lo, hi = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        n_abaixo, n_acima = self.contar_menores(lo), self.n - self.contar_menores(np.nextafter(hi, np.inf))
+        # Enquanto os outliers cabem nos extremos guardados, whiskers e contagens são exatos
+        if (self.menores < lo).sum() < len(self.menores) or len(self.menores) == self.n:
+            n_abaixo = int((self.menores < lo).sum())
+            whislo = float(self.menores[self.menores >= lo].min())
+        else:
+            whislo = float(max(lo, self.quantis(n_abaixo / max(self.n - 1, 1))[0]))
+        if (self.maiores > hi).sum() < len(self.maiores) or len(self.maiores) == self.n:
+            n_acima = int((self.maiores > hi).sum())
+            whishi = float(self.maiores[self.maiores <= hi].max())
+        else:
+            whishi = float(min(hi, self.quantis((self.n - 1 - n_acima) / max(self.n - 1, 1))[0]))
+        fliers = np.concatenate([self.menores[self.menores < lo], self.maiores[self.maiores > hi]])
+        return {"label": rotulo, "med": med, "q1": q1, "q3": q3, "whislo": whislo, "whishi": whishi,
+                "fliers": np.unique(fliers), "n_outliers": n_abaixo + n_acima}
+
+    def para_dict(self) -> dict:
+        return {"alfa": self.alfa, "positivos": {str(k): c for k, c in self.positivos.items()},
+                "negativos": {str(k): c for k, c in self.negativos.items()}, "zeros": self.zeros,
+                "n": self.n, "nulos": self.nulos, "minimo": self.minimo, "maximo": self.maximo,
+                "menores": self.menores.tolist(), "maiores": self.maiores.tolist()}
+
+    @classmethod
+    def de_dict(cls, d: dict) -> "EsbocoQuantis":
+        e = cls(d["alfa"])
+        e.positivos = {int(k): c for k, c in d["positivos"].items()}
+        e.negativos = {int(k): c for k, c in d["negativos"].items()}
+        e.zeros, e.n, e.nulos = d["zeros"], d["n"], d["nulos"]
+        e.minimo, e.maximo = d["minimo"], d["maximo"]
+        e.menores, e.maiores = np.asarray(d["menores"]), np.asarray(d["maiores"])
+        return e
+
+
+class EsbocoGrupos:
+    """
+    Um esboço DDSketch (erro relativo `alfa`) por grupo (ex.: conta), todos em dois arrays
+    esparsos ordenados: chave (grupo, bucket) -> contagem. A memória cresce com os pares
+    (grupo, bucket) usados, não com grupos x bins. Garantias por grupo: mediana com erro relativo
+    <= `alfa` sobre o valor exato de posição (n-1)//2; MAD com erro absoluto <= alfa * (max|x| +
+    |mediana|), pois cada distância é medida entre representantes (na prática, perto de `alfa` relativo).
+    """
+
+    def __init__(self, alfa: float = 0.01):
+        self.alfa = alfa
+        self._ln_gama = math.log((1 + alfa) / (1 - alfa))
+        self._m = math.ceil(710 / self._ln_gama) + 1  # |índice| máximo de um float64 positivo
+        self.largura = 4 * self._m + 3  # negativos [0, 2m], zero 2m+1, positivos [2m+2, 4m+2]
+        self.chaves = np.empty(0, dtype=np.int64)
+        self.contagens = np.empty(0, dtype=np.int64)
+        self.n_grupos = 0
+
+    def __len__(self) -> int:
+        return self.n_grupos
+
+    @property
+    def nbytes(self) -> int:
+        return self.chaves.nbytes + self.contagens.nbytes
+
+    def _posicoes(self, v: np.ndarray) -> np.ndarray:
+        """Posição do bucket de cada valor, crescente com o valor."""
+        k = np.ceil(np.log(np.maximum(np.abs(v), 1e-300)) / self._ln_gama).astype(np.int64)
+        return np.where(v > 1e-12, 3 * self._m + 2 + k, np.where(v < -1e-12, self._m - k, 2 * self._m + 1))
+
+    def _valores(self, p: np.ndarray) -> np.ndarray:
+        gama = math.exp(self._ln_gama)
+        with np.errstate(over="ignore"):  # cada ramo é avaliado para todas as posições
+            positivo = 2 * np.power(gama, (p - 3 * self._m - 2).astype("float64")) / (gama + 1)
+            negativo = -2 * np.power(gama, (self._m - p).astype("float64")) / (gama + 1)
+            return np.where(p > 2 * self._m + 1, positivo, np.where(p < 2 * self._m + 1, negativo, 0.0))
+
+    def atualizar(self, grupos: np.ndarray, lote) -> "EsbocoGrupos":
+        v = np.asarray(lote, dtype="float64")
+        finitos = np.isfinite(v)
+        grupos, v = np.asarray(grupos, dtype=np.int64)[finitos], v[finitos]
+        if not len(grupos):
+            return self
+        self.n_grupos = max(self.n_grupos, int(grupos.max()) + 1)
+        novas, contagens = np.unique(grupos * self.largura + self._posicoes(v), return_counts=True)
+        pos = np.searchsorted(self.chaves, novas)
+        existe = pos < len(self.chaves)
+        existe[existe] = self.chaves[pos[existe]] == novas[existe]
+        self.contagens[pos[existe]] += contagens[existe]
+        self.chaves = np.insert(self.chaves, pos[~existe], novas[~existe])
+        self.contagens = np.insert(self.contagens, pos[~existe], contagens[~existe])
+        return self
+
+    @staticmethod
+    def _primeiro_acima(contagens: np.ndarray, segmento: np.ndarray, inicios: np.ndarray, limite: np.ndarray):
+        """Índice (global) do primeiro bucket de cada segmento cuja contagem acumulada passa do limite."""
+        acumulado = np.cumsum(contagens)
+        antes = np.concatenate([[0], acumulado])[inicios]
+        acima = (acumulado - antes[segmento]) > limite[segmento]
+        return np.minimum.reduceat(np.where(acima, np.arange(len(contagens)), len(contagens)), inicios)
+
+    def mediana_mad(self, grupos: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(mediana, MAD, n) de cada grupo pedido (grupos distintos); NaN para grupos sem valores."""
+        grupos = np.asarray(grupos, dtype=np.int64)
+        ini = np.searchsorted(self.chaves, grupos * self.largura)
+        fim = np.searchsorted(self.chaves, (grupos + 1) * self.largura)
+        tamanhos = fim - ini
+        mediana, mad = np.full(len(grupos), np.nan), np.full(len(grupos), np.nan)
+        n = np.zeros(len(grupos), dtype=np.int64)
+        cheios = np.flatnonzero(tamanhos)
+        if not len(cheios):
+            return mediana, mad, n
+        tamanhos = tamanhos[cheios]
+        inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+        segmento = np.repeat(np.arange(len(cheios)), tamanhos)
+        indices = ini[cheios][segmento] + np.arange(len(segmento)) - inicios[segmento]
+        valores = self._valores(self.chaves[indices] % self.largura)
+        contagens = self.contagens[indices]
+        n_cheios = np.add.reduceat(contagens, inicios)
+        metade = (n_cheios - 1) / 2
+
+        med = valores[self._primeiro_acima(contagens, segmento, inicios, metade)]
+        distancias = np.abs(valores - med[segmento])
+        ordem = np.lexsort((distancias, segmento))  # segmentos continuam contíguos
+        m = distancias[ordem][self._primeiro_acima(contagens[ordem], segmento[ordem], inicios, metade)]
+        mediana[cheios], mad[cheios], n[cheios] = med, m, n_cheios
+        return mediana, mad, n
+
+
+def mesclar_todos(parciais: Iterable):
+    """Mescla uma sequência de HistogramaFixo ou EsbocoQuantis (ex.: um por processo/partição)."""
+    parciais = iter(parciais)
+    total = next(parciais)
+    for parcial in parciais:
+        total.mesclar(parcial)
+    return total
+
+
+def _dataset_parquet(caminho: str):
+    """Arquivo ou pasta Parquet (inclusive particionada em hive) como pyarrow.dataset."""
+    import pyarrow.dataset as ds
+
+    return ds.dataset(caminho, format="parquet", partitioning="hive")
+
+
+def faixa_parquet(caminho: str, coluna: str) -> tuple[float, float]:
+    """
+    Min/max da coluna a partir das estatísticas dos row groups de todos os arquivos do
+    caminho (arquivo, pasta ou dataset particionado); só lê os rodapés.
+    Row groups só com nulos são ignorados; sem nenhum valor, devolve (0.0, 1.0).
+    """
+    import pyarrow.parquet as pq
+
+    minimos, maximos = [], []
+    for arquivo in _dataset_parquet(caminho).files:
+        meta = pq.ParquetFile(arquivo).metadata
+        if coluna not in meta.schema.names:
+            raise ValueError(f"'{coluna}' não está em {arquivo} (coluna de partição não tem estatísticas).")
+        indice = meta.schema.names.index(coluna)
+        for i in range(meta.num_row_groups):
+            grupo = meta.row_group(i)
+            stats = grupo.column(indice).statistics
+            if stats is not None and stats.has_null_count and stats.null_count == grupo.num_rows:
+                continue
+            if stats is None or not stats.has_min_max:
+                raise ValueError(f"row group {i} de {arquivo} sem estatísticas de min/max para '{coluna}'.")
+            minimos.append(stats.min); maximos.append(stats.max)
+    if not minimos:
+        return 0.0, 1.0
+    return float(min(minimos)), float(max(maximos))
+
+
+def estatisticas_parquet(caminho: str, colunas: list[str], bins: int = 20, alfa: float = 0.01,
+                         tamanho_lote: int = 1_000_000) -> dict[str, dict]:
+    """
+    Histograma e esboço de quantis por coluna, lendo o Parquet (arquivo ou pasta) por lotes.
+    As bordas do histograma vêm das estatísticas dos arquivos, então uma única passada basta.
+    """
+    resultado = {c: {"histograma": HistogramaFixo(*faixa_parquet(caminho, c), bins), "quantis": EsbocoQuantis(alfa)}
+                 for c in colunas}
+    for lote in _dataset_parquet(caminho).to_batches(columns=colunas, batch_size=tamanho_lote):
+        for c in colunas:
+            coluna = lote.column(c)
+            resultado[c]["histograma"].atualizar(coluna)
+            resultado[c]["quantis"].atualizar(coluna)
+    return resultado
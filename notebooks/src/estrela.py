@@ -0,0 +1,157 @@
+# e:\engDados-Solucoes\notebooks\src\estrela.py
+"""
+Camada analítica do esquema estrela da bike store (datasets/schema.png).
+As dimensões são carregadas uma vez como arrays indexados pela chave inteira; as chaves
+estrangeiras do fato (order_items) são resolvidas por indexação direta, sem `pd.merge`,
+e as agregações (ex.: receita por marca/loja/mês) saem de um único `np.bincount`.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# chave -> tabela de dimensão que ela identifica
+CHAVES = {
+    "order_id": "orders", "product_id": "products", "brand_id": "brands", "category_id": "categories",
+    "store_id": "stores", "staff_id": "staffs", "customer_id": "customers",
+}
+
+# atributo -> caminho a partir do fato: chaves estrangeiras até a coluna final
+ATRIBUTOS = {
+    "product_name": ["product_id", "product_name"],
+    "model_year": ["product_id", "model_year"],
+    "brand_name": ["product_id", "brand_id", "brand_name"],
+    "category_name": ["product_id", "category_id", "category_name"],
+    "order_status": ["order_id", "order_status"],
+    "order_date": ["order_id", "order_date"],
+    "mes": ["order_id", "mes"],
+    "ano": ["order_id", "ano"],
+    "store_name": ["order_id", "store_id", "store_name"],
+    "store_state": ["order_id", "store_id", "state"],
+    "staff_name": ["order_id", "staff_id", "first_name"],
+    "customer_state": ["order_id", "customer_id", "state"],
+    "customer_city": ["order_id", "customer_id", "city"],
+}
+
+# chave densa (array de posições) enquanto max(chave) <= FATOR_DENSO * linhas + 1024; senão busca ordenada
+FATOR_DENSO = 8
+
+
+class Dimensao:
+    """Tabela de dimensão: chave -> linha e colunas codificadas (códigos int32 + categorias)."""
+
+    def __init__(self, tabela: pd.DataFrame, chave: str):
+        chaves = tabela[chave].to_numpy(dtype=np.int64)
+        if len(chaves) and chaves.min() >= 0 and chaves.max() <= FATOR_DENSO * len(chaves) + 1024:
+            self.posicao = np.full(int(chaves.max()) + 1, -1, dtype=np.int32)
+            self.posicao[chaves] = np.arange(len(chaves), dtype=np.int32)
+            self.chaves_ordenadas = None
+        else:
+            ordem = np.argsort(chaves, kind="stable")
+            self.chaves_ordenadas, self.posicao = chaves[ordem], ordem.astype(np.int32)
+        self.colunas = {}
+        for c in tabela.columns:
+            codigos, categorias = pd.factorize(tabela[c], use_na_sentinel=True)
+            self.colunas[c] = (codigos.astype(np.int32), categorias)
+
+    def linhas(self, chaves: np.ndarray) -> np.ndarray:
+        """Linha de cada chave (-1 se ausente): indexação direta ou busca binária."""
+        chaves = np.asarray(chaves, dtype=np.int64)
+        if self.chaves_ordenadas is None:
+            dentro = (chaves >= 0) & (chaves < len(self.posicao))
+            return np.where(dentro, self.posicao[np.where(dentro, chaves, 0)], -1)
+        i = np.minimum(np.searchsorted(self.chaves_ordenadas, chaves), max(len(self.chaves_ordenadas) - 1, 0))
+        achou = self.chaves_ordenadas[i] == chaves if len(self.chaves_ordenadas) else np.zeros(len(chaves), bool)
+        return np.where(achou, self.posicao[i], -1)
+
+    def codigos(self, coluna: str, linhas: np.ndarray) -> tuple[np.ndarray, pd.Index]:
+        codigos, categorias = self.colunas[coluna]
+        return np.where(linhas >= 0, codigos[np.maximum(linhas, 0)], -1), categorias
+
+    def valores(self, coluna: str, linhas: np.ndarray) -> np.ndarray:
+        """Valores inteiros (chaves estrangeiras) da coluna; -1 onde a linha ou o valor falta."""
+        codigos, categorias = self.codigos(coluna, linhas)
+        tabela = np.append(np.asarray(categorias, dtype=np.int64), -1)
+        return tabela[codigos]
+
+
+class EsquemaEstrela:
+    """Fato order_items + dimensões; atributos resolvidos uma vez e reaproveitados entre consultas."""
+
+    def __init__(self, fatos: pd.DataFrame, dimensoes: dict[str, pd.DataFrame]):
+        self.n = len(fatos)
+        self.fatos = {c: fatos[c].to_numpy() for c in fatos.columns}
+        if {"list_price", "quantity", "discount"} <= set(fatos.columns):
+            self.fatos["receita"] = (fatos["list_price"].to_numpy(dtype="float64") * fatos["quantity"].to_numpy(dtype="float64")
+                                     * (1 - fatos["discount"].to_numpy(dtype="float64")))
+        if "orders" in dimensoes and "order_date" in dimensoes["orders"]:
+            datas = pd.to_datetime(dimensoes["orders"]["order_date"])
+            dimensoes = {**dimensoes, "orders": dimensoes["orders"].assign(mes=datas.dt.strftime("%Y-%m"), ano=datas.dt.year)}
+        self.dimensoes = {nome: Dimensao(t, next(k for k, v in CHAVES.items() if v == nome)) for nome, t in dimensoes.items()}
+        self._cache: dict[str, tuple[np.ndarray, pd.Index]] = {}
+
+    @classmethod
+    def de_pasta(cls, pasta: str, fatos: str = "order_items") -> "EsquemaEstrela":
+        tabelas = {os.path.splitext(a)[0]: pd.read_csv(os.path.join(pasta, a))
+                   for a in os.listdir(pasta) if a.endswith(".csv") and os.path.splitext(a)[0] in set(CHAVES.values()) | {fatos}}
+        return cls(tabelas.pop(fatos), tabelas)
+
+    def atributo(self, nome: str) -> tuple[np.ndarray, pd.Index]:
+        """Códigos por linha do fato (-1 = sem correspondência) e categorias do atributo."""
+        if nome not in self._cache:
+            caminho = ATRIBUTOS.get(nome) or [nome]
+            chaves = self.fatos[caminho[0]]
+            if len(caminho) == 1:  # coluna do próprio fato
+                codigos, categorias = pd.factorize(chaves)
+                self._cache[nome] = (codigos.astype(np.int32), categorias)
+            else:
+                for i in range(1, len(caminho)):
+                    dim = self.dimensoes[CHAVES[caminho[i - 1]]]
+                    linhas = dim.linhas(chaves)
+                    if i < len(caminho) - 1:
+                        chaves = dim.valores(caminho[i], linhas)
+                self._cache[nome] = dim.codigos(caminho[-1], linhas)
+        return self._cache[nome]
+
+    def resolver(self, nome: str) -> pd.Categorical:
+        """Coluna do atributo alinhada ao fato (equivale a uma coluna do merge)."""
+        codigos, categorias = self.atributo(nome)
+        return pd.Categorical.from_codes(codigos, categories=categorias)
+
+    def agregar(self, por: list[str], medidas: list[str] | None = None, filtro: np.ndarray | None = None) -> pd.DataFrame:
+        """
+        Group-by fundido: códigos dos atributos combinados em uma chave mista e somados com
+        `np.bincount`. Linhas sem correspondência na dimensão formam o grupo NaN.
+        """
+        medidas = medidas or ["receita", "quantity"]
+        codigos, categorias = zip(*(self.atributo(c) for c in por)) if por else ((), ())
+        tamanhos = [len(cats) + 1 for cats in categorias]  # +1: grupo dos ausentes
+        chave = np.zeros(self.n, dtype=np.int64)
+        for cod, tam in zip(codigos, tamanhos):
+            chave = chave * tam + np.where(cod >= 0, cod, tam - 1)
+        if filtro is not None:
+            chave = chave[filtro]
+        total = int(np.prod(tamanhos, dtype=np.int64)) if tamanhos else 1
+        if total <= max(4 * len(chave), 1 << 20):
+            grupos, inversa = None, chave
+        else:
+            grupos, inversa = np.unique(chave, return_inverse=True); total = len(grupos)
+
+        contagem = np.bincount(inversa, minlength=total)
+        presentes = np.flatnonzero(contagem)
+        resultado = {}
+        combinado = presentes if grupos is None else grupos[presentes]
+        for c, cats, tam in reversed(list(zip(por, categorias, tamanhos))):
+            cod = combinado % tam; combinado = combinado // tam
+            resultado[c] = pd.Categorical.from_codes(np.where(cod == tam - 1, -1, cod), categories=cats)
+        out = pd.DataFrame({c: resultado[c] for c in por})
+        for m in medidas:
+            pesos = self.fatos[m].astype("float64")
+            out[m] = np.bincount(inversa, weights=pesos if filtro is None else pesos[filtro], minlength=total)[presentes]
+        out["itens"] = contagem[presentes]
+        return out
+
+
+def receita_por(esquema: EsquemaEstrela, por: list[str] | None = None) -> pd.DataFrame:
+    """Receita (list_price * quantity * (1 - discount)) por marca/loja/mês, maiores primeiro."""
+    return esquema.agregar(por or ["brand_name", "store_name", "mes"], ["receita"]).sort_values("receita", ascending=False)
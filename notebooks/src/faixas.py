@@ -0,0 +1,99 @@
+# e:\engDados-Solucoes\notebooks\src\faixas.py
+"""
+Índice de faixas [início, fim] ordenadas e disjuntas, resolvido com `np.searchsorted`.
+Base do enriquecimento por CEP (src.cep) e das buscas por faixa/CIDR de IPv4 (src.ipv4).
+"""
+import heapq
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class IndiceFaixas:
+    """Faixas disjuntas ordenadas, com os atributos de cada faixa codificados como categorias."""
+
+    def __init__(self, inicios: np.ndarray, fins: np.ndarray, codigos: dict[str, np.ndarray],
+                 categorias: dict[str, list]):
+        self.inicios, self.fins = inicios, fins
+        self.codigos, self.categorias = codigos, categorias
+
+    def __len__(self) -> int:
+        return len(self.inicios)
+
+    @classmethod
+    def de_faixas(cls, inicios: np.ndarray, fins: np.ndarray, atributos: pd.DataFrame | None = None):
+        """
+        Monta o índice a partir de faixas possivelmente sobrepostas: onde houver sobreposição,
+        cada trecho fica com a faixa mais estreita que o cobre (ex.: CIDR mais específico).
+        """
+        atributos = pd.DataFrame(index=range(len(inicios))) if atributos is None else atributos.reset_index(drop=True)
+        ordem = np.lexsort((fins, inicios))
+        inicios, fins, linhas = inicios[ordem], fins[ordem], ordem
+        if len(inicios) > 1 and not (inicios[1:] > fins[:-1]).all():
+            inicios, fins, linhas = _segmentos_elementares(inicios, fins, ordem)
+
+        codigos, categorias = {}, {}
+        for c in atributos.columns:
+            valores = atributos[c].astype("string").str.strip() if atributos[c].dtype == object else atributos[c]
+            cod, cats = pd.factorize(valores)
+            codigos[c] = cod.astype(np.int16 if len(cats) < 32_000 else np.int32)[linhas]
+            categorias[c] = cats.tolist()
+        return cls(inicios, fins, codigos, categorias)
+
+    def posicoes(self, valores: np.ndarray, validos: np.ndarray | None = None) -> np.ndarray:
+        """Posição da faixa que contém cada valor (-1 se nenhuma)."""
+        pos = np.searchsorted(self.inicios, valores, side="right") - 1
+        achou = (pos >= 0) & (valores <= self.fins[np.maximum(pos, 0)])
+        if validos is not None:
+            achou &= validos
+        return np.where(achou, pos, -1)
+
+    def atributos(self, pos: np.ndarray, colunas: list[str] | None = None) -> dict[str, pd.Categorical]:
+        achou = pos >= 0
+        return {c: pd.Categorical.from_codes(np.where(achou, self.codigos[c][np.maximum(pos, 0)], -1),
+                                             categories=self.categorias[c])
+                for c in colunas or list(self.codigos)}
+
+    def salvar(self, diretorio: str) -> None:
+        os.makedirs(diretorio, exist_ok=True)
+        np.save(os.path.join(diretorio, "inicios.npy"), self.inicios)
+        np.save(os.path.join(diretorio, "fins.npy"), self.fins)
+        for i, c in enumerate(self.codigos):
+            np.save(os.path.join(diretorio, f"codigos_{i}.npy"), self.codigos[c])
+        with open(os.path.join(diretorio, "categorias.json"), "w", encoding="utf-8") as f:
+            json.dump({"colunas": list(self.codigos), "categorias": self.categorias}, f, ensure_ascii=False, default=str)
+
+    @classmethod
+    def carregar(cls, diretorio: str, mmap: bool = True):
+        """Com mmap=True os arrays ficam no page cache do SO e são compartilhados por todos os workers."""
+        modo = "r" if mmap else None
+        with open(os.path.join(diretorio, "categorias.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        codigos = {c: np.load(os.path.join(diretorio, f"codigos_{i}.npy"), mmap_mode=modo)
+                   for i, c in enumerate(meta["colunas"])}
+        return cls(np.load(os.path.join(diretorio, "inicios.npy"), mmap_mode=modo),
+                   np.load(os.path.join(diretorio, "fins.npy"), mmap_mode=modo), codigos, meta["categorias"])
+
+
+def _segmentos_elementares(inicios: np.ndarray, fins: np.ndarray, linhas: np.ndarray):
+    """Varredura O(m log m): quebra as faixas nos limites e escolhe, por trecho, a faixa ativa mais estreita."""
+    limites = np.unique(np.concatenate([inicios.astype(np.int64), fins.astype(np.int64) + 1]))
+    ini_l, fim_l = inicios.astype(np.int64).tolist(), fins.astype(np.int64).tolist()
+    ativas, proxima = [], 0
+    seg_ini, seg_fim, escolhidas = [], [], []
+    for a, b in zip(limites[:-1].tolist(), limites[1:].tolist()):
+        while proxima < len(ini_l) and ini_l[proxima] <= a:
+            heapq.heappush(ativas, (fim_l[proxima] - ini_l[proxima], proxima)); proxima += 1
+        while ativas and fim_l[ativas[0][1]] < a:
+            heapq.heappop(ativas)
+        if not ativas:
+            continue
+        i = ativas[0][1]
+        if escolhidas and escolhidas[-1] == i and seg_fim[-1] == a - 1:
+            seg_fim[-1] = b - 1  # trecho contíguo da mesma faixa
+        else:
+            seg_ini.append(a); seg_fim.append(b - 1); escolhidas.append(i)
+    dtype = inicios.dtype
+    return np.asarray(seg_ini, dtype=dtype), np.asarray(seg_fim, dtype=dtype), linhas[np.asarray(escolhidas, dtype=np.int64)]
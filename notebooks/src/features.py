@@ -0,0 +1,188 @@
+# e:\engDados-Solucoes\notebooks\src\features.py
+"""
+Pipeline de features local (pandas/NumPy) equivalente ao Imputer + StringIndexer +
+OneHotEncoder + RobustScaler dos notebooks 2.1/2.2, sem cluster Spark.
+O ajuste é uma única passada mesclável por lotes (esboços de quantis, contagens de categorias);
+o estado ajustado é um dict JSON compacto e `transformar` preenche uma matriz pré-alocada.
+"""
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.estatisticas import EsbocoQuantis
+
+ESTRATEGIAS = {"mediana", "media", "moda"}
+
+
+def _numerico(serie: pd.Series) -> np.ndarray:
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+        return serie.to_numpy(dtype="float64", na_value=np.nan)
+    return pd.to_numeric(serie, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _somar_contagens(destino: dict, serie: pd.Series):
+    for valor, n in serie.value_counts(dropna=True).items():
+        destino[valor] = destino.get(valor, 0) + int(n)
+
+
+class PipelineFeatures:
+    """
+    numericas: imputação (mediana/média/moda) + RobustScaler (IQR; centraliza na mediana se pedido).
+    categoricas: vocabulário por frequência (como o StringIndexer), nulos imputados pela moda,
+    valores novos no índice extra (handleInvalid="keep") e one-hot com dropLast.
+    """
+
+    def __init__(self, numericas: list[str], categoricas: list[str], estrategia: str = "mediana",
+                 centralizar: bool = False, imputar_categoricas: bool = True, descartar_ultima: bool = True,
+                 alfa: float = 0.001):
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"estrategia deve ser uma de {sorted(ESTRATEGIAS)}.")
+        self.numericas, self.categoricas = list(numericas), list(categoricas)
+        self.estrategia, self.centralizar = estrategia, centralizar
+        self.imputar_categoricas, self.descartar_ultima = imputar_categoricas, descartar_ultima
+        self.esbocos = {c: EsbocoQuantis(alfa) for c in self.numericas}
+        self.somas = {c: 0.0 for c in self.numericas}
+        self.contagens_numericas: dict[str, dict] = {c: {} for c in self.numericas} if estrategia == "moda" else {}
+        self.contagens = {c: {} for c in self.categoricas}
+        self.estado: dict | None = None
+
+    # ---- ajuste (uma passada, mesclável) ----
+
+    def atualizar(self, lote: pd.DataFrame) -> "PipelineFeatures":
+        for c in self.numericas:
+            v = _numerico(lote[c])
+            self.esbocos[c].atualizar(v)
+            self.somas[c] += float(np.nansum(v))
+            if c in self.contagens_numericas:
+                _somar_contagens(self.contagens_numericas[c], pd.Series(v))
+        for c in self.categoricas:
+            _somar_contagens(self.contagens[c], lote[c].astype("string"))
+        self.estado = None
+        return self
+
+    def mesclar(self, outro: "PipelineFeatures") -> "PipelineFeatures":
+        for c in self.numericas:
+            self.esbocos[c].mesclar(outro.esbocos[c])
+            self.somas[c] += outro.somas[c]
+        for destino, origem in [*((self.contagens_numericas[c], outro.contagens_numericas[c]) for c in self.contagens_numericas),
+                                *((self.contagens[c], outro.contagens[c]) for c in self.categoricas)]:
+            for valor, n in origem.items():
+                destino[valor] = destino.get(valor, 0) + n
+        self.estado = None
+        return self
+
+    def ajustar(self, lotes) -> "PipelineFeatures":
+        """Aceita um DataFrame ou um iterável de lotes (ex.: `pd.read_csv(..., chunksize=...)`)."""
+        for lote in [lotes] if isinstance(lotes, pd.DataFrame) else lotes:
+            self.atualizar(lote)
+        self.finalizar()
+        return self
+
+    def finalizar(self) -> dict:
+        numericas = {}
+        for c, esboco in self.esbocos.items():
+            q1, mediana, q3 = esboco.quantis([0.25, 0.5, 0.75]).tolist()
+            if self.estrategia == "mediana":
+                preencher = mediana
+            elif self.estrategia == "media":
+                preencher = self.somas[c] / esboco.n if esboco.n else math.nan
+            else:
+                contagens = self.contagens_numericas[c]
+                preencher = min(contagens, key=lambda v: (-contagens[v], v)) if contagens else math.nan
+            iqr = q3 - q1
+            numericas[c] = {"preencher": 0.0 if math.isnan(preencher) else preencher,
+                            "centro": mediana if self.centralizar and not math.isnan(mediana) else 0.0,
+                            "escala": iqr if iqr > 0 else 1.0}
+        categoricas = {c: sorted(cont, key=lambda v: (-cont[v], v)) for c, cont in self.contagens.items()}
+        self.estado = {"numericas": numericas, "categoricas": categoricas,
+                       "imputar_categoricas": self.imputar_categoricas, "descartar_ultima": self.descartar_ultima}
+        return self.estado
+
+    # ---- estado serializado ----
+
+    def para_dict(self) -> dict:
+        return self.estado if self.estado is not None else self.finalizar()
+
+    def salvar(self, caminho: str) -> None:
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.para_dict(), f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def de_dict(cls, estado: dict) -> "PipelineFeatures":
+        p = cls(list(estado["numericas"]), list(estado["categoricas"]),
+                imputar_categoricas=estado["imputar_categoricas"], descartar_ultima=estado["descartar_ultima"])
+        p.estado = estado
+        return p
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "PipelineFeatures":
+        with open(caminho, encoding="utf-8") as f:
+            return cls.de_dict(json.load(f))
+
+    # ---- transformação ----
+
+    def _larguras(self) -> list[int]:
+        # vocabulário + índice extra (desconhecidos/nulos), menos a última coluna com dropLast
+        extra = 0 if self.estado["descartar_ultima"] else 1
+        return [len(self.estado["categoricas"][c]) + extra for c in self.categoricas]
+
+    def nomes_features(self) -> list[str]:
+        estado = self.para_dict()
+        nomes = list(self.numericas)
+        for c, largura in zip(self.categoricas, self._larguras()):
+            nomes += [f"{c}_{v}" for v in (estado["categoricas"][c] + ["__desconhecido__"])[:largura]]
+        return nomes
+
+    def _codigos(self, lote: pd.DataFrame) -> np.ndarray:
+        """Índice de cada categoria por coluna (n x k); desconhecidos -> len(vocabulário)."""
+        estado = self.estado
+        codigos = np.empty((len(lote), len(self.categoricas)), dtype=np.int64)
+        for j, c in enumerate(self.categoricas):
+            vocab = estado["categoricas"][c]
+            valores = lote[c].astype("string")
+            cod = pd.Categorical(valores, categories=vocab).codes.astype(np.int64)
+            nulos = valores.isna().to_numpy()
+            cod[cod < 0] = len(vocab)
+            if estado["imputar_categoricas"] and vocab:
+                cod[nulos] = 0  # moda: o vocabulário está ordenado por frequência
+            codigos[:, j] = cod
+        return codigos
+
+    def transformar(self, lote: pd.DataFrame, esparsa: bool = False, dtype=np.float64):
+        """Matriz (linhas x features): bloco numérico imputado/escalado seguido dos one-hot."""
+        estado = self.para_dict()
+        n, k = len(lote), len(self.numericas)
+        larguras = self._larguras()
+        deslocamentos = k + np.concatenate([[0], np.cumsum(larguras)[:-1]]).astype(np.int64) if larguras else np.empty(0, np.int64)
+        total = k + int(sum(larguras))
+
+        numerico = np.empty((n, k), dtype=dtype)
+        for j, c in enumerate(self.numericas):
+            numerico[:, j] = _numerico(lote[c])
+        parametros = np.array([[estado["numericas"][c][p] for c in self.numericas]
+                               for p in ("preencher", "centro", "escala")], dtype=dtype).reshape(3, k)
+        np.copyto(numerico, np.broadcast_to(parametros[0], numerico.shape), where=np.isnan(numerico))
+        np.subtract(numerico, parametros[1], out=numerico)
+        np.divide(numerico, parametros[2], out=numerico)
+
+        codigos = self._codigos(lote)
+        ativos = codigos < np.asarray(larguras, dtype=np.int64)  # a última categoria (dropLast) não gera coluna
+        colunas = codigos + deslocamentos
+
+        if esparsa:
+            from scipy import sparse
+
+            linhas_num = np.repeat(np.arange(n), k)
+            linhas_cat, j_cat = np.nonzero(ativos)
+            linhas = np.concatenate([linhas_num, linhas_cat])
+            cols = np.concatenate([np.tile(np.arange(k), n), colunas[linhas_cat, j_cat]])
+            dados = np.concatenate([numerico.ravel(), np.ones(len(linhas_cat), dtype=dtype)])
+            return sparse.csr_matrix((dados, (linhas, cols)), shape=(n, total))
+
+        matriz = np.zeros((n, total), dtype=dtype)
+        matriz[:, :k] = numerico
+        linhas_cat, j_cat = np.nonzero(ativos)
+        matriz[linhas_cat, colunas[linhas_cat, j_cat]] = 1
+        return matriz
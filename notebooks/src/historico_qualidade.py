@@ -0,0 +1,207 @@
+# e:\engDados-Solucoes\notebooks\src\historico_qualidade.py
+"""
+Histórico de qualidade por dataset/regra: cada relatório do agente (validation_reports +
+validation_results) vira pontos de taxa de violação, rollups diários/semanais atualizados
+incrementalmente e detecção de drift (EWMA + CUSUM) no momento em que o resultado chega.
+Dashboards e alertas leem `<pasta>/<dataset>.json` (rollups + estado) em vez do JSON de todas as execuções.
+Só biblioteca padrão. As execuções devem chegar em ordem de timestamp por dataset: a deduplicação
+guarda só o último timestamp e as execution_id dele, e execuções anteriores a ele são ignoradas.
+"""
+import json
+import math
+import os
+import re
+from datetime import datetime
+
+SCORE = "__score__"  # série do overall_quality_score do dataset
+GRANULARIDADES = {"D": lambda ts: ts.strftime("%Y-%m-%d"),
+                  "W": lambda ts: "{}-W{:02d}".format(*ts.isocalendar()[:2])}
+
+
+def decisao(score: float) -> str:
+    """Mesmos limites de _store_report_in_catalog do agente."""
+    return "APPROVED" if score >= 95 else "WARNING" if score >= 80 else "REJECTED"
+
+
+def _campo(obj, nome: str, padrao=None):
+    return obj.get(nome, padrao) if isinstance(obj, dict) else getattr(obj, nome, padrao)
+
+
+def _timestamp(valor) -> datetime:
+    return valor if isinstance(valor, datetime) else datetime.fromisoformat(str(valor))
+
+
+def _taxa(resultado: dict) -> float | None:
+    """violation_percentage (0-100); recalculada de violations/total quando ausente. None para ERROR."""
+    if resultado.get("status") == "ERROR":
+        return None
+    if resultado.get("violation_percentage") is not None:
+        return float(resultado["violation_percentage"])
+    total = resultado.get("total_records") or 0
+    return 100.0 * (resultado.get("violations_count") or 0) / total if total else 0.0
+
+
+class _Deteccao:
+    """Estado de uma série: média/variância EWMA e somas CUSUM sobre o valor padronizado."""
+
+    @staticmethod
+    def novo() -> dict:
+        return {"n": 0, "media": 0.0, "variancia": 0.0, "cusum_pos": 0.0, "cusum_neg": 0.0}
+
+    @staticmethod
+    def atualizar(estado: dict, x: float, cfg: dict) -> list[tuple[str, float]]:
+        """Testa x contra o estado anterior e depois o incorpora; devolve [(método, estatística)]."""
+        alertas = []
+        if estado["n"] == 0:
+            estado["media"] = x
+        elif estado["n"] >= cfg["aquecimento"]:
+            desvio = max(math.sqrt(estado["variancia"]), cfg["desvio_minimo"])
+            z = (x - estado["media"]) / desvio
+            if abs(z) > cfg["limite_ewma"]:
+                alertas.append(("EWMA", z))
+            estado["cusum_pos"] = max(0.0, estado["cusum_pos"] + z - cfg["k_cusum"])
+            estado["cusum_neg"] = max(0.0, estado["cusum_neg"] - z - cfg["k_cusum"])
+            for lado, chave in (("CUSUM+", "cusum_pos"), ("CUSUM-", "cusum_neg")):
+                if estado[chave] > cfg["h_cusum"]:
+                    alertas.append((lado, estado[chave]))
+                    estado[chave] = 0.0  # reinicia após sinalizar
+        if estado["n"] > 0:
+            lam, diferenca = cfg["lambda_ewma"], x - estado["media"]
+            estado["media"] += lam * diferenca
+            estado["variancia"] = (1 - lam) * (estado["variancia"] + lam * diferenca * diferenca)
+        estado["n"] += 1
+        return alertas
+
+
+class HistoricoQualidade:
+    """
+    Por dataset, `<pasta>/<dataset>.json` guarda rollups {"D"|"W": {período: {regra: agregados}}},
+    estado de detecção por regra e a marca de deduplicação (último timestamp e suas execution_id,
+    tamanho constante); pontos e alertas vão para
+    `<dataset>.pontos.jsonl` e `alertas.jsonl` (append).
+    Taxas em % (0-100); `desvio_minimo` evita alarmes em séries quase constantes.
+    """
+
+    def __init__(self, pasta: str, lambda_ewma: float = 0.2, limite_ewma: float = 3.0, k_cusum: float = 0.5,
+                 h_cusum: float = 5.0, aquecimento: int = 5, desvio_minimo: float = 0.5):
+        self.pasta = pasta
+        self.cfg = {"lambda_ewma": lambda_ewma, "limite_ewma": limite_ewma, "k_cusum": k_cusum,
+                    "h_cusum": h_cusum, "aquecimento": aquecimento, "desvio_minimo": desvio_minimo}
+        os.makedirs(pasta, exist_ok=True)
+
+    def _caminho(self, dataset: str, sufixo: str = ".json") -> str:
+        return os.path.join(self.pasta, re.sub(r"[^\w.-]", "_", dataset) + sufixo)
+
+    def carregar(self, dataset: str) -> dict:
+        caminho = self._caminho(dataset)
+        if not os.path.exists(caminho):
+            return {"dataset": dataset, "ultimo_ts": None, "execucoes_ultimo_ts": [],
+                    "rollups": {g: {} for g in GRANULARIDADES}, "deteccao": {}}
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _salvar(self, estado: dict) -> None:
+        caminho = self._caminho(estado["dataset"])
+        with open(caminho + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(estado, f, ensure_ascii=False, indent=1)
+        os.replace(caminho + ".tmp", caminho)
+
+    @staticmethod
+    def _acumular(agregado: dict, regra: str, valor: float | None, resultado: dict | None, dec: str | None) -> None:
+        a = agregado.setdefault(regra, {"execucoes": 0, "soma": 0.0, "minimo": None, "maximo": None,
+                                        "violacoes": 0, "total": 0, "falhas": 0, "erros": 0})
+        a["execucoes"] += 1
+        if valor is None:
+            a["erros"] += 1
+        else:
+            a["soma"] += valor
+            a["minimo"] = valor if a["minimo"] is None else min(a["minimo"], valor)
+            a["maximo"] = valor if a["maximo"] is None else max(a["maximo"], valor)
+        if resultado is not None:
+            a["violacoes"] += int(resultado.get("violations_count") or 0)
+            a["total"] += int(resultado.get("total_records") or 0)
+            a["falhas"] += resultado.get("status") == "FAIL"
+        if dec is not None:
+            a[dec] = a.get(dec, 0) + 1
+
+    def registrar(self, report) -> list[dict]:
+        """
+        Incorpora um relatório (objeto do agente ou dict com as colunas de validation_reports e
+        `results` com as de validation_results). Reprocessar a mesma execution_id, ou qualquer execução
+        anterior à última registrada, não tem efeito. Sem score, a série do score não recebe ponto.
+        Devolve os alertas de drift gerados.
+        """
+        dataset, execucao = _campo(report, "dataset_name"), _campo(report, "execution_id")
+        estado = self.carregar(dataset)
+        ts = _timestamp(_campo(report, "execution_timestamp"))
+        if estado["ultimo_ts"] is not None:
+            ultimo = datetime.fromisoformat(estado["ultimo_ts"])
+            if ts < ultimo or (ts == ultimo and execucao in estado["execucoes_ultimo_ts"]):
+                return []
+        score = _campo(report, "overall_quality_score", _campo(report, "quality_score"))
+        score = None if score is None else float(score)
+        dec = _campo(report, "decision") or (decisao(score) if score is not None else None)
+        resultados = _campo(report, "results") or []
+        if isinstance(resultados, str):  # report_json de validation_reports
+            resultados = json.loads(resultados)["results"]
+        periodos = {g: f(ts) for g, f in GRANULARIDADES.items()}
+
+        pontos, alertas = [], []
+        series = [(SCORE, score, None, dec)] if score is not None else []
+        series += [(r.get("rule_id", "unknown"), _taxa(r), r, None) for r in resultados]
+        for regra, valor, resultado, dec_serie in series:
+            for g, periodo in periodos.items():
+                self._acumular(estado["rollups"][g].setdefault(periodo, {}), regra, valor, resultado, dec_serie)
+            pontos.append({"ts": ts.isoformat(), "execucao": execucao, "regra": regra, "valor": valor,
+                           **({"status": resultado.get("status")} if resultado else {"decisao": dec})})
+            if valor is None:
+                continue
+            det = estado["deteccao"].setdefault(regra, _Deteccao.novo())
+            media_anterior = det["media"]
+            for metodo, estatistica in _Deteccao.atualizar(det, valor, self.cfg):
+                alertas.append({"ts": ts.isoformat(), "dataset": dataset, "regra": regra, "execucao": execucao,
+                                "metodo": metodo, "valor": valor, "media": round(media_anterior, 6),
+                                "estatistica": round(estatistica, 4),
+                                # taxa de violação subindo ou score caindo = piora
+                                "piora": (valor > media_anterior) != (regra == SCORE)})
+
+        if estado["ultimo_ts"] != ts.isoformat():
+            estado["ultimo_ts"], estado["execucoes_ultimo_ts"] = ts.isoformat(), []
+        estado["execucoes_ultimo_ts"].append(execucao)
+        with open(self._caminho(dataset, ".pontos.jsonl"), "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(p, ensure_ascii=False) + "\n" for p in pontos)
+        if alertas:
+            with open(os.path.join(self.pasta, "alertas.jsonl"), "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(a, ensure_ascii=False) + "\n" for a in alertas)
+        self._salvar(estado)
+        return alertas
+
+    def importar(self, reports: list[dict], results: list[dict]) -> list[dict]:
+        """Carga histórica a partir das linhas de validation_reports e validation_results (dicts), em ordem de timestamp."""
+        por_execucao: dict[str, list[dict]] = {}
+        for r in results:
+            por_execucao.setdefault(r["execution_id"], []).append(r)
+        alertas = []
+        for rep in sorted(reports, key=lambda r: _timestamp(r["execution_timestamp"])):
+            alertas += self.registrar({**rep, "results": por_execucao.get(rep["execution_id"], [])})
+        return alertas
+
+    def rollup(self, dataset: str, granularidade: str = "D", regra: str | None = None) -> list[dict]:
+        """Linhas (período, regra, execuções, média, mín, máx, violações, total, falhas, erros[, decisões]) em ordem de período."""
+        linhas = []
+        for periodo, regras in sorted(self.carregar(dataset)["rollups"][granularidade].items()):
+            for nome, a in sorted(regras.items()):
+                if regra is not None and nome != regra:
+                    continue
+                validas = a["execucoes"] - a["erros"]
+                linhas.append({"periodo": periodo, "regra": nome, **a,
+                               "media": a["soma"] / validas if validas else None})
+        return linhas
+
+    def alertas(self, dataset: str | None = None) -> list[dict]:
+        caminho = os.path.join(self.pasta, "alertas.jsonl")
+        if not os.path.exists(caminho):
+            return []
+        with open(caminho, encoding="utf-8") as f:
+            todos = [json.loads(l) for l in f if l.strip()]
+        return [a for a in todos if dataset is None or a["dataset"] == dataset]
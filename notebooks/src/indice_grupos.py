@@ -0,0 +1,108 @@
+# e:\engDados-Solucoes\notebooks\src\indice_grupos.py
+"""
+Índice de grupos para fatias repetidas por categoria (filter_genero do 15.analiseGenero):
+a coluna é fatorada uma vez, as posições de cada grupo ficam em layout CSR (ordem estável +
+limites) e as chaves `str(valor).lower()` são cacheadas. Fatias e estatísticas por grupo saem de
+`take` sobre posições prontas, sem varrer a coluna de texto a cada consulta.
+A busca sem caixa segue `astype(str).str.lower()` do notebook, inclusive para nulos: NaN casa com
+"nan", None com "none". Agregações por grupo (value_counts sem coluna, describe, agregar) ignoram
+nulos, como o groupby.
+O índice vale para o DataFrame do momento da construção: recrie após alterar linhas ou a coluna.
+"""
+import numpy as np
+import pandas as pd
+
+
+class IndiceGrupos:
+    def __init__(self, df: pd.DataFrame, coluna: str):
+        if coluna not in df.columns:
+            raise ValueError(f"O DataFrame deve conter a coluna '{coluna}'.")
+        self.df, self.coluna = df, coluna
+        codigos, self.categorias = pd.factorize(df[coluna], use_na_sentinel=True)
+        self.codigos = codigos
+        # CSR: posições do grupo c = ordem[limites[c]:limites[c + 1]], em ordem original (argsort estável)
+        self.ordem = np.argsort(codigos, kind="stable")
+        nulos = int((codigos < 0).sum())
+        self.contagem = np.bincount(codigos[codigos >= 0], minlength=len(self.categorias))
+        self.limites = np.concatenate([[0], np.cumsum(self.contagem)]) + nulos  # nulos (-1) ficam no início
+        self._exato = {c: i for i, c in enumerate(self.categorias)}
+        self._minusculas: dict[str, list[int]] = {}
+        for i, c in enumerate(self.categorias):
+            self._minusculas.setdefault(str(c).lower(), []).append(i)
+        # nulos não viram grupo; guardados pela chave que astype(str).str.lower() daria a cada um
+        pos_nulos = self.ordem[:nulos]
+        chaves_nulos = df[coluna].iloc[pos_nulos].astype(str).str.lower().to_numpy()
+        self._nulos = {k: pos_nulos[chaves_nulos == k] for k in dict.fromkeys(chaves_nulos)}
+        self._cache: dict[tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.categorias)
+
+    def codigos_de(self, valor, case_sensitive: bool = False) -> list[int]:
+        if case_sensitive:
+            return [self._exato[valor]] if valor in self._exato else []
+        return self._minusculas.get(str(valor).lower(), [])
+
+    def posicoes(self, valor, case_sensitive: bool = False) -> np.ndarray:
+        """Posições (iloc) das linhas que filter_genero devolveria, em ordem original; variantes de caixa são unidas."""
+        # 1 == True == 1.0 têm o mesmo hash: a chave é o que decide o resultado, não o valor cru
+        chave = (True, type(valor), valor) if case_sensitive else (False, str(valor).lower())
+        if chave not in self._cache:
+            partes = [self.ordem[self.limites[c]:self.limites[c + 1]] for c in self.codigos_de(valor, case_sensitive)]
+            if not case_sensitive and str(valor).lower() in self._nulos:
+                partes.append(self._nulos[str(valor).lower()])
+            if not partes:
+                pos = np.empty(0, dtype=self.ordem.dtype)
+            else:
+                pos = partes[0] if len(partes) == 1 else np.sort(np.concatenate(partes))
+            self._cache[chave] = pos
+        return self._cache[chave]
+
+    def filtrar(self, valor=None, case_sensitive: bool = False, reset_index: bool = False,
+                colunas: list[str] | None = None) -> pd.DataFrame:
+        """Mesmo resultado de filter_genero do notebook (cópia; valor None devolve tudo)."""
+        base = self.df if colunas is None else self.df[colunas]
+        resultado = base.copy() if valor is None else base.take(self.posicoes(valor, case_sensitive))
+        return resultado.reset_index(drop=True) if reset_index else resultado
+
+    def value_counts(self, coluna: str | None = None, valor=None, case_sensitive: bool = False) -> pd.Series:
+        """Sem `coluna`: tamanho de cada grupo (como df[coluna_indice].value_counts()). Com `coluna`: value_counts dela no grupo."""
+        if coluna is None:
+            return pd.Series(self.contagem, index=pd.Index(self.categorias, name=self.coluna),
+                             name="count").sort_values(ascending=False, kind="stable")
+        return self.df[coluna].take(self.posicoes(valor, case_sensitive)).value_counts()
+
+    def describe(self, coluna: str, valor=None, case_sensitive: bool = False) -> pd.Series | pd.DataFrame:
+        """describe() da coluna no grupo `valor`; sem valor, uma linha por grupo."""
+        serie = self.df[coluna]
+        if valor is not None:
+            return serie.take(self.posicoes(valor, case_sensitive)).describe()
+        return pd.DataFrame({c: serie.take(self.ordem[self.limites[i]:self.limites[i + 1]]).describe()
+                             for i, c in enumerate(self.categorias)}).T.rename_axis(self.coluna)
+
+    def agregar(self, coluna: str) -> pd.DataFrame:
+        """count/sum/mean/min/max de uma coluna numérica para todos os grupos de uma vez (bincount/reduceat)."""
+        valores = self.df[coluna].to_numpy(dtype="float64", na_value=np.nan)[self.ordem]
+        inicio = self.limites[0]
+        validos = ~np.isnan(valores[inicio:])
+        codigos = self.codigos[self.ordem][inicio:]
+        contagem = np.bincount(codigos[validos], minlength=len(self.categorias))
+        soma = np.bincount(codigos[validos], weights=valores[inicio:][validos], minlength=len(self.categorias))
+        segmentos = valores[inicio:]
+        cortes = self.limites[:-1] - inicio
+        with np.errstate(invalid="ignore", divide="ignore"):
+            minimo = np.fmin.reduceat(segmentos, cortes) if len(cortes) else np.empty(0)
+            maximo = np.fmax.reduceat(segmentos, cortes) if len(cortes) else np.empty(0)
+            media = soma / contagem
+        return pd.DataFrame({"count": contagem, "sum": soma, "mean": media, "min": minimo, "max": maximo},
+                            index=pd.Index(self.categorias, name=self.coluna))
+
+
+def filter_genero(df: pd.DataFrame, genero="Feminino", reset_index: bool = False, case_sensitive: bool = False,
+                  indice: IndiceGrupos | None = None) -> pd.DataFrame:
+    """
+    filter_genero do notebook 15 sobre um IndiceGrupos. Para consultas repetidas, construa
+    `IndiceGrupos(df, "genero")` uma vez e passe em `indice`.
+    """
+    indice = indice if indice is not None else IndiceGrupos(df, "genero")
+    return indice.filtrar(genero, case_sensitive=case_sensitive, reset_index=reset_index)
@@ -0,0 +1,253 @@
+# e:\engDados-Solucoes\notebooks\src\indice_pontual.py
+"""
+Índice lateral para buscas pontuais por cpf/email em datasets Parquet (LOGINS, CLIENTES, FULL...).
+Por arquivo: bloom filter de cada row group e chaves com hash de 64 bits ordenadas -> (row group, linha).
+Os segmentos são intercalados em arrays .npy ordenados lidos com mmap; a busca passa primeiro pelos
+blooms e lê só o row group encontrado. Arquivos novos ou alterados são indexados incrementalmente
+(manifesto com tamanho/mtime).
+"""
+import glob
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+def _normalizar_cpf(s: pd.Series) -> pd.Series:
+    """Só dígitos, 11 posições. Colunas numéricas (float por causa de nulos) passam por inteiro,
+    e '12345678901.0' vindo de texto perde o '.0'; vazio vira nulo em vez de '00000000000'."""
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        s = s.astype("Float64").round().astype("Int64")
+    digitos = s.astype("string").str.replace(r"^\s*(\d+)\.0*\s*$", r"\1", regex=True).str.replace(r"\D", "", regex=True)
+    return digitos.mask(digitos == "").str.zfill(11)
+
+
+NORMALIZACOES = {
+    "cpf": _normalizar_cpf,
+    "email": lambda s: s.astype("string").str.strip().str.lower(),
+    None: lambda s: s.astype("string"),
+}
+ARRAYS_CONSOLIDADOS = ("hashes", "arquivos", "row_groups", "linhas")
+
+
+def hash_chaves(chaves, normalizacao: str | None) -> np.ndarray:
+    """Hash uint64 estável (pandas.util.hash_array) das chaves normalizadas; nulos viram 0."""
+    serie = NORMALIZACOES[normalizacao](pd.Series(chaves, copy=False))
+    validos = serie.notna().to_numpy()
+    hashes = np.zeros(len(serie), dtype=np.uint64)
+    hashes[validos] = pd.util.hash_array(serie[validos].to_numpy(dtype=object))
+    return hashes
+
+
+class Bloom:
+    """Bloom filter com double hashing sobre o hash de 64 bits (h1 + i*h2)."""
+
+    def __init__(self, bits: np.ndarray, k: int):
+        self.bits, self.k, self.m = bits, k, len(bits) * 8
+
+    @classmethod
+    def de_hashes(cls, hashes: np.ndarray, taxa_fp: float = 0.01) -> "Bloom":
+        n = max(len(hashes), 1)
+        m = max(64, int(math.ceil(-n * math.log(taxa_fp) / math.log(2) ** 2 / 8)) * 8)
+        bloom = cls(np.zeros(m // 8, dtype=np.uint8), max(1, round(m / n * math.log(2))))
+        posicoes = bloom._posicoes(hashes).ravel()
+        np.bitwise_or.at(bloom.bits, posicoes >> 3, (1 << (posicoes & 7)).astype(np.uint8))
+        return bloom
+
+    def _posicoes(self, hashes: np.ndarray) -> np.ndarray:
+        h1, h2 = hashes & np.uint64(0xFFFFFFFF), (hashes >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.k, dtype=np.uint64)
+        return ((h1[:, None] + i * h2[:, None]) % np.uint64(self.m)).astype(np.int64)
+
+    def talvez_contem(self, hashes: np.ndarray) -> np.ndarray:
+        posicoes = self._posicoes(np.atleast_1d(hashes))
+        return ((self.bits[posicoes >> 3] >> (posicoes & 7)) & 1).all(axis=1).astype(bool)
+
+
+class IndicePontual:
+    """Índice em `diretorio/`: manifesto.json, seg_<id>.npz por arquivo e arrays consolidados (mmap)."""
+
+    def __init__(self, diretorio: str, dataset: str, coluna: str, normalizacao: str | None = None,
+                 taxa_fp: float = 0.01):
+        self.diretorio, self.dataset, self.coluna = diretorio, dataset, coluna
+        self.normalizacao, self.taxa_fp = normalizacao, taxa_fp
+        self.manifesto = {"coluna": coluna, "normalizacao": normalizacao, "proximo_id": 0, "arquivos": {}}
+        caminho = os.path.join(diretorio, "manifesto.json")
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as f:
+                salvo = json.load(f)
+            if salvo["coluna"] == coluna and salvo["normalizacao"] == normalizacao:
+                self.manifesto = salvo
+        self._consolidado = None
+        self._blooms: dict[int, list[Bloom]] = {}
+
+    def _arquivos_dataset(self) -> list[str]:
+        if os.path.isfile(self.dataset):
+            return [self.dataset]
+        return sorted(glob.glob(os.path.join(self.dataset, "**", "*.parquet"), recursive=True))
+
+    def _indexar_arquivo(self, caminho: str, id_arquivo: int) -> None:
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(caminho)
+        hashes, row_groups, linhas, blooms = [], [], [], []
+        for rg in range(arquivo.metadata.num_row_groups):
+            h = hash_chaves(arquivo.read_row_group(rg, columns=[self.coluna]).column(0).to_pandas(), self.normalizacao)
+            validos = np.flatnonzero(h)
+            hashes.append(h[validos]); linhas.append(validos.astype(np.int32))
+            row_groups.append(np.full(len(validos), rg, dtype=np.int32))
+            blooms.append(Bloom.de_hashes(h[validos], self.taxa_fp))
+        h, rg, ln = (np.concatenate(x) if x else np.empty(0, t) for x, t in
+                     ((hashes, np.uint64), (row_groups, np.int32), (linhas, np.int32)))
+        ordem = np.argsort(h, kind="stable")
+        np.savez(os.path.join(self.diretorio, f"seg_{id_arquivo}.npz"), hashes=h[ordem], row_groups=rg[ordem],
+                 linhas=ln[ordem], bloom_k=np.array([b.k for b in blooms], dtype=np.int32),
+                 bloom_tamanhos=np.array([len(b.bits) for b in blooms], dtype=np.int64),
+                 bloom_bits=np.concatenate([b.bits for b in blooms]) if blooms else np.empty(0, np.uint8))
+
+    def atualizar(self) -> dict:
+        """Indexa arquivos novos/alterados, descarta os removidos e reconsolida se algo mudou."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        registrados = self.manifesto["arquivos"]
+        atuais = {}
+        for caminho in self._arquivos_dataset():
+            st = os.stat(caminho)
+            atuais[os.path.relpath(caminho, self.dataset if os.path.isdir(self.dataset) else os.path.dirname(self.dataset))] = \
+                (caminho, st.st_size, st.st_mtime_ns)
+        novos = [r for r, (_, tam, mt) in atuais.items()
+                 if r not in registrados or (registrados[r]["tamanho"], registrados[r]["mtime_ns"]) != (tam, mt)]
+        removidos = [r for r in registrados if r not in atuais]
+        self._consolidado, self._blooms = None, {}  # solta o mmap antes de regravar os arrays
+        saidas = []
+        for r in removidos + [r for r in novos if r in registrados]:
+            saidas.append(registrados[r]["id"])
+            segmento = os.path.join(self.diretorio, f"seg_{registrados[r]['id']}.npz")
+            if os.path.exists(segmento):
+                os.remove(segmento)
+            del registrados[r]
+        entradas = []
+        for r in novos:
+            caminho, tamanho, mtime = atuais[r]
+            id_arquivo = self.manifesto["proximo_id"]; self.manifesto["proximo_id"] += 1
+            self._indexar_arquivo(caminho, id_arquivo)
+            registrados[r] = {"id": id_arquivo, "tamanho": tamanho, "mtime_ns": mtime}
+            entradas.append(id_arquivo)
+        if not os.path.exists(os.path.join(self.diretorio, "hashes.npy")):
+            self._consolidar([info["id"] for info in registrados.values()], [], reconstruir=True)
+        elif entradas or saidas:
+            self._consolidar(entradas, saidas)
+        with open(os.path.join(self.diretorio, "manifesto.json"), "w", encoding="utf-8") as f:
+            json.dump(self.manifesto, f, indent=1)
+        return {"indexados": sorted(novos), "removidos": sorted(removidos), "arquivos": len(registrados)}
+
+    def _segmentos(self, ids: list[int]) -> dict[str, np.ndarray]:
+        """Segmentos dos arquivos `ids` concatenados e ordenados por hash."""
+        partes = {nome: [] for nome in ARRAYS_CONSOLIDADOS}
+        for id_arquivo in ids:
+            with np.load(os.path.join(self.diretorio, f"seg_{id_arquivo}.npz")) as seg:
+                partes["hashes"].append(seg["hashes"]); partes["row_groups"].append(seg["row_groups"])
+                partes["linhas"].append(seg["linhas"])
+                partes["arquivos"].append(np.full(len(seg["hashes"]), id_arquivo, dtype=np.int32))
+        tipos = {"hashes": np.uint64, "arquivos": np.int32, "row_groups": np.int32, "linhas": np.int32}
+        arrays = {n: np.concatenate(p) if p else np.empty(0, tipos[n]) for n, p in partes.items()}
+        ordem = np.argsort(arrays["hashes"], kind="stable")
+        return {n: a[ordem] for n, a in arrays.items()}
+
+    def _consolidar(self, entradas: list[int], saidas: list[int], reconstruir: bool = False) -> None:
+        """
+        Atualiza os arrays consolidados sem reordenar o índice inteiro: tira as entradas dos
+        arquivos que saíram (filtro linear) e intercala os segmentos novos, já ordenados, com
+        `searchsorted` + `insert`. `reconstruir` monta tudo do zero a partir dos segmentos.
+        """
+        novos = self._segmentos(entradas)
+        if reconstruir:
+            arrays = novos
+        else:
+            arrays = {n: np.load(os.path.join(self.diretorio, f"{n}.npy")) for n in ARRAYS_CONSOLIDADOS}
+            if saidas:
+                manter = ~np.isin(arrays["arquivos"], np.asarray(saidas, dtype=np.int32))
+                arrays = {n: a[manter] for n, a in arrays.items()}
+            if len(novos["hashes"]):
+                posicoes = np.searchsorted(arrays["hashes"], novos["hashes"], side="right")
+                arrays = {n: np.insert(a, posicoes, novos[n]) for n, a in arrays.items()}
+        for nome in ARRAYS_CONSOLIDADOS:
+            temporario = os.path.join(self.diretorio, f"{nome}.tmp.npy")
+            np.save(temporario, arrays[nome])
+            os.replace(temporario, os.path.join(self.diretorio, f"{nome}.npy"))
+
+    def _arrays(self) -> dict[str, np.ndarray]:
+        if self._consolidado is None:
+            self._consolidado = {n: np.load(os.path.join(self.diretorio, f"{n}.npy"), mmap_mode="r")
+                                 for n in ARRAYS_CONSOLIDADOS}
+        return self._consolidado
+
+    def _caminhos(self) -> dict[int, str]:
+        base = self.dataset if os.path.isdir(self.dataset) else os.path.dirname(self.dataset)
+        return {info["id"]: os.path.join(base, r) for r, info in self.manifesto["arquivos"].items()}
+
+    def localizar(self, chaves) -> pd.DataFrame:
+        """(chave, arquivo, row_group, linha) candidatos de cada chave via busca binária no índice consolidado."""
+        hashes = hash_chaves(chaves, self.normalizacao)
+        a = self._arrays()
+        inicio = np.searchsorted(a["hashes"], hashes, side="left")
+        fim = np.searchsorted(a["hashes"], hashes, side="right")
+        quantos = fim - inicio
+        posicoes = np.repeat(inicio, quantos) + (np.arange(quantos.sum()) - np.repeat(np.cumsum(quantos) - quantos, quantos))
+        return pd.DataFrame({"chave": np.repeat(np.arange(len(hashes)), quantos),
+                             "arquivo": np.asarray(a["arquivos"][posicoes]), "row_group": np.asarray(a["row_groups"][posicoes]),
+                             "linha": np.asarray(a["linhas"][posicoes])})
+
+    def blooms(self, id_arquivo: int) -> list[Bloom]:
+        if id_arquivo not in self._blooms:
+            with np.load(os.path.join(self.diretorio, f"seg_{id_arquivo}.npz")) as seg:
+                limites = np.concatenate([[0], np.cumsum(seg["bloom_tamanhos"])])
+                self._blooms[id_arquivo] = [Bloom(seg["bloom_bits"][limites[i]:limites[i + 1]], int(k))
+                                            for i, k in enumerate(seg["bloom_k"])]
+        return self._blooms[id_arquivo]
+
+    def _filtrar_blooms(self, hashes: np.ndarray) -> dict[tuple[int, int], np.ndarray]:
+        """(arquivo, row group) -> máscara das chaves que o bloom pode conter (só row groups com alguma)."""
+        candidatos = {}
+        for info in self.manifesto["arquivos"].values():
+            for rg, bloom in enumerate(self.blooms(info["id"])):
+                talvez = bloom.talvez_contem(hashes) & (hashes != 0)
+                if talvez.any():
+                    candidatos[(info["id"], rg)] = talvez
+        return candidatos
+
+    def row_groups_candidatos(self, chave) -> list[tuple[int, int]]:
+        """(arquivo, row group) cujo bloom pode conter a chave, sem carregar o índice ordenado."""
+        return sorted(self._filtrar_blooms(hash_chaves([chave], self.normalizacao)))
+
+    def buscar(self, chaves, colunas: list[str] | None = None) -> pd.DataFrame:
+        """
+        Linhas cujas chaves batem, conferindo a chave. Os blooms descartam antes as chaves ausentes
+        (sem tocar no índice mmap); as demais são localizadas no índice consolidado ou, se ele
+        ainda não existe, os row groups indicados pelos blooms são lidos e filtrados.
+        """
+        import pyarrow.parquet as pq
+
+        chaves = list(chaves) if not isinstance(chaves, (str, bytes)) else [chaves]
+        normalizadas = NORMALIZACOES[self.normalizacao](pd.Series(chaves, dtype=object))
+        alvo = set(normalizadas.dropna())
+        hashes = hash_chaves(chaves, self.normalizacao)
+        por_bloom = self._filtrar_blooms(hashes)
+        talvez = np.logical_or.reduce(list(por_bloom.values())) if por_bloom else np.zeros(len(hashes), bool)
+        if os.path.exists(os.path.join(self.diretorio, "hashes.npy")):
+            candidatos = self.localizar([c for c, t in zip(chaves, talvez) if t])
+            grupos = {(int(a), int(rg)): np.unique(g["linha"].to_numpy())
+                      for (a, rg), g in candidatos.groupby(["arquivo", "row_group"], sort=True)}
+        else:
+            grupos = dict.fromkeys(sorted(por_bloom))  # None: row group inteiro
+        caminhos, partes = self._caminhos(), []
+        leitura = None if colunas is None else list(dict.fromkeys([*colunas, self.coluna]))
+        for (arquivo, rg), linhas in grupos.items():
+            tabela = pq.ParquetFile(caminhos[arquivo]).read_row_group(rg, columns=leitura)
+            tabela = tabela if linhas is None else tabela.take(linhas)
+            df = tabela.to_pandas()
+            partes.append(df[NORMALIZACOES[self.normalizacao](df[self.coluna]).isin(alvo).to_numpy()])
+        if not partes:
+            return pd.DataFrame(columns=leitura or [self.coluna])
+        resultado = pd.concat(partes, ignore_index=True)
+        return resultado if colunas is None else resultado[colunas]
@@ -0,0 +1,198 @@
+# e:\engDados-Solucoes\notebooks\src\ingestao.py
+"""
+Conversão de snapshots pickle e planilhas xlsx para Parquet/Feather particionados.
+O pickle é lido com um unpickler restrito (lista exata das classes de pandas/numpy que
+`to_pickle` emite), então uma fonte não confiável não executa código; a leitura posterior usa
+projeção de colunas e filtros empurrados para as estatísticas dos row groups e para as partições.
+"""
+import io
+import json
+import os
+import pickle
+import zoneinfo
+
+import pandas as pd
+
+# (módulo, nome) exatos que DataFrame.to_pickle emite (pandas 1.x/2.x, numpy 1.x/2.x); nenhum prefixo
+# de módulo é liberado, pois qualquer função alcançável por um módulo liberado vira chamada no REDUCE
+_BUILTINS = {"slice", "range", "complex", "set", "frozenset", "bytearray", "object", "list", "dict", "tuple",
+             "int", "float", "str", "bytes", "bool", "getattr"}
+_NUMPY_CORE = {"multiarray": {"_reconstruct", "scalar"}, "numeric": {"_frombuffer"}}
+CLASSES_PERMITIDAS = {
+    "builtins": _BUILTINS,
+    "__builtin__": _BUILTINS,  # protocolo 2
+    "numpy": {"dtype", "ndarray"},
+    **{f"{pacote}.{m}": nomes for pacote in ("numpy.core", "numpy._core") for m, nomes in _NUMPY_CORE.items()},
+    "numpy.dtypes": {f"{t}DType" for t in ("Bool", "Int8", "Int16", "Int32", "Int64", "UInt8", "UInt16", "UInt32",
+                                             "UInt64", "Float16", "Float32", "Float64", "Complex64", "Complex128",
+                                             "Object", "Bytes", "Str", "DateTime64", "TimeDelta64")},
+    "datetime": {"datetime", "date", "time", "timedelta", "timezone"},
+    "decimal": {"Decimal"},
+    "collections": {"OrderedDict"},
+    "copyreg": {"_reconstructor"},
+    "_codecs": {"encode"},
+    "zoneinfo": {"ZoneInfo"},
+    "pytz": {"_p", "_UTC"},
+    "pandas.core.frame": {"DataFrame"},
+    "pandas.core.series": {"Series"},
+    "pandas.core.internals.managers": {"BlockManager", "SingleBlockManager"},
+    "pandas._libs.internals": {"_unpickle_block", "BlockPlacement"},
+    "pandas._libs.arrays": {"__pyx_unpickle_NDArrayBacked"},
+    "pandas._libs.missing": {"NA"},
+    "pandas._libs.interval": {"Interval", "__pyx_unpickle_IntervalMixin"},
+    "pandas._libs.sparse": {"IntIndex", "BlockIndex"},
+    "pandas._libs.tslibs.nattype": {"__nat_unpickle"},
+    "pandas._libs.tslibs.timestamps": {"_unpickle_timestamp", "Timestamp"},
+    "pandas._libs.tslibs.timedeltas": {"_timedelta_unpickle", "Timedelta"},
+    "pandas._libs.tslibs.period": {"Period"},
+    "pandas._libs.tslibs.offsets": set(),  # preenchido abaixo com as subclasses de BaseOffset
+    "pandas.core.indexes.base": {"Index", "_new_Index"},
+    "pandas.core.indexes.range": {"RangeIndex"},
+    "pandas.core.indexes.multi": {"MultiIndex"},
+    "pandas.core.indexes.category": {"CategoricalIndex"},
+    "pandas.core.indexes.datetimes": {"DatetimeIndex", "_new_DatetimeIndex"},
+    "pandas.core.indexes.timedeltas": {"TimedeltaIndex"},
+    "pandas.core.indexes.period": {"PeriodIndex"},
+    "pandas.core.indexes.interval": {"IntervalIndex", "_new_IntervalIndex"},
+    "pandas.core.indexes.numeric": {"Int64Index", "UInt64Index", "Float64Index"},
+    "pandas.core.arrays.categorical": {"Categorical"},
+    "pandas.core.arrays.datetimes": {"DatetimeArray"},
+    "pandas.core.arrays.timedeltas": {"TimedeltaArray"},
+    "pandas.core.arrays.period": {"PeriodArray"},
+    "pandas.core.arrays.interval": {"IntervalArray"},
+    "pandas.core.arrays.boolean": {"BooleanArray", "BooleanDtype"},
+    "pandas.core.arrays.integer": {"IntegerArray", *(f"{t}Dtype" for t in ("Int8", "Int16", "Int32", "Int64",
+                                                                          "UInt8", "UInt16", "UInt32", "UInt64"))},
+    "pandas.core.arrays.floating": {"FloatingArray", "Float32Dtype", "Float64Dtype"},
+    "pandas.core.arrays.string_": {"StringArray", "StringDtype"},
+    "pandas.core.arrays.string_arrow": {"ArrowStringArray", "ArrowStringArrayNumpySemantics"},
+    "pandas.core.arrays.arrow.array": {"ArrowExtensionArray"},
+    "pandas.core.arrays.numpy_": {"NumpyExtensionArray", "PandasArray"},
+    "pandas.core.arrays.sparse.array": {"SparseArray"},
+    "pandas.core.dtypes.dtypes": {"CategoricalDtype", "DatetimeTZDtype", "PeriodDtype", "IntervalDtype",
+                                  "SparseDtype", "ArrowDtype", "NumpyEADtype", "PandasDtype"},
+    "pyarrow.lib": {"_restore_array", "py_buffer", "type_for_alias"},
+}
+FORMATOS = {"parquet": "parquet", "feather": "ipc"}
+
+
+def _offsets_pandas() -> set[str]:
+    from pandas._libs.tslibs import offsets
+
+    return {n for n, c in vars(offsets).items() if isinstance(c, type) and issubclass(c, offsets.BaseOffset)}
+
+
+def _getattr_restrito(objeto, nome: str):
+    """getattr só aparece no pickle de ZoneInfo (reconstrutor ZoneInfo._unpickle)."""
+    if objeto is not zoneinfo.ZoneInfo or nome != "_unpickle":
+        raise pickle.UnpicklingError(f"atributo não permitido no pickle: {objeto!r}.{nome}")
+    return getattr(objeto, nome)
+
+
+class _UnpicklerRestrito(pickle.Unpickler):
+    def find_class(self, modulo: str, nome: str):
+        # nome com "." (STACK_GLOBAL do protocolo 4+) navegaria atributos a partir de uma classe liberada
+        liberado = "." not in nome and nome in CLASSES_PERMITIDAS.get(modulo, ())
+        if modulo == "pandas._libs.tslibs.offsets" and "." not in nome:
+            liberado = nome in _offsets_pandas()
+        if not liberado:
+            raise pickle.UnpicklingError(f"classe não permitida no pickle: {modulo}.{nome}")
+        if nome == "getattr":
+            return _getattr_restrito
+        return super().find_class(modulo, nome)
+
+
+def ler_pickle_seguro(origem) -> pd.DataFrame:
+    """Lê um DataFrame pickled aceitando apenas classes de pandas/numpy (caminho, bytes ou arquivo)."""
+    if isinstance(origem, (bytes, bytearray)):
+        origem = io.BytesIO(origem)
+    if isinstance(origem, (str, os.PathLike)):
+        with open(origem, "rb") as f:
+            objeto = _UnpicklerRestrito(f).load()
+    else:
+        objeto = _UnpicklerRestrito(origem).load()
+    if not isinstance(objeto, pd.DataFrame):
+        raise TypeError(f"o pickle contém {type(objeto).__name__}, não um DataFrame.")
+    return objeto
+
+
+def _normalizar_objetos(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas object com tipos mistos (comum em xlsx) viram texto para caber em um schema Arrow."""
+    out = df.copy(deep=False)
+    for c in out.columns[out.dtypes == object]:
+        tipos = out[c].dropna().map(type).unique()
+        if len(tipos) > 1:
+            out[c] = out[c].astype("string")
+    out.columns = [str(c) for c in out.columns]
+    return out
+
+
+def estatisticas_colunas(df: pd.DataFrame) -> dict[str, dict]:
+    """min/max/nulos por coluna (valores em texto para serializar qualquer tipo)."""
+    stats = {}
+    for c in df.columns:
+        s = df[c]
+        entrada = {"tipo": str(s.dtype), "nulos": int(s.isna().sum()), "linhas": len(s)}
+        try:
+            entrada["min"], entrada["max"] = str(s.min()), str(s.max())
+        except TypeError:
+            pass
+        stats[str(c)] = entrada
+    return stats
+
+
+def converter_dataframe(df: pd.DataFrame, destino: str, particionar_por: list[str] | None = None,
+                        ordenar_por: list[str] | None = None, formato: str = "parquet",
+                        linhas_por_grupo: int = 128_000) -> dict:
+    """
+    Grava df como dataset particionado (hive: destino/col=valor/...). Ordenar pela coluna mais
+    filtrada deixa os min/max de cada row group estreitos e o pushdown descarta mais grupos.
+    Um `_estatisticas.json` acompanha o dataset (o Feather não tem estatísticas no rodapé).
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    if formato not in FORMATOS:
+        raise ValueError(f"formato deve ser um de {sorted(FORMATOS)}.")
+    df = _normalizar_objetos(df)
+    if ordenar_por:
+        df = df.sort_values(ordenar_por, kind="stable")
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    formato_ds = ds.ParquetFileFormat() if formato == "parquet" else ds.IpcFileFormat()
+    opcoes = formato_ds.make_write_options(compression="zstd")
+    ds.write_dataset(tabela, destino, format=formato_ds, file_options=opcoes,
+                     partitioning=particionar_por, partitioning_flavor="hive" if particionar_por else None,
+                     max_rows_per_group=linhas_por_grupo, min_rows_per_group=min(linhas_por_grupo, len(df)) or None,
+                     existing_data_behavior="delete_matching")
+    resumo = {"formato": formato, "linhas": len(df), "particionado_por": particionar_por or [],
+              "ordenado_por": ordenar_por or [], "colunas": estatisticas_colunas(df)}
+    with open(os.path.join(destino, "_estatisticas.json"), "w", encoding="utf-8") as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=1)
+    return resumo
+
+
+def converter_pickle(origem, destino: str, **kwargs) -> dict:
+    return converter_dataframe(ler_pickle_seguro(origem), destino, **kwargs)
+
+
+def converter_excel(origem: str, destino: str, abas: list[str] | None = None, **kwargs) -> dict[str, dict]:
+    """Cada aba do workbook vira um dataset em destino/<aba>."""
+    planilhas = pd.read_excel(origem, sheet_name=abas or None)
+    return {str(aba): converter_dataframe(df, os.path.join(destino, str(aba)), **kwargs) for aba, df in planilhas.items()}
+
+
+def ler_colunar(destino: str, colunas: list[str] | None = None, filtros=None) -> pd.DataFrame:
+    """
+    Lê só as colunas pedidas e só os row groups/partições que podem satisfazer `filtros`
+    (mesmo formato do `pd.read_parquet`: [("coluna", "==", valor), ...]).
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    with open(os.path.join(destino, "_estatisticas.json"), encoding="utf-8") as f:
+        resumo = json.load(f)
+    dataset = ds.dataset(destino, format=FORMATOS[resumo["formato"]],
+                         partitioning="hive" if resumo["particionado_por"] else None,
+                         exclude_invalid_files=True, ignore_prefixes=["_", "."])
+    filtro = pq.filters_to_expression(filtros) if filtros else None
+    return dataset.to_table(columns=colunas, filter=filtro).to_pandas()
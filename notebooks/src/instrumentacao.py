@@ -0,0 +1,156 @@
+# e:\engDados-Solucoes\notebooks\src\instrumentacao.py
+"""
+Spans de instrumentação (tempo de parede/CPU, linhas, bytes, pico de RSS) gravados como
+linhas JSON. Desabilitado por padrão: `span` devolve um objeto nulo compartilhado e
+`instrumentar` chama a função direto, então o custo fora de uso é uma checagem de flag.
+Habilite com `configurar("spans.jsonl")` ou a variável ENGDADOS_SPANS (caminho ou "stderr").
+"""
+import contextvars
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_estado = {"habilitado": False, "destino": None, "fechar": False}
+_trava = threading.Lock()
+_ids = itertools.count(1)
+_span_atual: contextvars.ContextVar = contextvars.ContextVar("span_atual", default=None)
+
+
+def configurar(destino=None, habilitado: bool = True) -> None:
+    """destino: caminho de arquivo (append), "stderr"/"stdout" ou objeto com `write`."""
+    desabilitar()
+    if not habilitado:
+        return
+    if destino is None or destino in {"stderr", "stdout"}:
+        saida, fechar = (sys.stdout if destino == "stdout" else sys.stderr), False
+    elif isinstance(destino, (str, os.PathLike)):
+        saida, fechar = open(destino, "a", encoding="utf-8", buffering=1), True
+    else:
+        saida, fechar = destino, False
+    _estado.update(habilitado=True, destino=saida, fechar=fechar)
+
+
+def desabilitar() -> None:
+    with _trava:
+        if _estado["fechar"]:
+            _estado["destino"].close()
+        _estado.update(habilitado=False, destino=None, fechar=False)
+
+
+def habilitado() -> bool:
+    return _estado["habilitado"]
+
+
+def _pico_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)  # bytes no macOS, KB no Linux
+
+
+def medir(obj) -> tuple[int | None, int | None]:
+    """(linhas, bytes) de DataFrames/Series/tabelas Arrow; (None, None) para o resto. Não usa deep=True."""
+    if hasattr(obj, "memory_usage") and hasattr(obj, "__len__"):
+        uso = obj.memory_usage(index=True)
+        return len(obj), int(uso.sum() if hasattr(uso, "sum") else uso)
+    if hasattr(obj, "num_rows") and hasattr(obj, "nbytes"):
+        return obj.num_rows, obj.nbytes
+    return None, None
+
+
+def _emitir(registro: dict) -> None:
+    linha = json.dumps(registro, ensure_ascii=False, default=str)
+    with _trava:
+        if _estado["destino"] is not None:
+            _estado["destino"].write(linha + "\n")
+
+
+class Span:
+    __slots__ = ("nome", "atributos", "id", "pai", "_inicio", "_cpu", "_ts", "_token")
+
+    def __init__(self, nome: str, atributos: dict):
+        self.nome, self.atributos = nome, atributos
+
+    def definir(self, **atributos) -> "Span":
+        """Acrescenta atributos ao registro (ex.: linhas_saida, regras=12)."""
+        self.atributos.update(atributos)
+        return self
+
+    def entrada(self, obj) -> "Span":
+        self.atributos["linhas_entrada"], self.atributos["bytes_entrada"] = medir(obj)
+        return self
+
+    def saida(self, obj) -> "Span":
+        self.atributos["linhas_saida"], self.atributos["bytes_saida"] = medir(obj)
+        return self
+
+    def __enter__(self) -> "Span":
+        pai = _span_atual.get()
+        self.id, self.pai = next(_ids), (pai.id if pai is not None else None)
+        self._token = _span_atual.set(self)
+        self._ts, self._inicio, self._cpu = time.time(), time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, tipo, erro, tb) -> bool:
+        parede, cpu = time.perf_counter() - self._inicio, time.process_time() - self._cpu
+        _span_atual.reset(self._token)
+        _emitir({"span": self.nome, "id": self.id, "pai": self.pai,
+                 "inicio": datetime.fromtimestamp(self._ts, timezone.utc).isoformat(timespec="milliseconds"),
+                 "parede_s": round(parede, 6), "cpu_s": round(cpu, 6), "pico_rss_mb": _pico_rss_mb(),
+                 "pid": os.getpid(), "thread": threading.get_ident(),
+                 "erro": None if tipo is None else f"{tipo.__name__}: {erro}", **self.atributos})
+        return False
+
+
+class _SpanNulo:
+    """Usado quando a instrumentação está desabilitada: todas as operações são no-op."""
+    __slots__ = ()
+
+    def definir(self, **atributos): return self
+    def entrada(self, obj): return self
+    def saida(self, obj): return self
+    def __enter__(self): return self
+    def __exit__(self, *args): return False
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+def span(nome: str, **atributos):
+    """Context manager: `with span("etapa", tabela=t) as s: ...; s.saida(df)`."""
+    if not _estado["habilitado"]:
+        return _SPAN_NULO
+    return Span(nome, atributos)
+
+
+def instrumentar(nome: str | None = None):
+    """Decorator: span com linhas/bytes do primeiro argumento (entrada) e do retorno (saída)."""
+    def decorar(funcao):
+        rotulo = nome or f"{funcao.__module__}.{funcao.__qualname__}"
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _estado["habilitado"]:
+                return funcao(*args, **kwargs)
+            with Span(rotulo, {}) as s:
+                if args:
+                    s.entrada(args[0])
+                resultado = funcao(*args, **kwargs)
+                s.saida(resultado)
+                return resultado
+        return envolvida
+    return decorar
+
+
+if os.environ.get("ENGDADOS_SPANS"):
+    configurar(os.environ["ENGDADOS_SPANS"])
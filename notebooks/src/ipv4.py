@@ -0,0 +1,85 @@
+# e:\engDados-Solucoes\notebooks\src\ipv4.py
+"""
+IPv4 <-> uint32 vetorizado (4 bytes por linha em vez de texto) e índice de faixas/CIDR
+para blocklists e joins de geolocalização/ASN via `np.searchsorted`.
+"""
+import numpy as np
+import pandas as pd
+
+from src.faixas import IndiceFaixas
+
+_PADRAO_IPV4 = r"^\s*(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})\s*$"
+_DESLOCAMENTOS = np.array([24, 16, 8, 0], dtype=np.uint32)
+
+
+def _octetos_para_uint32(octetos: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    o = octetos.apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    validos = ~np.isnan(o).any(axis=1) & (np.nan_to_num(o, nan=256) <= 255).all(axis=1)
+    o = np.where(validos[:, None], o, 0).astype(np.uint32)
+    return (o << _DESLOCAMENTOS).sum(axis=1, dtype=np.uint32), validos
+
+
+def ipv4_para_uint32(ips) -> pd.Series:
+    """Texto 'a.b.c.d' -> Series UInt32 (nullable); inválidos viram <NA>."""
+    serie = pd.Series(ips, copy=False)
+    if pd.api.types.is_integer_dtype(serie):
+        return serie.astype("UInt32")
+    valores, validos = _octetos_para_uint32(serie.astype("string").str.extract(_PADRAO_IPV4))
+    return pd.Series(pd.arrays.IntegerArray(valores, ~validos), index=serie.index, name=serie.name).astype("UInt32")
+
+
+def uint32_para_ipv4(valores) -> pd.Series:
+    """uint32 -> texto 'a.b.c.d' (Arrow string quando disponível)."""
+    serie = pd.Series(valores, copy=False).astype("UInt32")
+    nulos = serie.isna().to_numpy()
+    v = serie.fillna(0).to_numpy(dtype=np.uint32)
+    partes = [pd.Series((v >> d) & 255, index=serie.index).astype("string") for d in _DESLOCAMENTOS.tolist()]
+    texto = partes[0] + "." + partes[1] + "." + partes[2] + "." + partes[3]
+    texto[nulos] = pd.NA
+    return texto
+
+
+def cidr_para_faixa(cidrs) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """'10.0.0.0/8' -> (início uint32, fim uint32, válidos). Sem '/' vale como /32."""
+    partes = pd.Series(cidrs, copy=False).astype("string").str.extract(r"^\s*([^/\s]+)\s*(?:/(\d{1,2}))?\s*$")
+    base, validos = _octetos_para_uint32(partes[0].str.extract(_PADRAO_IPV4))
+    prefixo = pd.to_numeric(partes[1], errors="coerce").fillna(32).to_numpy()
+    validos &= prefixo <= 32
+    hosts = (np.uint64(1) << (32 - np.clip(prefixo, 0, 32)).astype(np.uint64)) - np.uint64(1)
+    inicio = (base.astype(np.uint64) & ~hosts & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    return inicio, (inicio.astype(np.uint64) + hosts).astype(np.uint32), validos
+
+
+class IndiceIP(IndiceFaixas):
+    """Faixas de IPv4 (uint32). Em sobreposições vale a faixa mais específica (menor)."""
+
+    @classmethod
+    def de_cidrs(cls, tabela: pd.DataFrame, coluna_cidr: str = "cidr", colunas: list[str] | None = None) -> "IndiceIP":
+        inicio, fim, validos = cidr_para_faixa(tabela[coluna_cidr])
+        colunas = colunas if colunas is not None else [c for c in tabela.columns if c != coluna_cidr]
+        return cls.de_faixas(inicio[validos], fim[validos], tabela.loc[validos, colunas])
+
+    @classmethod
+    def de_intervalos(cls, tabela: pd.DataFrame, coluna_inicio: str, coluna_fim: str,
+                      colunas: list[str] | None = None) -> "IndiceIP":
+        inicio, fim = ipv4_para_uint32(tabela[coluna_inicio]), ipv4_para_uint32(tabela[coluna_fim])
+        validos = (inicio.notna() & fim.notna() & (fim >= inicio)).fillna(False).to_numpy()
+        colunas = colunas if colunas is not None else [c for c in tabela.columns if c not in {coluna_inicio, coluna_fim}]
+        return cls.de_faixas(inicio[validos].to_numpy(dtype=np.uint32), fim[validos].to_numpy(dtype=np.uint32),
+                             tabela.loc[validos, colunas])
+
+    def resolver(self, ips) -> np.ndarray:
+        """Posição da faixa de cada IP (-1 se nenhuma faixa contém o IP ou se o IP é inválido)."""
+        valores = ipv4_para_uint32(ips)
+        return self.posicoes(valores.fillna(0).to_numpy(dtype=np.uint32), valores.notna().to_numpy())
+
+    def contem(self, ips) -> np.ndarray:
+        """Máscara booleana: IP pertence a alguma faixa (ex.: blocklist)."""
+        return self.resolver(ips) >= 0
+
+    def enriquecer(self, df: pd.DataFrame, coluna_ip: str, colunas: list[str] | None = None,
+                   sufixo: str = "") -> pd.DataFrame:
+        out = df.copy()
+        for c, valores in self.atributos(self.resolver(df[coluna_ip]), colunas).items():
+            out[f"{c}{sufixo}"] = valores
+        return out
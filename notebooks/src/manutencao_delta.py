@@ -0,0 +1,211 @@
+# e:\engDados-Solucoes\notebooks\src\manutencao_delta.py
+"""
+Planejador de manutenção Delta (compactação, Z-order, vacuum) a partir das estatísticas do log.
+Substitui os `vacuum(7)` / `executeCompaction()` / `ZORDER BY` manuais do notebook 008:
+só as tabelas/partições que precisam são otimizadas, dentro de um orçamento por janela.
+"""
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+MB = 1024 * 1024
+BINS_TAMANHO = [0, 1 * MB, 8 * MB, 32 * MB, 128 * MB, 512 * MB, np.inf]
+
+
+def acoes_arquivos(dt) -> pd.DataFrame:
+    """Arquivos ativos da tabela com tamanho, valores de partição e min/max por coluna (só lê o log)."""
+    import pyarrow as pa
+
+    acoes = pa.table(dt.get_add_actions(flatten=True)).to_pandas()  # pyarrow ou arro3 (deltalake >= 1.0)
+    colunas_part = [c for c in acoes.columns if c.startswith("partition.")]
+    if colunas_part:
+        acoes["particao"] = acoes[colunas_part].astype(str).agg("/".join, axis=1)
+    else:
+        acoes["particao"] = ""
+    return acoes
+
+
+def sobreposicao(mins: np.ndarray, maxs: np.ndarray) -> float:
+    """
+    Fração média de outros arquivos cujo intervalo [min, max] intercepta o de cada arquivo.
+    0 = arquivos bem clusterizados (pruning eficiente), 1 = todo arquivo cobre toda a faixa.
+    """
+    validos = ~(pd.isna(mins) | pd.isna(maxs))
+    mins, maxs = np.asarray(mins[validos]), np.asarray(maxs[validos])
+    n = len(mins)
+    if n < 2:
+        return 0.0
+    mins_ord, maxs_ord = np.sort(mins), np.sort(maxs)
+    # intercepta j se min_j <= max_i e max_j >= min_i
+    inicia_antes_do_fim = np.searchsorted(mins_ord, maxs, side="right")
+    termina_antes_do_inicio = np.searchsorted(maxs_ord, mins, side="left")
+    intersecoes = inicia_antes_do_fim - termina_antes_do_inicio - 1
+    return float(intersecoes.mean() / (n - 1))
+
+
+def perfil_tabela(dt, colunas_zorder: list[str] | None = None, tamanho_alvo: int = 128 * MB) -> pd.DataFrame:
+    """Uma linha por partição: arquivos, bytes, arquivos pequenos, histograma de tamanhos e sobreposição."""
+    colunas_zorder = colunas_zorder or []
+    acoes = acoes_arquivos(dt)
+    linhas = []
+    for particao, grupo in acoes.groupby("particao", sort=False):
+        tamanhos = grupo["size_bytes"].to_numpy()
+        pequenos = tamanhos < tamanho_alvo / 4
+        nula = _particao_nula(grupo)
+        linha = {
+            "particao": particao,
+            "particao_nula": nula,
+            "filtros": None if nula else _filtros_particao(grupo),
+            "arquivos": len(grupo),
+            "bytes": int(tamanhos.sum()),
+            "pequenos": int(pequenos.sum()),
+            "bytes_pequenos": int(tamanhos[pequenos].sum()),
+            "razao_pequenos": float(pequenos.mean()) if len(grupo) else 0.0,
+            "histograma": np.histogram(tamanhos, bins=BINS_TAMANHO)[0].tolist(),
+        }
+        for coluna in colunas_zorder:
+            if f"min.{coluna}" in grupo and f"max.{coluna}" in grupo:
+                linha[f"sobreposicao.{coluna}"] = sobreposicao(
+                    grupo[f"min.{coluna}"].to_numpy(), grupo[f"max.{coluna}"].to_numpy()
+                )
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def _particao_nula(grupo: pd.DataFrame) -> bool:
+    colunas = [c for c in grupo.columns if c.startswith("partition.")]
+    return bool(colunas) and bool(grupo.iloc[0][colunas].isna().any())
+
+
+def _filtros_particao(grupo: pd.DataFrame) -> list[tuple] | None:
+    """Filtros de igualdade da partição; None se a tabela não é particionada. Não vale para partições nulas."""
+    colunas = [c for c in grupo.columns if c.startswith("partition.")]
+    if not colunas:
+        return None
+    primeira = grupo.iloc[0]
+    return [(c.removeprefix("partition."), "=", str(primeira[c])) for c in colunas]
+
+
+def planejar_manutencao(
+    caminho: str,
+    colunas_zorder: list[str] | None = None,
+    tamanho_alvo: int = 128 * MB,
+    min_arquivos: int = 8,
+    razao_pequenos_min: float = 0.3,
+    sobreposicao_max: float = 0.5,
+    retencao_horas: int = 168,
+) -> list[dict]:
+    """
+    Decide, por partição, o que precisa de manutenção:
+    - "zorder" quando alguma coluna candidata tem sobreposição acima de `sobreposicao_max`
+      (o z-order também compacta);
+    - "compactar" quando há pelo menos `min_arquivos` arquivos e a fração de pequenos passa
+      de `razao_pequenos_min`;
+    - "vacuum" na tabela quando existem arquivos removidos além da retenção (checagem de
+      retenção sempre ligada).
+    Cada ação traz `bytes` (volume reescrito, usado no orçamento) e `prioridade`.
+    """
+    from deltalake import DeltaTable
+
+    colunas_zorder = colunas_zorder or []
+    dt = DeltaTable(caminho)
+    perfil = perfil_tabela(dt, colunas_zorder, tamanho_alvo)
+    plano = []
+    for linha in perfil.to_dict("records"):
+        if linha["particao_nula"]:
+            # partition_filters não expressam IS NULL (str(None) viraria a partição "None"): fica fora do plano
+            continue
+        sobrepostas = [c for c in colunas_zorder if linha.get(f"sobreposicao.{c}", 0.0) > sobreposicao_max]
+        base = {"tabela": caminho, "particao": linha["particao"], "filtros": linha["filtros"],
+                "arquivos_antes": linha["arquivos"]}
+        if sobrepostas and linha["arquivos"] > 1:
+            excesso = max(linha[f"sobreposicao.{c}"] for c in sobrepostas) - sobreposicao_max
+            plano.append({**base, "acao": "zorder", "colunas": list(colunas_zorder),
+                          "bytes": linha["bytes"], "prioridade": excesso * linha["arquivos"]})
+        elif linha["arquivos"] >= min_arquivos and linha["razao_pequenos"] >= razao_pequenos_min:
+            plano.append({**base, "acao": "compactar", "tamanho_alvo": tamanho_alvo,
+                          "bytes": linha["bytes_pequenos"], "prioridade": float(linha["pequenos"])})
+
+    removiveis = dt.vacuum(retention_hours=retencao_horas, dry_run=True, enforce_retention_duration=True)
+    if removiveis:
+        plano.append({"tabela": caminho, "particao": None, "filtros": None, "acao": "vacuum",
+                      "retencao_horas": retencao_horas, "arquivos_antes": len(removiveis),
+                      "bytes": 0, "prioridade": float(len(removiveis))})
+    return plano
+
+
+def aplicar_orcamento(planos: list[dict], orcamento_bytes: int | None) -> list[dict]:
+    """Ordena as ações de várias tabelas por prioridade e corta no orçamento de bytes reescritos da janela."""
+    selecionadas, usado = [], 0
+    for acao in sorted(planos, key=lambda a: a["prioridade"], reverse=True):
+        if orcamento_bytes is not None and usado + acao["bytes"] > orcamento_bytes:
+            continue
+        usado += acao["bytes"]
+        selecionadas.append(acao)
+    return selecionadas
+
+
+def _medir_scan(caminho: str, filtro, colunas: list[str] | None) -> float:
+    from deltalake import DeltaTable
+
+    inicio = time.perf_counter()
+    DeltaTable(caminho).to_pyarrow_dataset().to_table(filter=filtro, columns=colunas)
+    return time.perf_counter() - inicio
+
+
+def _contar_arquivos(caminho: str, filtros: list[tuple] | None) -> int:
+    """Arquivos ativos da partição, pelas add actions do log (files/file_uris com partition_filters estão depreciados)."""
+    from deltalake import DeltaTable
+
+    acoes = acoes_arquivos(DeltaTable(caminho))
+    selecionados = np.ones(len(acoes), dtype=bool)
+    for coluna, _, valor in filtros or []:  # mesmos valores em texto de _filtros_particao
+        selecionados &= (acoes[f"partition.{coluna}"].astype(str) == valor).to_numpy()
+    return int(selecionados.sum())
+
+
+def executar_plano(
+    plano: list[dict],
+    consultas: dict[str, dict] | None = None,
+    caminho_log: str | None = None,
+) -> list[dict]:
+    """
+    Executa as ações e registra arquivos antes/depois e, se houver consulta de referência
+    para a tabela (`{"filtro": expr_pyarrow, "colunas": [...]}`), o tempo de scan antes/depois.
+    Os registros são anexados em JSON lines em `caminho_log`.
+    """
+    from deltalake import DeltaTable
+
+    consultas = consultas or {}
+    registros = []
+    for acao in plano:
+        caminho, filtros = acao["tabela"], acao["filtros"]
+        consulta = consultas.get(caminho)
+        registro = {k: v for k, v in acao.items() if k != "filtros"}
+        registro["inicio"] = pd.Timestamp.now(tz="UTC").isoformat()
+        if consulta and acao["acao"] != "vacuum":
+            registro["scan_antes_s"] = _medir_scan(caminho, consulta.get("filtro"), consulta.get("colunas"))
+
+        dt = DeltaTable(caminho)
+        inicio = time.perf_counter()
+        if acao["acao"] == "compactar":
+            registro["metricas"] = dt.optimize.compact(partition_filters=filtros, target_size=acao["tamanho_alvo"])
+        elif acao["acao"] == "zorder":
+            registro["metricas"] = dt.optimize.z_order(acao["colunas"], partition_filters=filtros)
+        else:
+            registro["removidos"] = len(dt.vacuum(retention_hours=acao["retencao_horas"], dry_run=False,
+                                                  enforce_retention_duration=True))
+        registro["duracao_s"] = time.perf_counter() - inicio
+
+        if acao["acao"] != "vacuum":
+            registro["arquivos_depois"] = _contar_arquivos(caminho, filtros)
+            if consulta:
+                registro["scan_depois_s"] = _medir_scan(caminho, consulta.get("filtro"), consulta.get("colunas"))
+        registros.append(registro)
+
+        if caminho_log:
+            with open(caminho_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, default=str, ensure_ascii=False) + "\n")
+    return registros
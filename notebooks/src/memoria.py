@@ -0,0 +1,175 @@
+# e:\engDados-Solucoes\notebooks\src\memoria.py
+"""
+Redução de memória de DataFrames carregados: categorias para colunas de baixa cardinalidade,
+downcast de inteiros/floats, strings Arrow e tipos nullable. Gera um manifesto de dtypes
+(JSON) que reverte a conversão ou é reaplicado direto na leitura dos próximos arquivos.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+VERSAO_MANIFESTO = 1
+
+
+def _string_arrow() -> str | None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return "string[pyarrow]"
+
+
+def _menor_inteiro(s: pd.Series, nullable: bool) -> str:
+    minimo, maximo = s.min(), s.max()
+    candidatos = (["uint8", "uint16", "uint32", "uint64"] if minimo >= 0 else []) + ["int8", "int16", "int32", "int64"]
+    for tipo in candidatos:
+        info = np.iinfo(tipo)
+        if info.min <= minimo and maximo <= info.max:
+            return tipo.capitalize().replace("Uint", "UInt") if nullable else tipo
+    return "Int64" if nullable else "int64"
+
+
+def _dtype_otimizado(s: pd.Series, proporcao_categoria: float, strings_arrow: bool) -> str | None:
+    """Dtype mais compacto que preserva os valores da coluna (None = manter)."""
+    dtype = s.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype) \
+            or pd.api.types.is_datetime64_any_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype):
+        return None
+    validos = s.dropna()
+    if pd.api.types.is_integer_dtype(dtype):
+        if not len(validos):
+            return None
+        return _menor_inteiro(validos, nullable=pd.api.types.is_extension_array_dtype(dtype))
+    if pd.api.types.is_float_dtype(dtype):
+        if not len(validos):
+            return None
+        v = validos.to_numpy(dtype="float64")
+        if np.isfinite(v).all() and (v == np.round(v)).all() and np.abs(v).max() < 2**53:
+            return _menor_inteiro(validos, nullable=True)  # ids lidos como float por causa de NaN
+        if np.array_equal(v.astype(np.float32).astype(np.float64), v) and dtype != np.float32:
+            return "float32"
+        return None
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        if not len(validos) or not validos.map(type).eq(str).all():
+            return None  # objetos mistos ficam como estão
+        if validos.nunique() <= proporcao_categoria * len(s):
+            return "category"
+        tipo_arrow = _string_arrow() if strings_arrow else None
+        return tipo_arrow if tipo_arrow and str(dtype) != tipo_arrow else None
+    return None
+
+
+def otimizar_memoria(df: pd.DataFrame, proporcao_categoria: float = 0.5, strings_arrow: bool = True,
+                     caminho_manifesto: str | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    Converte cada coluna para o dtype mais compacto e devolve (df otimizado, manifesto).
+    O manifesto traz dtype original/otimizado e bytes antes/depois por coluna e no total.
+    """
+    antes = df.memory_usage(deep=True, index=False)
+    out, colunas = df.copy(deep=False), {}
+    for c in df.columns:
+        novo = _dtype_otimizado(df[c], proporcao_categoria, strings_arrow)
+        if novo is not None:
+            out[c] = df[c].astype(novo)
+        colunas[str(c)] = {"original": str(df[c].dtype), "otimizado": str(out[c].dtype),
+                           "bytes_antes": int(antes[c]), "bytes_depois": 0}
+    depois = out.memory_usage(deep=True, index=False)
+    for c in df.columns:
+        colunas[str(c)]["bytes_depois"] = int(depois[c])
+    manifesto = {"versao": VERSAO_MANIFESTO, "bytes_antes": int(antes.sum()), "bytes_depois": int(depois.sum()),
+                 "colunas": colunas}
+    if caminho_manifesto:
+        salvar_manifesto(manifesto, caminho_manifesto)
+    return out, manifesto
+
+
+def resumo_memoria(manifesto: dict) -> pd.DataFrame:
+    """Relatório por coluna (bytes antes/depois e redução), maiores ganhos primeiro."""
+    rel = pd.DataFrame.from_dict(manifesto["colunas"], orient="index")
+    rel["reducao"] = 1 - rel["bytes_depois"] / rel["bytes_antes"].where(rel["bytes_antes"] > 0)
+    return rel.sort_values("bytes_antes", ascending=False)
+
+
+def salvar_manifesto(manifesto: dict, caminho: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+
+
+def carregar_manifesto(caminho: str) -> dict:
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _depende_dos_valores(tipo: str) -> bool:
+    """Inteiros e float32 do manifesto só valem para a faixa do arquivo perfilado; category/string valem sempre."""
+    return tipo.lower() == "float32" or tipo.lower().startswith(("int", "uint"))
+
+
+def _cabe(s: pd.Series, tipo: str) -> bool:
+    """Os valores da coluna cabem no dtype sem perda?"""
+    base = tipo.lower()
+    if not _depende_dos_valores(tipo):
+        return True
+    if not pd.api.types.is_numeric_dtype(s.dtype) or pd.api.types.is_bool_dtype(s.dtype):
+        return False
+    v = s.to_numpy(dtype="float64", na_value=np.nan)
+    nulos = np.isnan(v)
+    if base == "float32":
+        return bool(np.array_equal(v.astype(np.float32).astype(np.float64), v, equal_nan=True))
+    if nulos.any() and tipo == base:  # int numpy não aceita nulos
+        return False
+    v = v[~nulos]
+    if not len(v):
+        return True
+    if pd.api.types.is_integer_dtype(s.dtype):
+        minimo, maximo = int(s.min()), int(s.max())  # sem passar por float (int64 grandes)
+    elif not (np.isfinite(v).all() and (v == np.round(v)).all()):
+        return False
+    else:
+        minimo, maximo = v.min(), v.max()
+    info = np.iinfo(base)
+    return bool(info.min <= minimo and maximo <= info.max)
+
+
+def aplicar_manifesto(df: pd.DataFrame, manifesto: dict) -> pd.DataFrame:
+    """
+    Reaplica os dtypes otimizados a um DataFrame recém-carregado (sem novo perfil). Os dtypes
+    numéricos estreitos vieram da faixa de outro arquivo: coluna cujo min/max não cabe volta ao
+    dtype original (ou fica como foi lida, se nem o original a comporta).
+    """
+    tipos = {}
+    for c, m in manifesto["colunas"].items():
+        if c not in df.columns or m["otimizado"] == m["original"] or str(df[c].dtype) == m["otimizado"]:
+            continue
+        if _cabe(df[c], m["otimizado"]):
+            tipos[c] = m["otimizado"]
+        elif str(df[c].dtype) != m["original"] and _cabe(df[c], m["original"]):
+            tipos[c] = m["original"]
+    return df.astype(tipos) if tipos else df
+
+
+def restaurar_dtypes(df: pd.DataFrame, manifesto: dict) -> pd.DataFrame:
+    """Desfaz a otimização, voltando cada coluna ao dtype original registrado no manifesto."""
+    tipos = {c: m["original"] for c, m in manifesto["colunas"].items() if c in df.columns and str(df[c].dtype) != m["original"]}
+    return df.astype(tipos) if tipos else df
+
+
+def ler_otimizado(caminho: str, caminho_manifesto: str | None = None, **kwargs) -> pd.DataFrame:
+    """
+    Lê CSV/Parquet já com dtypes compactos. Se o manifesto existir, os dtypes vão direto para o
+    leitor (o CSV nem chega a materializar colunas object); senão o perfil é feito e salvo.
+    """
+    caminho_manifesto = caminho_manifesto or f"{os.path.splitext(caminho)[0]}.dtypes.json"
+    parquet = caminho.endswith((".parquet", ".pq"))
+    if os.path.exists(caminho_manifesto):
+        manifesto = carregar_manifesto(caminho_manifesto)
+        if parquet:
+            return aplicar_manifesto(pd.read_parquet(caminho, **kwargs), manifesto)
+        # Só dtypes que não dependem dos valores vão para o leitor; os numéricos são conferidos depois
+        tipos = {c: m["otimizado"] for c, m in manifesto["colunas"].items() if not _depende_dos_valores(m["otimizado"])}
+        return aplicar_manifesto(pd.read_csv(caminho, dtype={**tipos, **kwargs.pop("dtype", {})}, **kwargs), manifesto)
+    df = pd.read_parquet(caminho, **kwargs) if parquet else pd.read_csv(caminho, **kwargs)
+    return otimizar_memoria(df, caminho_manifesto=caminho_manifesto)[0]
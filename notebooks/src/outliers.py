@@ -0,0 +1,84 @@
+# e:\engDados-Solucoes\notebooks\src\outliers.py
+"""
+Pontuação de outliers em fluxo para transações (11.AnaliseFraude): z-score robusto
+0.6745 * (x - mediana) / MAD contra o histórico global (EsbocoQuantis) e o da própria conta
+(EsbocoGrupos), ambos com erro relativo `alfa`. Cada micro-lote é pontuado de forma vetorizada
+antes de entrar no histórico, e a memória não cresce com o número de eventos.
+"""
+import numpy as np
+import pandas as pd
+
+from src.estatisticas import EsbocoGrupos, EsbocoQuantis
+
+COLUNAS_FRAUDE = ["TransactionAmount", "TransactionDuration", "AccountBalance"]
+CONSTANTE_MAD = 0.6745
+
+
+def z_robusto(valores: np.ndarray, mediana, mad) -> np.ndarray:
+    """z = 0.6745 * (x - mediana) / MAD; NaN enquanto não há histórico ou quando MAD é zero."""
+    mad = np.where(np.asarray(mad, dtype="float64") > 0, mad, np.nan)
+    return CONSTANTE_MAD * (valores - mediana) / mad
+
+
+class DetectorOutliers:
+    """Estado incremental global e por conta; `pontuar` devolve z-scores e a marca de outlier por evento."""
+
+    def __init__(self, colunas: list[str] | None = None, coluna_conta: str | None = "AccountID",
+                 limite: float = 3.5, min_eventos_conta: int = 20, alfa: float = 0.01):
+        self.colunas = colunas or COLUNAS_FRAUDE
+        self.coluna_conta, self.limite, self.min_eventos_conta = coluna_conta, limite, min_eventos_conta
+        self.globais = {c: EsbocoQuantis(alfa) for c in self.colunas}
+        self.contas = {c: EsbocoGrupos(alfa) for c in self.colunas}
+        self._ids_contas: dict = {}
+        self.eventos = 0
+
+    def _grupos(self, contas: pd.Series) -> np.ndarray:
+        """Identificador da conta -> linha nos histogramas por conta (contas novas ganham linha nova)."""
+        codigos, unicas = pd.factorize(contas)
+        linhas = np.fromiter((self._ids_contas.setdefault(u, len(self._ids_contas)) for u in unicas.tolist()),
+                             dtype=np.int64, count=len(unicas))
+        return np.where(codigos >= 0, linhas[codigos], -1) if len(unicas) else np.full(len(contas), -1, np.int64)
+
+    def pontuar(self, lote: pd.DataFrame, atualizar: bool = True) -> pd.DataFrame:
+        """
+        Pontua o micro-lote contra o estado anterior a ele e, com atualizar=True, incorpora o lote.
+        `score` é o maior |z| entre colunas e escopos (global/conta); outlier quando score > limite.
+        """
+        por_conta = self.coluna_conta is not None and self.coluna_conta in lote.columns
+        grupos = self._grupos(lote[self.coluna_conta]) if por_conta else None
+        if por_conta:
+            unicos, inversa = np.unique(np.maximum(grupos, 0), return_inverse=True)
+        out = pd.DataFrame(index=lote.index)
+        score = np.full(len(lote), np.nan)
+        for c in self.colunas:
+            valores = pd.to_numeric(lote[c], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            mediana, mad = self.globais[c].mediana_mad()
+            z = z_robusto(valores, mediana, mad)
+            out[f"z_{c}"] = z
+            score = np.fmax(score, np.abs(z))
+            if por_conta:
+                med_c, mad_c, n_c = self.contas[c].mediana_mad(unicos)
+                confiavel = (n_c >= self.min_eventos_conta)[inversa] & (grupos >= 0)
+                z_c = np.where(confiavel, z_robusto(valores, med_c[inversa], mad_c[inversa]), np.nan)
+                out[f"z_{c}_conta"] = z_c
+                score = np.fmax(score, np.abs(z_c))
+            if atualizar:
+                self.globais[c].atualizar(valores)
+                if por_conta:
+                    validos = grupos >= 0
+                    self.contas[c].atualizar(grupos[validos], valores[validos])
+        out["score"] = score
+        out["outlier"] = score > self.limite
+        if atualizar:
+            self.eventos += len(lote)
+        return out
+
+    def resumo(self) -> pd.DataFrame:
+        """Mediana/MAD globais e quartis atuais por coluna."""
+        linhas = {}
+        for c, esboco in self.globais.items():
+            mediana, mad = esboco.mediana_mad()
+            q1, q3 = esboco.quantis([0.25, 0.75])
+            linhas[c] = {"n": esboco.n, "mediana": mediana, "mad": mad, "q1": q1, "q3": q3,
+                         "minimo": esboco.minimo, "maximo": esboco.maximo}
+        return pd.DataFrame.from_dict(linhas, orient="index")
@@ -0,0 +1,238 @@
+# e:\engDados-Solucoes\notebooks\src\pipeline_estagios.py
+"""
+Executor de pipeline por estágios (ler -> validar -> processar -> gravar) ligados por filas
+limitadas: cada estágio tem seus próprios trabalhadores (threads ou processos), a fila cheia
+bloqueia o estágio anterior (backpressure) e a capacidade da fila é a profundidade de prefetch.
+O relatório por estágio mostra utilização e tempo esperando entrada/saída; a vazão tende à do
+estágio mais lento em vez da soma de todos.
+"""
+import heapq
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.instrumentacao import span
+
+_FIM = object()
+_ESPERA = 0.05  # s entre checagens de cancelamento em get/put bloqueados
+
+
+def _contexto_processos():
+    """forkserver onde existe (Linux/macOS), senão spawn (Windows): fork com threads vivas pode travar."""
+    metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(metodo)
+
+
+class Estagio:
+    """
+    funcao(item) -> item do próximo estágio. modo="processo" usa um ProcessPoolExecutor com
+    `trabalhadores` processos iniciados por forkserver/spawn (nunca fork, que copiaria as threads
+    do pipeline): funcao precisa ser importável pelo módulo e os itens serializáveis com pickle.
+    `capacidade` é o tamanho da fila de entrada do estágio (no primeiro, o prefetch da fonte).
+    """
+
+    def __init__(self, nome: str, funcao, trabalhadores: int = 1, modo: str = "thread", capacidade: int = 2):
+        if modo not in {"thread", "processo"}:
+            raise ValueError("modo deve ser 'thread' ou 'processo'.")
+        self.nome, self.funcao, self.modo = nome, funcao, modo
+        self.trabalhadores, self.capacidade = trabalhadores, capacidade
+
+
+class _Metricas:
+    def __init__(self, nome: str, trabalhadores: int):
+        self.nome, self.trabalhadores = nome, trabalhadores
+        self.itens, self.ocupado, self.espera_entrada, self.espera_saida = 0, 0.0, 0.0, 0.0
+        self._trava = threading.Lock()
+
+    def somar(self, ocupado: float, espera_entrada: float, espera_saida: float) -> None:
+        with self._trava:
+            self.itens += 1
+            self.ocupado += ocupado; self.espera_entrada += espera_entrada; self.espera_saida += espera_saida
+
+    def linha(self, parede: float) -> dict:
+        capacidade = parede * self.trabalhadores
+        return {"estagio": self.nome, "trabalhadores": self.trabalhadores, "itens": self.itens,
+                "ocupado_s": round(self.ocupado, 4), "espera_entrada_s": round(self.espera_entrada, 4),
+                "espera_saida_s": round(self.espera_saida, 4),
+                "utilizacao": round(self.ocupado / capacidade, 4) if capacidade else None,
+                "s_por_item": round(self.ocupado / self.itens, 6) if self.itens else None,
+                "vazao_max_itens_s": round(self.trabalhadores * self.itens / self.ocupado, 2) if self.ocupado else None}
+
+
+class PipelineEstagios:
+    """
+    `iterar(fonte)` roda a fonte (iterável, ex.: chunks de read_csv) em uma thread de prefetch e
+    entrega os resultados do último estágio; `executar(fonte)` devolve a lista. A primeira exceção
+    de qualquer estágio cancela o pipeline e é relançada para quem consome.
+    `capacidade_saida` limita os resultados prontos à espera do consumidor. Ficam em voo no máximo
+    soma(capacidade + trabalhadores) + capacidade_saida itens, contando os que aguardam reordenação.
+    """
+
+    def __init__(self, estagios: list[Estagio], ordenado: bool = True, capacidade_saida: int = 2):
+        if not estagios:
+            raise ValueError("O pipeline precisa de ao menos um estágio.")
+        self.estagios, self.ordenado, self.capacidade_saida = estagios, ordenado, capacidade_saida
+        self.metricas: list[_Metricas] = []
+        self.parede = 0.0
+
+    def _put(self, fila: queue.Queue, item, cancelar: threading.Event) -> float:
+        inicio = time.perf_counter()
+        while not cancelar.is_set():
+            try:
+                fila.put(item, timeout=_ESPERA)
+                break
+            except queue.Full:
+                pass
+        return time.perf_counter() - inicio
+
+    def _get(self, fila: queue.Queue, cancelar: threading.Event):
+        while not cancelar.is_set():
+            try:
+                return fila.get(timeout=_ESPERA)
+            except queue.Empty:
+                pass
+        return _FIM
+
+    def _fonte(self, fonte, saida, metricas, vagas, cancelar, erros):
+        try:
+            iterador, seq = iter(fonte), 0
+            while not cancelar.is_set():
+                inicio = time.perf_counter()
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    break
+                ocupado = time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                while not vagas.acquire(timeout=_ESPERA):
+                    if cancelar.is_set():
+                        return
+                espera = time.perf_counter() - inicio
+                metricas.somar(ocupado, 0.0, espera + self._put(saida, (seq, item), cancelar))
+                seq += 1
+        except BaseException as e:
+            erros.append(e); cancelar.set()
+        finally:
+            self._put(saida, _FIM, cancelar)
+
+    def _trabalhador(self, estagio, executor, entrada, saida, metricas, restantes, cancelar, erros):
+        try:
+            while True:
+                inicio = time.perf_counter()
+                pacote = self._get(entrada, cancelar)
+                espera_entrada = time.perf_counter() - inicio
+                if pacote is _FIM:
+                    self._put(entrada, _FIM, cancelar)  # repassa para os outros trabalhadores do estágio
+                    break
+                seq, item = pacote
+                inicio = time.perf_counter()
+                with span(f"pipeline.{estagio.nome}", seq=seq):
+                    resultado = (executor.submit(estagio.funcao, item).result() if executor is not None
+                                 else estagio.funcao(item))
+                ocupado = time.perf_counter() - inicio
+                metricas.somar(ocupado, espera_entrada, self._put(saida, (seq, resultado), cancelar))
+        except BaseException as e:
+            erros.append(e); cancelar.set()
+        finally:
+            with restantes[1]:
+                restantes[0] -= 1
+                ultimo = restantes[0] == 0
+            if ultimo:
+                self._put(saida, _FIM, cancelar)
+
+    def iterar(self, fonte):
+        cancelar, erros = threading.Event(), []
+        # filas[i] = entrada do estágio i; a última recebe os resultados
+        filas = [queue.Queue(maxsize=e.capacidade) for e in self.estagios] + [queue.Queue(maxsize=self.capacidade_saida)]
+        self.metricas = [_Metricas("fonte", 1)] + [_Metricas(e.nome, e.trabalhadores) for e in self.estagios]
+        executores = [ProcessPoolExecutor(e.trabalhadores, mp_context=_contexto_processos()) if e.modo == "processo"
+                      else None for e in self.estagios]
+        # limite de seqs em voo: sem ele, um item lento faz o heap de reordenação crescer sem fim
+        vagas = threading.Semaphore(sum(e.capacidade + e.trabalhadores for e in self.estagios) + self.capacidade_saida)
+        threads = [threading.Thread(target=self._fonte, name="pipeline-fonte", daemon=True,
+                                    args=(fonte, filas[0], self.metricas[0], vagas, cancelar, erros))]
+        for i, (estagio, executor) in enumerate(zip(self.estagios, executores)):
+            restantes = [estagio.trabalhadores, threading.Lock()]
+            threads += [threading.Thread(target=self._trabalhador, name=f"pipeline-{estagio.nome}-{t}", daemon=True,
+                                         args=(estagio, executor, filas[i], filas[i + 1], self.metricas[i + 1],
+                                               restantes, cancelar, erros))
+                        for t in range(estagio.trabalhadores)]
+        inicio = time.perf_counter()
+        for t in threads:
+            t.start()
+        try:
+            pendentes, proximo = [], 0
+            while True:
+                pacote = self._get(filas[-1], cancelar)
+                if pacote is _FIM:
+                    break
+                if not self.ordenado:
+                    vagas.release()
+                    yield pacote[1]
+                    continue
+                heapq.heappush(pendentes, pacote)  # seq é único: a comparação nunca chega ao item
+                while pendentes and pendentes[0][0] == proximo:
+                    vagas.release()
+                    yield heapq.heappop(pendentes)[1]
+                    proximo += 1
+        finally:
+            cancelar.set()
+            for t in threads:
+                t.join()
+            for executor in filter(None, executores):
+                executor.shutdown(cancel_futures=True)
+            self.parede = time.perf_counter() - inicio
+        if erros:
+            raise erros[0]
+
+    def executar(self, fonte) -> list:
+        return list(self.iterar(fonte))
+
+    def relatorio(self) -> list[dict]:
+        """Uma linha por estágio (incluindo a fonte); gargalo = maior utilização."""
+        linhas = [m.linha(self.parede) for m in self.metricas]
+        gargalo = max(linhas, key=lambda l: l["utilizacao"] or 0, default=None)
+        for l in linhas:
+            l["gargalo"] = l is gargalo
+        return linhas
+
+
+def _validar(df):
+    from src import contrato
+
+    return contrato.schema_entrada.validate(df, lazy=True)
+
+
+def _processar(df):
+    from src.processamento import processar
+
+    return processar(df)
+
+
+def pipeline_csv(caminho_csv: str, pasta_saida: str, linhas_por_lote: int = 1_000_000,
+                 processos: int = 0, gravadores: int = 2) -> tuple[list[str], list[dict]]:
+    """
+    Fluxo do notebook 08 em estágios: leitura em lotes (fonte) -> contrato de entrada -> processar ->
+    Parquet por lote. processos > 0 roda o processar em processos; senão, em uma thread.
+    Devolve (arquivos gravados, relatório por estágio).
+    """
+    import pandas as pd
+
+    os.makedirs(pasta_saida, exist_ok=True)
+
+    def gravar(df):
+        # o índice do chunk continua entre lotes: nome determinístico mesmo com vários gravadores
+        caminho = os.path.join(pasta_saida, f"parte-{df.index[0] if len(df) else 0:012d}.parquet")
+        df.to_parquet(caminho, index=False)
+        return caminho
+
+    pipeline = PipelineEstagios([
+        Estagio("validar", _validar),
+        Estagio("processar", _processar, trabalhadores=max(processos, 1), modo="processo" if processos else "thread"),
+        Estagio("gravar", gravar, trabalhadores=gravadores),
+    ])
+    arquivos = pipeline.executar(pd.read_csv(caminho_csv, chunksize=linhas_por_lote))
+    return arquivos, pipeline.relatorio()
@@ -2,6 +2,9 @@
 import numpy as np
 import pandas as pd
 
+from src.instrumentacao import instrumentar
+
+@instrumentar("processar")
 def processar(df: pd.DataFrame, ao_dividir_zero: str = "nan") -> pd.DataFrame:
     if ao_dividir_zero not in {"nan", "inf", "raise"}:
         raise ValueError("ao_dividir_zero deve ser 'nan', 'inf' ou 'raise'.")
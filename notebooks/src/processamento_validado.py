@@ -1,12 +1,19 @@
 # e:\engDados-Solucoes\notebooks\src\processamento_validado.py
 import pandas as pd
 from src.processamento import processar
-from src.contrato import schema_entrada, schema_saida
+from src import contrato
+from src.instrumentacao import instrumentar, span
 
+@instrumentar("processar_validado")
 def processar_validado(df: pd.DataFrame, ao_dividir_zero: str = "nan") -> pd.DataFrame:
     """
     Valida entrada (tipos/coerção), processa, e valida saída.
     """
-    df_ok = schema_entrada.validate(df, lazy=True)
+    with span("validacao.schema_entrada") as s:
+        df_ok = contrato.schema_entrada.validate(df, lazy=True)
+        s.saida(df_ok)
     out = processar(df_ok, ao_dividir_zero=ao_dividir_zero)
-    return schema_saida.validate(out, lazy=True)
+    with span("validacao.schema_saida") as s:
+        out = contrato.schema_saida.validate(out, lazy=True)
+        s.saida(out)
+    return out
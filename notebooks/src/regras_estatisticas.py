@@ -0,0 +1,192 @@
+# e:\engDados-Solucoes\notebooks\src\regras_estatisticas.py
+"""
+Pré-avaliação de regras de qualidade (não nulo, intervalo) pelas estatísticas de row groups
+Parquet ou de arquivos Delta: min/max/null_count provam PASS ou FAIL de unidades inteiras
+sem ler dados; só as unidades inconclusivas têm a coluna lida e verificada.
+"""
+import glob
+import os
+
+# regras geradas pelo agente (inglês) -> formato interno
+TIPOS_REGRA = {
+    "nao_nulo": "nao_nulo", "not_null": "nao_nulo", "completeness": "nao_nulo", "notnull": "nao_nulo",
+    "intervalo": "intervalo", "range": "intervalo", "between": "intervalo",
+    "min_value": "intervalo", "max_value": "intervalo", "non_negative": "intervalo",
+}
+
+
+def normalizar_regra(regra: dict) -> dict | None:
+    """{"id", "coluna", "tipo", "minimo", "maximo"}; None se o tipo não é decidível por estatísticas."""
+    params = regra.get("parameters") or {}
+    tipo_original = str(regra.get("tipo") or regra.get("rule_type") or "").lower()
+    tipo = TIPOS_REGRA.get(tipo_original)
+    if tipo is None:
+        return None
+    minimo = regra.get("minimo", params.get("min", params.get("min_value")))
+    maximo = regra.get("maximo", params.get("max", params.get("max_value")))
+    if tipo_original == "non_negative":
+        minimo = 0
+    if tipo == "intervalo" and minimo is None and maximo is None:
+        return None
+    return {"id": regra.get("id") or regra.get("rule_id"), "coluna": regra.get("coluna") or regra.get("column_name"),
+            "tipo": tipo, "minimo": minimo, "maximo": maximo}
+
+
+def unidades_parquet(caminhos: list[str], coluna: str) -> list[dict]:
+    """Um item por row group: linhas, nulos, min, max (None quando a estatística falta) e o leitor da coluna."""
+    import pyarrow.parquet as pq
+
+    unidades = []
+    for caminho in caminhos:
+        arquivo = pq.ParquetFile(caminho)
+        meta = arquivo.metadata
+        indice = meta.schema.names.index(coluna)
+        for i in range(meta.num_row_groups):
+            grupo = meta.row_group(i)
+            stats = grupo.column(indice).statistics
+            unidades.append({
+                "unidade": f"{os.path.basename(caminho)}#rg{i}", "linhas": grupo.num_rows, "bytes": grupo.column(indice).total_compressed_size,
+                "nulos": stats.null_count if stats is not None and stats.has_null_count else None,
+                "min": stats.min if stats is not None and stats.has_min_max else None,
+                "max": stats.max if stats is not None and stats.has_min_max else None,
+                "ler": (lambda a=arquivo, i=i: a.read_row_group(i, columns=[coluna]).column(0)),
+            })
+    return unidades
+
+
+def _valor_particao(valor, tipo):
+    """partitionValues vêm como texto em versões antigas do delta-rs: converte para o tipo do schema."""
+    import pyarrow as pa
+
+    if valor is None or valor != valor:  # nulo (NaN quando a coluna veio float pelo pandas)
+        return None
+    if isinstance(valor, str) and not pa.types.is_string(tipo) and not pa.types.is_large_string(tipo):
+        try:
+            return pa.array([valor]).cast(tipo)[0].as_py()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            return valor
+    return valor.item() if hasattr(valor, "item") else valor
+
+
+def unidades_delta(dt, coluna: str) -> list[dict]:
+    """Um item por arquivo ativo, a partir das estatísticas do log (add actions)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from src.manutencao_delta import acoes_arquivos
+
+    acoes = acoes_arquivos(dt).to_dict("records")
+    raiz = dt.table_uri.removeprefix("file://")
+    tipo = pa.schema(dt.schema().to_arrow()).field(coluna).type
+    unidades = []
+    for a in acoes:
+        caminho = os.path.join(raiz, a["path"])
+        if f"partition.{coluna}" in a:  # coluna de partição: não está no arquivo, o valor vale para todas as linhas
+            valor = _valor_particao(a[f"partition.{coluna}"], tipo)
+            nulos, minimo, maximo = (a["num_records"], None, None) if valor is None else (0, valor, valor)
+            ler = (lambda v=valor, n=a["num_records"]: pa.repeat(pa.scalar(v, type=tipo), n))
+        else:
+            nulos, minimo, maximo = a.get(f"null_count.{coluna}"), a.get(f"min.{coluna}"), a.get(f"max.{coluna}")
+            ler = (lambda c=caminho: pq.read_table(c, columns=[coluna]).column(0))
+        unidades.append({
+            "unidade": a["path"], "linhas": a["num_records"], "bytes": a.get("size_bytes"),
+            "nulos": None if nulos is None or nulos != nulos else int(nulos),
+            "min": None if minimo is None or minimo != minimo else minimo,
+            "max": None if maximo is None or maximo != maximo else maximo,
+            "ler": ler,
+        })
+    return unidades
+
+
+def decidir(regra: dict, u: dict) -> tuple[str, int | None]:
+    """("PASS", 0), ("FAIL", violações) ou ("INCONCLUSIVO", None) só com as estatísticas da unidade."""
+    if regra["tipo"] == "nao_nulo":
+        if u["nulos"] is None:
+            return "INCONCLUSIVO", None
+        return ("PASS", 0) if u["nulos"] == 0 else ("FAIL", u["nulos"])
+    # intervalo: nulos não violam (ficam para a regra de não nulo)
+    if u["nulos"] is not None and u["nulos"] == u["linhas"]:
+        return "PASS", 0
+    if u["min"] is None or u["max"] is None:
+        return "INCONCLUSIVO", None
+    lo, hi = regra["minimo"], regra["maximo"]
+    try:
+        if (lo is None or u["min"] >= lo) and (hi is None or u["max"] <= hi):
+            return "PASS", 0
+        if u["nulos"] is not None and ((lo is not None and u["max"] < lo) or (hi is not None and u["min"] > hi)):
+            return "FAIL", u["linhas"] - u["nulos"]
+    except TypeError:  # tipos incomparáveis (ex.: estatística em texto truncado)
+        pass
+    return "INCONCLUSIVO", None
+
+
+def contar_violacoes(regra: dict, coluna) -> int:
+    import pyarrow.compute as pc
+
+    if regra["tipo"] == "nao_nulo":
+        return coluna.null_count
+    fora = None
+    if regra["minimo"] is not None:
+        fora = pc.less(coluna, regra["minimo"])
+    if regra["maximo"] is not None:
+        acima = pc.greater(coluna, regra["maximo"])
+        fora = acima if fora is None else pc.or_(fora, acima)
+    return int(pc.sum(fora).as_py() or 0)
+
+
+def _unidades(fonte, coluna: str) -> list[dict]:
+    if hasattr(fonte, "get_add_actions"):
+        return unidades_delta(fonte, coluna)
+    if os.path.isdir(os.path.join(fonte, "_delta_log")):
+        from deltalake import DeltaTable
+
+        return unidades_delta(DeltaTable(fonte), coluna)
+    caminhos = sorted(glob.glob(os.path.join(fonte, "**", "*.parquet"), recursive=True)) if os.path.isdir(fonte) else [fonte]
+    return unidades_parquet(caminhos, coluna)
+
+
+def avaliar_regras(fonte, regras: list[dict], contar_todas: bool = True) -> list[dict]:
+    """
+    Avalia as regras sobre um Parquet (arquivo ou pasta) ou tabela Delta (caminho ou DeltaTable).
+    Com contar_todas=False, a primeira unidade que prova FAIL encerra a regra (status sem contagem exata).
+    Regras que não são de não nulo/intervalo voltam com status "NAO_SUPORTADA" para o executor SQL.
+    As regras de uma coluna são avaliadas juntas, unidade por unidade: cada unidade inconclusiva é
+    lida uma vez e descartada em seguida, então a memória fica limitada a uma unidade.
+    """
+    resultados, por_coluna = [None] * len(regras), {}
+    for i, original in enumerate(regras):
+        regra = normalizar_regra(original)
+        if regra is None or not regra["coluna"]:
+            resultados[i] = {"id": original.get("id") or original.get("rule_id"), "status": "NAO_SUPORTADA"}
+        else:
+            por_coluna.setdefault(regra["coluna"], []).append((i, regra))
+
+    for coluna, pendentes in por_coluna.items():
+        unidades = _unidades(fonte, coluna)
+        total = sum(u["linhas"] for u in unidades)
+        for i, regra in pendentes:
+            resultados[i] = {"id": regra["id"], "coluna": coluna, "tipo": regra["tipo"], "status": "PASS",
+                             "violacoes": 0, "total": total, "exato": True, "unidades": len(unidades),
+                             "por_metadados": 0, "varridas": 0, "bytes_lidos": 0}
+        encerradas = set()
+        for u in unidades:
+            lida = None
+            for i, regra in pendentes:
+                if i in encerradas:
+                    continue
+                r = resultados[i]
+                decisao, n = decidir(regra, u)
+                if decisao == "INCONCLUSIVO":
+                    if lida is None:
+                        lida = u["ler"]()
+                        r["bytes_lidos"] += u["bytes"] or 0
+                    n = contar_violacoes(regra, lida); r["varridas"] += 1
+                else:
+                    r["por_metadados"] += 1
+                r["violacoes"] += n
+                if n:
+                    r["status"] = "FAIL"
+                    if not contar_todas:
+                        r["exato"] = False
+                        encerradas.add(i)
+    return resultados
@@ -0,0 +1,295 @@
+# e:\engDados-Solucoes\notebooks\src\vagas_linkedin.py
+"""
+Raspagem assíncrona de vagas (Linkedin-raspagem): listagem e páginas de vaga buscadas com asyncio,
+concorrência limitada + intervalo mínimo entre requisições, retry com backoff exponencial e estado
+incremental por job_link (vagas já vistas ou removidas, 404/410, não são baixadas de novo). O resultado
+é normalizado (time_posted/num_applicants tipados) e anexado como um novo arquivo Parquet por execução.
+"""
+import asyncio
+import http.client
+import json
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import quote_plus
+
+BASE_URL = "https://www.linkedin.com"
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/123.0 Safari/537.36"
+    )
+}
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+STATUS_AUSENTE = {404, 410}  # vaga removida: gravada no estado e não pedida de novo
+COLUNAS = ["job_title", "company_name", "experience_level", "type_of_contract", "easy_apply",
+           "time_posted", "num_applicants", "job_link"]
+# classe CSS -> campo (mesmos seletores de parse_job_page do notebook)
+CAMPOS_POR_CLASSE = {
+    "topcard__title": "job_title",
+    "topcard__org-name-link": "company_name",
+    "description__job-criteria-text--criteria": "criterios",
+    "posted-time-ago__text": "time_posted",
+    "num-applicants__caption": "num_applicants",
+}
+TAGS_VAZIAS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# unidade (en/pt) -> horas; mês e ano aproximados
+HORAS_POR_UNIDADE = {
+    "minute": 1 / 60, "minuto": 1 / 60, "hour": 1, "hora": 1, "day": 24, "dia": 24,
+    "week": 24 * 7, "semana": 24 * 7, "month": 24 * 30, "mes": 24 * 30, "mês": 24 * 30,
+    "year": 24 * 365, "ano": 24 * 365,
+}
+
+
+def link_vaga(job_id: str, base_url: str = BASE_URL) -> str:
+    return f"{base_url}/jobs/view/{job_id}/"
+
+
+class _ExtratorIds(HTMLParser):
+    """job_ids dos cards da listagem (data-entity-urn="urn:li:jobPosting:<id>")."""
+
+    def __init__(self):
+        super().__init__()
+        self.ids: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        partes = (dict(attrs).get("data-entity-urn") or "").split(":")
+        if len(partes) >= 4 and partes[3]:
+            self.ids.append(partes[3])
+
+
+class _ExtratorVaga(HTMLParser):
+    """Texto dos elementos de CAMPOS_POR_CLASSE (com tags aninhadas) e o ícone de candidatura externa."""
+
+    def __init__(self):
+        super().__init__()
+        self.campos: dict = {"criterios": []}
+        self.offsite = False
+        self._campo, self._profundidade, self._texto = None, 0, []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get("data-svg-class-name") == "apply-button__offsite-apply-icon-svg":
+            self.offsite = True
+        if self._campo is not None:
+            self._profundidade += tag not in TAGS_VAZIAS
+            return
+        classes = (attrs.get("class") or "").split()
+        campo = next((CAMPOS_POR_CLASSE[c] for c in classes if c in CAMPOS_POR_CLASSE), None)
+        if campo is not None and tag not in TAGS_VAZIAS:
+            self._campo, self._profundidade, self._texto = campo, 1, []
+
+    def handle_endtag(self, tag):
+        if self._campo is None:
+            return
+        self._profundidade -= 1
+        if self._profundidade == 0:
+            texto = " ".join("".join(self._texto).split()) or None
+            if self._campo == "criterios":
+                self.campos["criterios"].append(texto)
+            else:
+                self.campos.setdefault(self._campo, texto)
+            self._campo = None
+
+    def handle_data(self, data):
+        if self._campo is not None:
+            self._texto.append(data)
+
+
+def extrair_ids(html: str) -> list[str]:
+    extrator = _ExtratorIds()
+    extrator.feed(html)
+    return extrator.ids
+
+
+def extrair_vaga(html: str, job_id: str, base_url: str = BASE_URL) -> dict:
+    """Mesmos campos de parse_job_page (notebook), via html.parser da biblioteca padrão."""
+    extrator = _ExtratorVaga()
+    extrator.feed(html)
+    campos, criterios = extrator.campos, extrator.campos["criterios"]
+    return {
+        "job_title": campos.get("job_title"),
+        "company_name": campos.get("company_name"),
+        "experience_level": criterios[0] if len(criterios) > 0 else None,
+        "type_of_contract": criterios[1] if len(criterios) > 1 else None,
+        "easy_apply": not extrator.offsite,
+        "time_posted": campos.get("time_posted"),
+        "num_applicants": campos.get("num_applicants"),
+        "job_link": link_vaga(job_id, base_url),
+    }
+
+
+class Limitador:
+    """No máximo `concorrencia` requisições em voo e pelo menos `intervalo` s entre os inícios."""
+
+    def __init__(self, concorrencia: int = 4, intervalo: float = 0.5):
+        self.intervalo = intervalo
+        self._semaforo = asyncio.Semaphore(concorrencia)
+        self._trava = asyncio.Lock()
+        self._proximo = 0.0
+
+    async def __aenter__(self):
+        await self._semaforo.acquire()
+        async with self._trava:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaforo.release()
+
+
+class ClienteHTTP:
+    """GET assíncrono (urllib em thread) com Limitador e retry/backoff para falhas de rede, 429 e 5xx."""
+
+    def __init__(self, concorrencia: int = 4, intervalo: float = 0.5, tentativas: int = 4,
+                 backoff: float = 1.0, backoff_max: float = 30.0, timeout: float = 10):
+        self.limitador = Limitador(concorrencia, intervalo)
+        self.tentativas, self.backoff, self.backoff_max, self.timeout = tentativas, backoff, backoff_max, timeout
+        self.requisicoes = 0
+        self.ausentes: set[str] = set()  # URLs que responderam 404/410
+
+    def _get(self, url: str) -> tuple[int, str, str | None]:
+        requisicao = urllib.request.Request(url, headers=HEADERS)
+        try:
+            with urllib.request.urlopen(requisicao, timeout=self.timeout) as r:
+                return r.status, r.read().decode("utf-8", errors="replace"), None
+        except urllib.error.HTTPError as e:
+            return e.code, "", e.headers.get("Retry-After")
+
+    async def get(self, url: str) -> str | None:
+        """Corpo da resposta 200; None para status definitivo (404 vai para `ausentes`) ou tentativas esgotadas."""
+        for tentativa in range(self.tentativas):
+            retry_after = None
+            async with self.limitador:
+                self.requisicoes += 1
+                try:
+                    status, corpo, retry_after = await asyncio.to_thread(self._get, url)
+                except (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError):
+                    status, corpo = None, ""  # HTTPException: ex. IncompleteRead com a conexão cortada
+            if status == 200:
+                return corpo
+            if status is not None and status not in STATUS_RETENTAVEIS:
+                if status in STATUS_AUSENTE:
+                    self.ausentes.add(url)
+                return None
+            if tentativa + 1 < self.tentativas:
+                espera = min(self.backoff_max, self.backoff * 2 ** tentativa) * (0.5 + random.random() / 2)
+                if retry_after and retry_after.isdigit():
+                    espera = max(espera, float(retry_after))
+                await asyncio.sleep(espera)
+        return None
+
+
+def carregar_estado(caminho: str) -> tuple[set[str], set[str]]:
+    """(job_links já gravados, job_links que responderam 404/410)."""
+    if not os.path.exists(caminho):
+        return set(), set()
+    with open(caminho, encoding="utf-8") as f:
+        estado = json.load(f)
+    return set(estado["job_links"]), set(estado.get("ausentes", ()))
+
+
+def salvar_estado(caminho: str, links: set[str], ausentes: set[str] = frozenset()) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump({"job_links": sorted(links), "ausentes": sorted(ausentes),
+                   "atualizado_em": datetime.now().isoformat(timespec="seconds")}, f, indent=1)
+    os.replace(temporario, caminho)
+
+
+def url_vaga(job_id: str, base_url: str = BASE_URL) -> str:
+    return f"{base_url}/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+
+def url_listagem(titulo: str, local: str, pagina: int, base_url: str = BASE_URL) -> str:
+    return (f"{base_url}/jobs-guest/jobs/api/seeMoreJobPostings/search"
+            f"?keywords={quote_plus(f'data {titulo}'.strip())}&location={quote_plus(local)}"
+            f"&position=1&pageNum=0&start={pagina * 10}")
+
+
+async def buscar_ids(cliente: ClienteHTTP, titulo: str, local: str, paginas: int, base_url: str = BASE_URL) -> list[str]:
+    """job_ids das `paginas` da listagem, buscadas em paralelo, sem duplicados e na ordem de aparição."""
+    htmls = await asyncio.gather(*(cliente.get(url_listagem(titulo, local, p, base_url)) for p in range(paginas)))
+    return list(dict.fromkeys(i for html in htmls if html for i in extrair_ids(html)))
+
+
+async def raspar_vagas(job_ids: list[str], cliente: ClienteHTTP, vistos: set[str] = frozenset(),
+                       base_url: str = BASE_URL) -> list[dict]:
+    """Detalhes das vagas cujo job_link não está em `vistos`; falhas definitivas ficam de fora."""
+    novos = [i for i in dict.fromkeys(job_ids) if link_vaga(i, base_url) not in vistos]
+
+    async def uma(job_id):
+        html = await cliente.get(url_vaga(job_id, base_url))
+        return None if html is None else extrair_vaga(html, job_id, base_url)
+
+    return [v for v in await asyncio.gather(*(uma(i) for i in novos)) if v is not None]
+
+
+def normalizar(df, coletado_em=None):
+    """
+    Colunas tipadas (vetorizadas) a partir do texto:
+    horas_desde_postagem (float), data_postagem (datetime estimada a partir de coletado_em),
+    candidatos (Int64) e candidatos_minimo (bool: "Over 200 applicants"/"Be among the first 25").
+    """
+    import pandas as pd
+
+    df = df.copy()
+    coletado_em = pd.Timestamp(coletado_em or datetime.now()).floor("s")
+    texto = df["time_posted"].astype(object).str.lower()
+    partes = texto.str.extract(r"(\d+)\s*(minute|minuto|hour|hora|day|dia|week|semana|month|m[eê]s|year|ano)")
+    horas = pd.to_numeric(partes[0], errors="coerce") * partes[1].map(HORAS_POR_UNIDADE).astype("float64")
+    horas = horas.mask(texto.str.contains(r"just now|agora|moment", na=False), 0.0)
+    df["horas_desde_postagem"] = horas.astype("float64")
+    df["data_postagem"] = coletado_em - pd.to_timedelta(df["horas_desde_postagem"], unit="h")
+    candidatos = df["num_applicants"].astype(object).str.lower()
+    df["candidatos"] = pd.to_numeric(candidatos.str.extract(r"(\d[\d.,]*)")[0].str.replace(r"[.,]", "", regex=True),
+                                     errors="coerce").astype("Int64")
+    df["candidatos_minimo"] = candidatos.str.contains(r"over|among the first|mais de|primeiros", na=False).astype(bool)
+    df["easy_apply"] = df["easy_apply"].astype("boolean")
+    df["coletado_em"] = coletado_em
+    return df
+
+
+def anexar_parquet(df, pasta: str, coletado_em=None) -> str | None:
+    """Grava `pasta/vagas_<timestamp>.parquet` (uma parte por execução); None se não há linhas."""
+    if df.empty:
+        return None
+    os.makedirs(pasta, exist_ok=True)
+    carimbo = (coletado_em or datetime.now()).strftime("%Y%m%dT%H%M%S%f")
+    caminho = os.path.join(pasta, f"vagas_{carimbo}.parquet")
+    df.to_parquet(f"{caminho}.tmp", index=False)
+    os.replace(f"{caminho}.tmp", caminho)
+    return caminho
+
+
+async def executar(titulo: str, local: str, paginas: int, pasta_saida: str, caminho_estado: str | None = None,
+                   base_url: str = BASE_URL, **opcoes_cliente) -> dict:
+    """
+    Pipeline incremental: listagem -> vagas novas -> normalização -> Parquet -> estado.
+    O estado só é gravado depois do Parquet, então uma execução interrompida refaz apenas as vagas perdidas.
+    """
+    import pandas as pd
+
+    caminho_estado = caminho_estado or os.path.join(pasta_saida, "_estado.json")
+    vistos, ausentes = carregar_estado(caminho_estado)
+    cliente = ClienteHTTP(**opcoes_cliente)
+    ids = await buscar_ids(cliente, titulo, local, paginas, base_url)
+    vagas = await raspar_vagas(ids, cliente, vistos | ausentes, base_url)
+    coletado_em = datetime.now()
+    caminho = anexar_parquet(normalizar(pd.DataFrame(vagas, columns=COLUNAS), coletado_em), pasta_saida, coletado_em)
+    removidas = {link_vaga(i, base_url) for i in ids if url_vaga(i, base_url) in cliente.ausentes}
+    if vagas or removidas:
+        salvar_estado(caminho_estado, vistos | {v["job_link"] for v in vagas}, ausentes | removidas)
+    return {"ids": len(ids), "ja_vistos": sum(link_vaga(i, base_url) in vistos for i in ids),
+            "ausentes": sum(link_vaga(i, base_url) in ausentes | removidas for i in ids),
+            "novas": len(vagas), "requisicoes": cliente.requisicoes, "arquivo": caminho}
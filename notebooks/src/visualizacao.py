@@ -1,23 +1,133 @@
+from concurrent.futures import ProcessPoolExecutor
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
-def plot_histograma(df: pd.DataFrame, coluna: str, titulo: str | None = None, salvar_em: str | None = None):
-    serie = pd.to_numeric(df[coluna], errors="coerce")
-    plt.figure(); serie.plot(kind="hist", bins=20)
-    plt.xlabel(coluna); plt.ylabel("Frequência"); plt.title(titulo or f"Histograma de {coluna}")
-    if salvar_em: plt.savefig(salvar_em, bbox_inches="tight")
-    plt.show()
-
-def plot_series(df: pd.DataFrame, coluna: str, titulo: str | None = None, salvar_em: str | None = None):
-    serie = pd.to_numeric(df[coluna], errors="coerce")
-    plt.figure(); plt.plot(serie.index, serie.values)
-    plt.xlabel("Índice"); plt.ylabel(coluna); plt.title(titulo or f"Série de {coluna}")
-    if salvar_em: plt.savefig(salvar_em, bbox_inches="tight")
-    plt.show()
-
-def plot_boxplot(df: pd.DataFrame, colunas: list[str], titulo: str | None = None, salvar_em: str | None = None):
-    dados = [pd.to_numeric(df[c], errors="coerce") for c in colunas]
-    plt.figure(); plt.boxplot(dados, labels=colunas); plt.title(titulo or f"Boxplot: {', '.join(colunas)}")
-    if salvar_em: plt.savefig(salvar_em, bbox_inches="tight")
-    plt.show()
+from src.estatisticas import HistogramaFixo, estatisticas_parquet
+
+MAX_FLIERS = 1000
+
+def _numerico(serie: pd.Series) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.to_numpy(dtype="float64", na_value=np.nan)
+    return pd.to_numeric(serie, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+def _figura(headless: bool):
+    # matplotlib só é importado quando um gráfico é desenhado (importar src.visualizacao fica leve)
+    # Figure + canvas Agg não entra no gerenciador do pyplot: sem backend global nem figuras abertas
+    if headless:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        fig = Figure(); FigureCanvasAgg(fig)
+        return fig, fig.add_subplot()
+    import matplotlib.pyplot as plt
+    fig = plt.figure()
+    return fig, fig.add_subplot()
+
+def _finalizar(fig, salvar_em: str | None, headless: bool, mostrar: bool):
+    if salvar_em: fig.savefig(salvar_em, bbox_inches="tight")
+    if headless: return
+    import matplotlib.pyplot as plt
+    if mostrar: plt.show()
+    plt.close(fig)
+
+def indices_minmax(y: np.ndarray, max_pontos: int) -> np.ndarray:
+    """Índices do mínimo e do máximo de cada bucket (preserva picos; 2 pontos por bucket)."""
+    n = len(y); k = max(-(-n // max(max_pontos // 2, 1)), 1); n_buckets = -(-n // k)
+    blocos = np.pad(y.astype("float64"), (0, n_buckets * k - n), constant_values=np.nan).reshape(n_buckets, k)
+    base = np.arange(n_buckets) * k
+    return np.unique(np.concatenate([base + np.nanargmin(blocos, axis=1), base + np.nanargmax(blocos, axis=1)]))
+
+def indices_lttb(x: np.ndarray, y: np.ndarray, max_pontos: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: índices dos pontos que preservam a forma visual da série."""
+    n = len(y)
+    if max_pontos >= n or max_pontos < 3: return np.arange(n)
+    bordas = np.linspace(1, n - 1, max_pontos - 1).astype(np.int64)
+    escolhidos = np.empty(max_pontos, dtype=np.int64); escolhidos[0], escolhidos[-1] = 0, n - 1
+    a = 0
+    for i in range(max_pontos - 2):
+        ini, fim = bordas[i], bordas[i + 1]
+        prox_ini, prox_fim = bordas[i + 1], bordas[i + 2] if i + 2 < len(bordas) else n
+        cx, cy = x[prox_ini:prox_fim].mean(), y[prox_ini:prox_fim].mean()
+        xs, ys = x[ini:fim], y[ini:fim]
+        areas = np.abs((x[a] - cx) * (ys - y[a]) - (x[a] - xs) * (cy - y[a]))
+        a = ini + int(np.argmax(areas)); escolhidos[i + 1] = a
+    return escolhidos
+
+def estatisticas_boxplot(valores: np.ndarray, rotulo: str) -> dict:
+    """Estatísticas de um boxplot (formato de `Axes.bxp`), com no máximo MAX_FLIERS outliers desenhados."""
+    v = valores[np.isfinite(valores)]
+    if not len(v): return {"label": rotulo, "med": np.nan, "q1": np.nan, "q3": np.nan, "whislo": np.nan, "whishi": np.nan, "fliers": []}
+    q1, med, q3 = np.percentile(v, [25, 50, 75])
+    iqr = q3 - q1
+    dentro = v[(v >= q1 - 1.5 * iqr) & (v <= q3 + 1.5 * iqr)]
+    fliers = v[(v < q1 - 1.5 * iqr) | (v > q3 + 1.5 * iqr)]
+    if len(fliers) > MAX_FLIERS:
+        fliers = np.sort(fliers)[np.linspace(0, len(fliers) - 1, MAX_FLIERS).astype(np.int64)]
+    return {"label": rotulo, "med": med, "q1": q1, "q3": q3, "whislo": dentro.min(), "whishi": dentro.max(), "fliers": fliers, "n_outliers": len(v) - len(dentro)}
+
+def desenhar_histograma(hist: HistogramaFixo, coluna: str, titulo: str | None = None, salvar_em: str | None = None,
+                        headless: bool = False, mostrar: bool = True):
+    """Desenha um histograma já agregado (ex.: mesclado de vários lotes/processos)."""
+    fig, ax = _figura(headless); ax.stairs(hist.contagens, hist.bordas, fill=True)
+    ax.set_xlabel(coluna); ax.set_ylabel("Frequência"); ax.set_title(titulo or f"Histograma de {coluna}")
+    _finalizar(fig, salvar_em, headless, mostrar)
+
+def plot_histograma(df: pd.DataFrame, coluna: str, titulo: str | None = None, salvar_em: str | None = None,
+                    bins: int = 20, headless: bool = False, mostrar: bool = True):
+    desenhar_histograma(HistogramaFixo.de_valores(_numerico(df[coluna]), bins), coluna, titulo, salvar_em, headless, mostrar)
+
+def plot_series(df: pd.DataFrame, coluna: str, titulo: str | None = None, salvar_em: str | None = None,
+                max_pontos: int | None = 10_000, metodo: str = "lttb", headless: bool = False, mostrar: bool = True):
+    y = _numerico(df[coluna]); x = df.index
+    if max_pontos and len(y) > max_pontos:
+        validos = np.flatnonzero(np.isfinite(y))
+        if metodo == "lttb": sel = validos[indices_lttb(validos.astype("float64"), y[validos], max_pontos)]
+        elif metodo == "minmax": sel = validos[indices_minmax(y[validos], max_pontos)]
+        else: raise ValueError("metodo deve ser 'lttb' ou 'minmax'.")
+        x, y = x[sel], y[sel]
+    fig, ax = _figura(headless); ax.plot(x, y)
+    ax.set_xlabel("Índice"); ax.set_ylabel(coluna); ax.set_title(titulo or f"Série de {coluna}")
+    _finalizar(fig, salvar_em, headless, mostrar)
+
+def desenhar_boxplot(stats: list[dict], titulo: str | None = None, salvar_em: str | None = None,
+                     headless: bool = False, mostrar: bool = True):
+    """Desenha boxplots a partir de estatísticas prontas (`estatisticas_boxplot` ou `EsbocoQuantis.boxplot`)."""
+    fig, ax = _figura(headless); ax.bxp(stats); ax.set_title(titulo or f"Boxplot: {', '.join(s['label'] for s in stats)}")
+    _finalizar(fig, salvar_em, headless, mostrar)
+
+def plot_boxplot(df: pd.DataFrame, colunas: list[str], titulo: str | None = None, salvar_em: str | None = None,
+                 headless: bool = False, mostrar: bool = True):
+    desenhar_boxplot([estatisticas_boxplot(_numerico(df[c]), c) for c in colunas], titulo, salvar_em, headless, mostrar)
+
+def plot_parquet(caminho: str, colunas: list[str], pasta_saida: str, bins: int = 20) -> list[str]:
+    """Histogramas e boxplot de colunas de um Parquet fora da memória, a partir das estatísticas por lote."""
+    stats = estatisticas_parquet(caminho, colunas, bins=bins)
+    salvos = []
+    for c in colunas:
+        salvos.append(f"{pasta_saida}/histograma_{c}.png")
+        desenhar_histograma(stats[c]["histograma"], c, salvar_em=salvos[-1], headless=True)
+    salvos.append(f"{pasta_saida}/boxplot.png")
+    desenhar_boxplot([stats[c]["quantis"].boxplot(c) for c in colunas], salvar_em=salvos[-1], headless=True)
+    return salvos
+
+GRAFICOS = {"histograma": plot_histograma, "series": plot_series, "boxplot": plot_boxplot}
+
+def _renderizar_tarefa(tarefa: dict) -> str:
+    tarefa = dict(tarefa); grafico = GRAFICOS[tarefa.pop("grafico")]; fonte = tarefa.pop("fonte")
+    if isinstance(fonte, str):  # caminho Parquet: o worker lê só as colunas do gráfico
+        colunas = tarefa.get("colunas") or [tarefa["coluna"]]
+        fonte = pd.read_parquet(fonte, columns=colunas)
+    grafico(fonte, **tarefa, headless=True)
+    return tarefa["salvar_em"]
+
+def renderizar_graficos(tarefas: list[dict], processos: int = 1) -> list[str]:
+    """
+    Renderiza vários gráficos em arquivos, sem janela (Agg), opcionalmente em processos paralelos.
+    Cada tarefa: {"grafico": "histograma" | "series" | "boxplot", "fonte": DataFrame ou caminho Parquet,
+    "coluna"/"colunas", "salvar_em", ...demais argumentos da função}.
+    """
+    if any(not t.get("salvar_em") for t in tarefas): raise ValueError("toda tarefa precisa de 'salvar_em'.")
+    if processos <= 1: return [_renderizar_tarefa(t) for t in tarefas]
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(_renderizar_tarefa, tarefas))
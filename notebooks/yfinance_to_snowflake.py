@@ -3,12 +3,14 @@ from airflow import DAG
 from airflow.models import Variable
 from airflow.decorators import task
 from airflow.operators.python import get_current_context
-from airflow.providers.snowflake.hooks.snowflake import SnowflakeHook
 
-import snowflake.connector
-import requests
 from datetime import datetime, timedelta
-import yfinance as yf
+
+try:
+    from src.instrumentacao import instrumentar
+except ImportError:  # notebooks/ fora do PYTHONPATH do scheduler/worker: tasks sem spans
+    def instrumentar(nome=None):
+        return lambda funcao: funcao
 
 
 def get_next_day(date_str):
@@ -26,6 +28,8 @@ def get_next_day(date_str):
 
 
 def return_snowflake_conn():
+    # Imported here so the scheduler does not load the provider on every DAG parse
+    from airflow.providers.snowflake.hooks.snowflake import SnowflakeHook
 
     # Initialize the SnowflakeHook
     hook = SnowflakeHook(snowflake_conn_id='snowflake_conn')
@@ -42,7 +46,10 @@ def get_logical_date():
 
 
 @task
+@instrumentar("dag.yfinance.extract")
 def extract(symbol):
+    import yfinance as yf
+
     date = get_logical_date()
 
     # Download the data for the specific date (one day range)
@@ -53,6 +60,7 @@ def extract(symbol):
 
 
 @task
+@instrumentar("dag.yfinance.load")
 def load(d, symbol, target_table):
     date = get_logical_date()
     cur = return_snowflake_conn()
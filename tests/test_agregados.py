@@ -0,0 +1,82 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from src.agregados import CacheAgregados, preparar_fatos
+
+
+def _vendas():
+    orders = pd.DataFrame({"order_id": [1, 2, 3, 4, 5], "store_id": [1, 1, 2, 2, 1],
+                           "order_date": ["2017-01-05", "2017-01-20", "2017-02-03", "2017-03-10", "2017-03-11"]})
+    itens = pd.DataFrame({"order_id": [1, 1, 2, 3, 4, 5], "item_id": [1, 2, 1, 1, 1, 1],
+                          "product_id": [10, 11, 10, 12, 10, 11], "quantity": [1, 2, 1, 3, 1, 1],
+                          "list_price": [100.0, 50.0, 100.0, 10.0, 100.0, 50.0], "discount": [0.0, 0.1, 0.0, 0.0, 0.5, 0.0]})
+    return orders, itens
+
+
+def _mes(orders, itens, mes):
+    selecao = orders["order_date"].str.startswith(mes)
+    return orders[selecao], itens[itens["order_id"].isin(orders.loc[selecao, "order_id"])]
+
+
+def _esperado(orders, itens):
+    fatos = preparar_fatos(orders, itens)
+    return fatos.groupby("order_date")["receita"].sum().to_dict()
+
+
+def _receita(cache):
+    return cache.ler("receita_dia").set_index("order_date")["receita"].to_dict()
+
+
+def test_entrada_parcial_nao_apaga_outras_particoes(tmp_path):
+    orders, itens = _vendas()
+    cache = CacheAgregados(str(tmp_path))
+    cache.atualizar(orders, itens)
+
+    r = cache.atualizar(*_mes(orders, itens, "2017-03"))
+
+    assert r["alteradas"] == [] and r["removidas"] == [] and r["particoes"] == 3
+    assert cache.particoes("receita_dia") == ["2017-01", "2017-02", "2017-03"]
+    assert _receita(cache) == _esperado(orders, itens)
+
+
+def test_particao_alterada_e_recalculada_sozinha(tmp_path):
+    orders, itens = _vendas()
+    cache = CacheAgregados(str(tmp_path))
+    cache.atualizar(orders, itens)
+    antes = (tmp_path / "receita_dia" / "particao=2017-01.parquet").stat().st_mtime_ns
+
+    itens.loc[itens["order_id"] == 4, "quantity"] = 10
+    r = cache.atualizar(*_mes(orders, itens, "2017-03"))
+
+    assert r["alteradas"] == ["2017-03"]
+    assert (tmp_path / "receita_dia" / "particao=2017-01.parquet").stat().st_mtime_ns == antes
+    assert _receita(CacheAgregados(str(tmp_path))) == _esperado(orders, itens)
+
+
+def test_remocao_so_explicita(tmp_path):
+    orders, itens = _vendas()
+    cache = CacheAgregados(str(tmp_path))
+    cache.atualizar(orders, itens)
+
+    assert cache.atualizar(*_mes(orders, itens, "2017-01"), remover=["2017-02"])["removidas"] == ["2017-02"]
+    assert cache.particoes("receita_produto_dia") == ["2017-01", "2017-03"]
+
+    sem_marco = orders[~orders["order_date"].str.startswith("2017-03")]
+    r = cache.atualizar(sem_marco, itens, completo=True)
+    assert r["removidas"] == ["2017-03"] and r["alteradas"] == ["2017-02"]  # fevereiro voltou na carga completa
+    assert cache.particoes("receita_loja_dia") == ["2017-01", "2017-02"]
+    assert cache.estado["particoes"].keys() == {"2017-01", "2017-02"}
+
+
+def test_definicao_nova_exige_carga_completa(tmp_path):
+    orders, itens = _vendas()
+    CacheAgregados(str(tmp_path)).atualizar(orders, itens)
+    definicoes = {"itens_loja": {"por": ["store_id"], "medidas": {"itens": ("item_id", "count")}}}
+    cache = CacheAgregados(str(tmp_path), definicoes)
+
+    with pytest.raises(ValueError):
+        cache.atualizar(*_mes(orders, itens, "2017-01"))
+    assert cache.atualizar(orders, itens, completo=True)["redefinidos"] == ["itens_loja"]
+    assert cache.ler("itens_loja")["itens"].sum() == len(itens)
@@ -0,0 +1,46 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.cep import IndiceCEP, cep_para_int
+
+
+def _lista(valores):
+    return [None if pd.isna(v) else v for v in valores]
+
+
+def _depara():
+    return pd.DataFrame({"Faixa de CEP Inicial": ["01000-000", "20000-000", "30000000", "abc"],
+                         "Faixa de CEP final": ["19999-999", "28999-999", "39999999", "99999999"],
+                         "Estado": [" SP", "RJ", "MG", "XX"],
+                         "Regiao": ["Sudeste", "Sudeste", "Sudeste", "??"]})
+
+
+def test_cep_para_int():
+    assert cep_para_int(["01310-100", "1310100", 1310100, None, "", "123456789"]).tolist() == \
+           [1310100, 1310100, 1310100, -1, -1, -1]
+    assert cep_para_int(pd.Series([1310100, np.nan])).tolist() == [1310100, -1]
+
+
+def test_enriquecer_igual_ao_merge_por_faixa():
+    indice = IndiceCEP.do_depara(_depara())
+    lote = pd.DataFrame({"cep": ["01310-100", "19999999", "20000-000", "29000-000", "39999-999", None, "xyz"]})
+
+    out = indice.enriquecer(lote, "cep")
+
+    assert len(indice) == 3  # faixa com início inválido descartada
+    assert _lista(out["Estado"]) == \
+           ["SP", "SP", "RJ", None, "MG", None, None]
+    assert isinstance(out["Regiao"].dtype, pd.CategoricalDtype)
+
+
+def test_salvar_e_carregar_com_mmap(tmp_path):
+    indice = IndiceCEP.do_depara(_depara())
+    indice.salvar(str(tmp_path / "idx"))
+
+    carregado = IndiceCEP.carregar(str(tmp_path / "idx"))
+
+    assert isinstance(carregado.inicios, np.memmap)
+    np.testing.assert_array_equal(carregado.resolver(["01310-100", "30000-001", "99999-999"]),
+                                  indice.resolver(["01310-100", "30000-001", "99999-999"]))
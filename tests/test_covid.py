@@ -0,0 +1,127 @@
+import hashlib
+import pickle
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.covid import CacheSnapshots, data_snapshot, listar_snapshots
+
+ARQUIVOS = {
+    "pkl/HIST_PAINEL_COVIDBR_05jun2020.xlsx.pkl": b"conteudo-junho",
+    "pkl/HIST_PAINEL_COVIDBR_01mai2020.xlsx.pkl": b"conteudo-maio",
+    "pkl/README.txt": b"ignorar",
+    "pkl/HIST_PAINEL_COVIDBR_copia.xlsx.pkl": b"ignorar",
+}
+
+
+def _listagem(chaves, truncado):
+    itens = "".join(
+        f"<Contents><Key>{k}</Key><ETag>\"{hashlib.md5(ARQUIVOS[k]).hexdigest()}\"</ETag>"
+        f"<Size>{len(ARQUIVOS[k])}</Size></Contents>" for k in chaves)
+    return (f'<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"<IsTruncated>{'true' if truncado else 'false'}</IsTruncated>{itens}</ListBucketResult>").encode()
+
+
+@pytest.fixture
+def s3_local():
+    requisicoes = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            requisicoes.append(url.path)
+            if url.path == "/":  # listagem paginada: uma chave por página
+                chaves = sorted(ARQUIVOS)
+                marcador = parse_qs(url.query).get("marker", [""])[0]
+                restantes = [k for k in chaves if k > marcador]
+                corpo = _listagem(restantes[:1], len(restantes) > 1)
+            elif url.path.lstrip("/") in ARQUIVOS:
+                corpo = ARQUIVOS[url.path.lstrip("/")]
+            else:
+                self.send_response(404); self.end_headers(); return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_port}", requisicoes
+    servidor.shutdown()
+
+
+def test_data_snapshot():
+    assert data_snapshot("pkl/HIST_PAINEL_COVIDBR_05jun2020.xlsx.pkl").isoformat() == "2020-06-05"
+    for chave in ("pkl/HIST_PAINEL_COVIDBR_copia.xlsx.pkl", "pkl/HIST_PAINEL_COVIDBR_31fev2020.xlsx.pkl",
+                  "pkl/HIST_PAINEL_COVIDBR_05xyz2020.xlsx.pkl", "pkl/outro.pkl"):
+        assert data_snapshot(chave) is None
+
+
+def test_lista_com_paginacao_e_ordena_por_data(s3_local):
+    url, _ = s3_local
+    snapshots = listar_snapshots(url)
+    assert [s["chave"] for s in snapshots] == ["pkl/HIST_PAINEL_COVIDBR_01mai2020.xlsx.pkl",
+                                               "pkl/HIST_PAINEL_COVIDBR_05jun2020.xlsx.pkl"]
+
+
+def test_download_paralelo_reaproveita_cache(s3_local, tmp_path):
+    url, requisicoes = s3_local
+    snapshots = listar_snapshots(url)
+    cache = CacheSnapshots(str(tmp_path), url)
+
+    caminhos = cache.pre_carregar(snapshots, processos=2, converter=False)
+    assert [open(c, "rb").read() for c in caminhos] == [b"conteudo-maio", b"conteudo-junho"]
+
+    antes = len(requisicoes)
+    cache.pre_carregar(snapshots, processos=2, converter=False)
+    assert len(requisicoes) == antes
+
+
+def test_etag_novo_gera_novo_download_e_obsoleto_e_removido(s3_local, tmp_path):
+    url, _ = s3_local
+    snapshot = listar_snapshots(url)[0]
+    cache = CacheSnapshots(str(tmp_path), url)
+    cache.baixar(snapshot)
+
+    alterado = {**snapshot, "etag": hashlib.md5(b"conteudo-maio").hexdigest() + "-2"}  # multipart: sem checagem de MD5
+    assert not cache.em_cache(alterado)
+    cache.baixar(alterado)
+    assert cache.remover_obsoletos([alterado]) == 1
+
+
+def test_etag_divergente_falha_sem_deixar_arquivo(s3_local, tmp_path):
+    url, _ = s3_local
+    snapshot = {**listar_snapshots(url)[0], "etag": "0" * 32}
+    cache = CacheSnapshots(str(tmp_path), url)
+    with pytest.raises(IOError):
+        cache.baixar(snapshot)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_converte_para_parquet_e_carrega_sob_demanda(s3_local, tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    url, _ = s3_local
+    df = pd.DataFrame({"estado": ["SP", "RJ"], "casosAcumulado": [10, 5]})
+    chave = "pkl/HIST_PAINEL_COVIDBR_01mai2020.xlsx.pkl"
+    ARQUIVOS[chave] = pickle.dumps(df)
+    try:
+        snapshot = [s for s in listar_snapshots(url) if s["chave"] == chave][0]
+        cache = CacheSnapshots(str(tmp_path), url, max_em_memoria=1)
+        pd.testing.assert_frame_equal(cache.carregar(snapshot), df)
+        assert not list(tmp_path.glob("*.pkl"))
+        assert cache.carregar(snapshot, colunas=["estado"]).columns.tolist() == ["estado"]
+
+        marcador = tmp_path / "executado"
+        ARQUIVOS[chave] = f"cos\nsystem\n(S'touch {marcador}'\ntR.".encode()  # os.system no REDUCE
+        malicioso = [s for s in listar_snapshots(url) if s["chave"] == chave][0]
+        with pytest.raises(pickle.UnpicklingError):
+            cache.carregar(malicioso)
+        assert not marcador.exists() and not cache.em_cache(malicioso)
+    finally:
+        ARQUIVOS[chave] = b"conteudo-maio"
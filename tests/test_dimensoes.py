@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("deltalake")
+import pandas as pd
+from deltalake import DeltaTable
+
+from src.dimensoes import atualizar_dimensao, ler_hwm_estatisticas
+
+
+def _dim(caminho):
+    return DeltaTable(caminho).to_pandas().sort_values("IDFabricante").reset_index(drop=True)
+
+
+def test_cria_dimensao_com_sk_sequencial(tmp_path):
+    caminho = str(tmp_path / "dim_fabricante")
+    fonte = pd.DataFrame({"IDFabricante": [1, 2, 2], "Fabricante": ["A", "B", "B"]})
+
+    r = atualizar_dimensao(caminho, fonte, "IDFabricante", "sk_fabricante")
+
+    assert r["inseridos"] == 2 and r["hwm"] == 2
+    assert _dim(caminho)["sk_fabricante"].tolist() == [1, 2]
+
+
+def test_merge_atualiza_existentes_e_sk_so_para_novos(tmp_path):
+    caminho = str(tmp_path / "dim_fabricante")
+    atualizar_dimensao(caminho, pd.DataFrame({"IDFabricante": [1, 2], "Fabricante": ["A", "B"]}),
+                       "IDFabricante", "sk_fabricante")
+
+    r = atualizar_dimensao(caminho, pd.DataFrame({"IDFabricante": [2, 3], "Fabricante": ["B2", "C"]}),
+                           "IDFabricante", "sk_fabricante")
+
+    dim = _dim(caminho)
+    assert dim["sk_fabricante"].tolist() == [1, 2, 3]
+    assert dim["Fabricante"].tolist() == ["A", "B2", "C"]
+    assert r["inseridos"] == 1 and r["atualizados"] == 1 and r["hwm"] == 3
+
+
+def test_hwm_pelas_estatisticas_sem_arquivo(tmp_path):
+    caminho = str(tmp_path / "dim_fabricante")
+    atualizar_dimensao(caminho, pd.DataFrame({"IDFabricante": [10, 20], "Fabricante": ["A", "B"]}),
+                       "IDFabricante", "sk_fabricante")
+    (tmp_path / "dim_fabricante" / "_hwm_sk_fabricante.json").unlink()
+
+    assert ler_hwm_estatisticas(DeltaTable(caminho), "sk_fabricante") == 2
+    r = atualizar_dimensao(caminho, pd.DataFrame({"IDFabricante": [30], "Fabricante": ["C"]}),
+                           "IDFabricante", "sk_fabricante")
+    assert r["hwm"] == 3
+
+
+def test_hwm_sem_estatisticas_le_a_coluna_sk(tmp_path):
+    from deltalake import write_deltalake
+
+    caminho = str(tmp_path / "dim_sem_stats")
+    # só a primeira coluna tem estatísticas: max.sk_fabricante não existe no log
+    write_deltalake(caminho, pd.DataFrame({"IDFabricante": [10, 20], "sk_fabricante": [7, 41]}),
+                    configuration={"delta.dataSkippingNumIndexedCols": "1"})
+    write_deltalake(caminho, pd.DataFrame({"IDFabricante": [30], "sk_fabricante": [12]}), mode="append")
+
+    assert ler_hwm_estatisticas(DeltaTable(caminho), "sk_fabricante") == 41
+    r = atualizar_dimensao(caminho, pd.DataFrame({"IDFabricante": [40]}), "IDFabricante", "sk_fabricante",
+                           coluna_atualizacao=None)
+    assert r["hwm"] == 42
@@ -0,0 +1,88 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.estatisticas import EsbocoQuantis, estatisticas_parquet, faixa_parquet, mesclar_todos
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def _amostra(n=200_000, semente=0):
+    rng = np.random.default_rng(semente)
+    return np.concatenate([rng.lognormal(3, 2, n // 2), -rng.lognormal(1, 1, n // 4), np.zeros(n // 4)])
+
+
+def test_quantis_dentro_do_erro_relativo():
+    v = _amostra()
+    alfa = 0.01
+
+    estimado = EsbocoQuantis(alfa).atualizar(v).quantis(QS)
+
+    ordenado = np.sort(v)
+    exato = ordenado[np.floor(np.asarray(QS) * (len(v) - 1)).astype(int)]
+    assert np.all(np.abs(estimado - exato) <= alfa * np.abs(exato) + 1e-12)
+
+
+def test_mescla_igual_ao_todo_e_serializa():
+    v = _amostra(semente=1)
+    todo = EsbocoQuantis(0.02).atualizar(v)
+
+    partes = [EsbocoQuantis(0.02).atualizar(p) for p in np.array_split(v, 7)]
+    mesclado = mesclar_todos(EsbocoQuantis.de_dict(p.para_dict()) for p in partes)
+
+    assert (mesclado.positivos, mesclado.negativos, mesclado.zeros, mesclado.n) == \
+           (todo.positivos, todo.negativos, todo.zeros, todo.n)
+    assert (mesclado.minimo, mesclado.maximo) == (v.min(), v.max())
+    np.testing.assert_array_equal(mesclado.quantis(QS), todo.quantis(QS))
+    with pytest.raises(ValueError):
+        EsbocoQuantis(0.01).mesclar(EsbocoQuantis(0.02))
+
+
+def test_nulos_e_vazio():
+    e = EsbocoQuantis().atualizar(pd.Series([np.nan, None, np.inf], dtype="float64"))
+
+    assert (e.n, e.nulos) == (0, 3) and math.isnan(e.quantis(0.5)[0])
+
+
+def test_parquet_em_pasta_particionada_agrega_todos_os_arquivos(tmp_path):
+    pytest.importorskip("pyarrow")
+    pasta = tmp_path / "dados"
+    for uf, inicio in (("SP", 0.0), ("RJ", 1_000.0), ("MG", -500.0)):
+        (pasta / f"uf={uf}").mkdir(parents=True)
+        pd.DataFrame({"val": np.arange(inicio, inicio + 100.0)}).to_parquet(pasta / f"uf={uf}" / "parte.parquet")
+    pd.DataFrame({"val": [np.nan] * 3}).to_parquet(pasta / "uf=SP" / "nulos.parquet")
+
+    assert faixa_parquet(str(pasta), "val") == (-500.0, 1_099.0)
+
+    r = estatisticas_parquet(str(pasta), ["val"], bins=10, tamanho_lote=64)["val"]
+    assert r["histograma"].contagens.sum() == 300 and r["histograma"].nulos == 3
+    assert r["quantis"].n == 300 and (r["quantis"].minimo, r["quantis"].maximo) == (-500.0, 1_099.0)
+
+
+def test_esboco_grupos_mediana_e_mad_dentro_do_erro():
+    from src.estatisticas import EsbocoGrupos
+
+    rng = np.random.default_rng(2)
+    grupos = rng.integers(0, 50, 100_000)
+    valores = rng.lognormal(4, 1.5, len(grupos)) * np.where(grupos % 5 == 0, -1, 1)  # grupos todo negativos
+    valores[grupos == 7] = 0.0
+    alfa = 0.01
+    esboco = EsbocoGrupos(alfa)
+    for parte in np.array_split(np.arange(len(grupos)), 9):
+        esboco.atualizar(grupos[parte], valores[parte])
+
+    pedidos = np.array([3, 7, 10, 49, 1_000])
+    mediana, mad, n = esboco.mediana_mad(pedidos)
+
+    assert len(esboco) == 50 and n[-1] == 0 and np.isnan(mediana[-1]) and np.isnan(mad[-1])
+    for i, g in enumerate(pedidos[:-1]):
+        v = np.sort(valores[grupos == g])
+        exata = v[(len(v) - 1) // 2]
+        mad_exato = np.sort(np.abs(v - exata))[(len(v) - 1) // 2]
+        assert n[i] == len(v)
+        assert abs(mediana[i] - exata) <= alfa * abs(exata) + 1e-12
+        assert abs(mad[i] - mad_exato) <= alfa * (np.abs(v).max() + abs(exata)) + 1e-12
+        assert abs(mad[i] - mad_exato) <= 3 * alfa * (mad_exato + abs(exata)) + 1e-12
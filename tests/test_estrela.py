@@ -0,0 +1,65 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.estrela import Dimensao, EsquemaEstrela, receita_por
+
+
+def _tabelas(n=2_000, semente=0):
+    rng = np.random.default_rng(semente)
+    brands = pd.DataFrame({"brand_id": [1, 2, 3], "brand_name": ["Trek", "Surly", "Electra"]})
+    products = pd.DataFrame({"product_id": np.arange(1, 21), "brand_id": rng.integers(1, 4, 20),
+                             "product_name": [f"p{i}" for i in range(1, 21)]})
+    stores = pd.DataFrame({"store_id": [10, 20], "store_name": ["Santa Cruz", "Baldwin"]})
+    orders = pd.DataFrame({"order_id": np.arange(1, 301), "store_id": rng.choice([10, 20], 300),
+                           "order_date": pd.date_range("2018-01-01", periods=300, freq="D").strftime("%Y-%m-%d")})
+    itens = pd.DataFrame({"order_id": rng.integers(1, 302, n),  # 301 não existe em orders
+                          "product_id": rng.integers(1, 21, n), "quantity": rng.integers(1, 3, n),
+                          "list_price": rng.uniform(100, 5_000, n).round(2), "discount": rng.choice([0.05, 0.1, 0.2], n)})
+    return itens, {"brands": brands, "products": products, "stores": stores, "orders": orders}
+
+
+def _merge(itens, dims):
+    df = (itens.merge(dims["products"], on="product_id", how="left").merge(dims["brands"], on="brand_id", how="left")
+          .merge(dims["orders"], on="order_id", how="left").merge(dims["stores"], on="store_id", how="left"))
+    df["mes"] = pd.to_datetime(df["order_date"]).dt.strftime("%Y-%m")
+    df["receita"] = df["list_price"] * df["quantity"] * (1 - df["discount"])
+    return df
+
+
+def test_dimensao_densa_e_esparsa():
+    densa = Dimensao(pd.DataFrame({"id": [3, 1, 2], "v": ["c", "a", "b"]}), "id")
+    esparsa = Dimensao(pd.DataFrame({"id": [10**12, 5, 7], "v": ["z", "a", "b"]}), "id")
+
+    assert esparsa.chaves_ordenadas is not None and densa.chaves_ordenadas is None
+    assert densa.linhas(np.array([1, 3, 4, -1])).tolist() == [1, 0, -1, -1]
+    assert esparsa.linhas(np.array([5, 10**12, 6])).tolist() == [1, 0, -1]
+
+
+def test_receita_igual_ao_merge_groupby():
+    itens, dims = _tabelas()
+    esquema = EsquemaEstrela(itens, dims)
+
+    obtido = receita_por(esquema, ["brand_name", "store_name", "mes"])
+
+    esperado = _merge(itens, dims).groupby(["brand_name", "store_name", "mes"], dropna=False)["receita"].sum()
+    obtido = obtido.astype({c: object for c in ["brand_name", "store_name", "mes"]})
+    obtido = obtido.set_index(["brand_name", "store_name", "mes"])["receita"]
+    pd.testing.assert_series_equal(obtido.sort_index(), esperado.sort_index(), check_names=False, check_index_type=False)
+    assert obtido.index.get_level_values("store_name").isna().any()  # pedido 301 sem dimensão
+
+
+def test_resolver_e_filtro():
+    itens, dims = _tabelas(semente=1)
+    esquema = EsquemaEstrela(itens, dims)
+    df = _merge(itens, dims)
+
+    marcas = esquema.resolver("brand_name")
+    assert list(marcas.astype(object)) == df["brand_name"].tolist()
+
+    filtro = itens["quantity"].to_numpy() == 2
+    obtido = esquema.agregar(["brand_name"], ["quantity"], filtro=filtro).set_index("brand_name")
+    esperado = df[filtro].groupby("brand_name").agg(quantity=("quantity", "sum"), itens=("quantity", "size"))
+    assert obtido["quantity"].to_dict() == esperado["quantity"].astype(float).to_dict()
+    assert obtido["itens"].to_dict() == esperado["itens"].to_dict()
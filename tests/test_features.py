@@ -0,0 +1,72 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.features import PipelineFeatures
+
+
+def _dados(n=20_000, semente=0):
+    rng = np.random.default_rng(semente)
+    idade = rng.normal(40, 12, n).round()
+    idade[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({"idade": idade, "renda": rng.lognormal(8, 0.5, n),
+                         "uf": rng.choice(["SP", "SP", "SP", "RJ", "RJ", "MG", None], n)})
+
+
+def test_numericas_imputadas_e_escaladas_pelo_iqr():
+    df = _dados()
+    p = PipelineFeatures(["idade", "renda"], [], centralizar=True).ajustar(df)
+
+    x = p.transformar(df)
+
+    for j, c in enumerate(["idade", "renda"]):
+        v = df[c].to_numpy()
+        q1, med, q3 = np.nanpercentile(v, [25, 50, 75])
+        esperado = (np.where(np.isnan(v), med, v) - med) / (q3 - q1)
+        np.testing.assert_allclose(x[:, j], esperado, rtol=0.01, atol=0.01)
+    assert not np.isnan(x).any()
+
+
+def test_one_hot_por_frequencia_com_droplast_e_desconhecidos():
+    p = PipelineFeatures([], ["uf"]).ajustar(_dados())
+
+    assert p.nomes_features() == ["uf_SP", "uf_RJ", "uf_MG"]  # dropLast descarta o índice extra (handleInvalid="keep")
+    x = p.transformar(pd.DataFrame({"uf": ["RJ", "MG", None, "BA"]}))
+    np.testing.assert_array_equal(x, [[0, 1, 0], [0, 0, 1], [1, 0, 0], [0, 0, 0]])  # nulo -> moda; BA -> índice extra
+
+    q = PipelineFeatures([], ["uf"], imputar_categoricas=False, descartar_ultima=False).ajustar(_dados())
+    assert q.nomes_features() == ["uf_SP", "uf_RJ", "uf_MG", "uf___desconhecido__"]
+    np.testing.assert_array_equal(q.transformar(pd.DataFrame({"uf": [None, "BA"]})), [[0, 0, 0, 1], [0, 0, 0, 1]])
+
+
+def test_lotes_mesclados_e_estado_salvo(tmp_path):
+    df = _dados(semente=1)
+    inteiro = PipelineFeatures(["idade", "renda"], ["uf"], estrategia="media").ajustar(df)
+    partes = [PipelineFeatures(["idade", "renda"], ["uf"], estrategia="media").ajustar(parte)
+              for parte in (df.iloc[i:i + 5_000] for i in range(0, len(df), 5_000))]
+    mesclado = partes[0]
+    for parte in partes[1:]:
+        mesclado.mesclar(parte)
+    mesclado.finalizar()
+
+    assert mesclado.para_dict()["categoricas"] == inteiro.para_dict()["categoricas"]
+    np.testing.assert_allclose(mesclado.transformar(df), inteiro.transformar(df))
+    assert inteiro.para_dict()["numericas"]["idade"]["preencher"] == pytest.approx(np.nanmean(df["idade"]))
+
+    inteiro.salvar(str(tmp_path / "estado.json"))
+    carregado = PipelineFeatures.carregar(str(tmp_path / "estado.json"))
+    np.testing.assert_array_equal(carregado.transformar(df), inteiro.transformar(df))
+
+
+def test_esparsa_igual_a_densa():
+    pytest.importorskip("scipy")
+    df = _dados(500)
+    p = PipelineFeatures(["idade", "renda"], ["uf"]).ajustar(df)
+
+    np.testing.assert_array_equal(p.transformar(df, esparsa=True).toarray(), p.transformar(df))
+
+
+def test_estrategia_invalida():
+    with pytest.raises(ValueError):
+        PipelineFeatures(["idade"], [], estrategia="maximo")
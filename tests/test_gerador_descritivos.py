@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import gerador_descritivos
+from gerador_descritivos import GeradorDescritivos
+
+CAMPOS = [
+    {"nome": "nome_completo", "tipo": "string", "obrigatorio": True, "tamanho_min": 3, "tamanho_max": 100,
+     "descricao_customizada": "Nome completo do usuário."},
+    {"nome": "email", "tipo": "email", "obrigatorio": True, "unico": True},
+    {"nome": "idade", "tipo": "integer", "obrigatorio": True, "valor_min": 18, "valor_max": 120},
+    {"nome": "status", "tipo": "string", "padrao": "ativo", "opcoes": ["ativo", "inativo"]},
+    {"nome": "observacao", "tipo": "text"},
+]
+
+
+@pytest.fixture(autouse=True)
+def data_fixa(monkeypatch):
+    monkeypatch.setattr(GeradorDescritivos, "_obter_data_atual", lambda self: "01/01/2025 às 00:00")
+
+
+def _referencia(campos):
+    gerador = GeradorDescritivos()
+    for c in campos:
+        gerador.adicionar_campo(**c)
+    return gerador.gerar_relatorio_markdown(), gerador.gerar_json()
+
+
+def _lote(tmp_path, metadados, **kwargs):
+    md, js = tmp_path / "campos.md", tmp_path / "campos.json"
+    gerador = GeradorDescritivos()
+    total = gerador.gerar_lote(metadados, str(md), str(js), **kwargs)
+    return total, md.read_text(encoding="utf-8"), js.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_lote_igual_ao_relatorio_em_memoria(tmp_path, processos):
+    campos = [dict(c, nome=f"{c['nome']}_{i}") for i in range(40) for c in CAMPOS]
+    md, js = _referencia(campos)
+
+    assert _lote(tmp_path, iter(campos), processos=processos, tamanho_lote=7) == (len(campos), md, js)
+
+
+def test_lote_de_tabela_arrow_e_vazio(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    md, js = _referencia(CAMPOS)
+    tabela = pa.Table.from_pylist([{k: c.get(k) for k in gerador_descritivos.CAMPOS_PADRAO} for c in CAMPOS])
+
+    assert _lote(tmp_path, tabela, tamanho_lote=2) == (len(CAMPOS), md, js)
+    assert _lote(tmp_path, []) == (0, *_referencia([]))
+    assert json.loads(_referencia([])[1]) == []
+
+
+def test_colunas_do_information_schema(tmp_path):
+    pd = pytest.importorskip("pandas")
+    colunas = pd.DataFrame({
+        "TABLE_SCHEMA": ["vendas", "vendas"],
+        "TABLE_NAME": ["clientes", "clientes"],
+        "COLUMN_NAME": ["cpf", "apelido"],
+        "DATA_TYPE": ["varchar", "varchar"],
+        "IS_NULLABLE": ["NO", "YES"],
+        "CHARACTER_MAXIMUM_LENGTH": [11, None],  # chega como float com NaN
+        "COLUMN_DEFAULT": [None, "sem apelido"],
+        "COLUMN_COMMENT": ["Documento do cliente.", None],
+    })
+    md, js = _referencia([
+        {"nome": "cpf", "tipo": "varchar", "obrigatorio": True, "tamanho_max": 11,
+         "descricao_customizada": "Documento do cliente."},
+        {"nome": "apelido", "tipo": "varchar", "obrigatorio": False, "padrao": "sem apelido"},
+    ])
+
+    assert _lote(tmp_path, colunas) == (2, md, js)
+
+
+def _assinatura(*caminhos):
+    return [(c.stat().st_ino, c.stat().st_mtime_ns, c.read_bytes()) for c in caminhos]
+
+
+def test_incremental_regenera_so_o_que_mudou(tmp_path, monkeypatch):
+    md, js = tmp_path / "campos.md", tmp_path / "campos.json"
+    manifesto = tmp_path / "campos.json.manifesto.json"
+
+    def rodar(campos):
+        return GeradorDescritivos().gerar_incremental(campos, str(md), str(js))
+
+    assert rodar(CAMPOS) == {"total": 5, "regenerados": 5, "reaproveitados": 0, "removidos": 0}
+    antes = _assinatura(md, js, manifesto)
+    assert rodar(CAMPOS) == {"total": 5, "regenerados": 0, "reaproveitados": 5, "removidos": 0}
+    assert _assinatura(md, js, manifesto) == antes
+
+    alterados = [dict(c, tamanho_max=200) if c["nome"] == "nome_completo" else c for c in CAMPOS]
+    assert rodar(alterados) == {"total": 5, "regenerados": 1, "reaproveitados": 4, "removidos": 0}
+    assert "máximo de 200 caracteres" in md.read_text(encoding="utf-8")
+
+    assert rodar(alterados[1:]) == {"total": 4, "regenerados": 0, "reaproveitados": 4, "removidos": 1}
+    assert "nome_completo" not in json.loads(manifesto.read_text(encoding="utf-8"))["entradas"]
+    assert [c["nome"] for c in json.loads(js.read_text(encoding="utf-8"))] == [c["nome"] for c in CAMPOS[1:]]
+
+    monkeypatch.setattr(gerador_descritivos, "VERSAO_GERADOR", "99")
+    assert rodar(alterados[1:]) == {"total": 4, "regenerados": 4, "reaproveitados": 0, "removidos": 0}
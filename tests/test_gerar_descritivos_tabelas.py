@@ -0,0 +1,131 @@
+import json
+import random
+
+import pytest
+
+import gerar_descritivos_tabelas
+from gerar_descritivos_tabelas import GeradorDescritivosTabelas
+
+
+def _assinatura(*caminhos):
+    return [(c.stat().st_ino, c.stat().st_mtime_ns, c.read_bytes()) for c in caminhos]
+
+
+def test_incremental_de_tabelas(tmp_path, monkeypatch):
+    saida = tmp_path / "tabelas.md"
+    manifesto = tmp_path / "tabelas.md.manifesto.json"
+    tabelas = [{"nome_logico": "DADOS_DEPENDENTE", "descricao_basica": "Dependentes do titular"},
+               {"nome_logico": "TB_FATURAMENTO", "descricao_basica": "Faturas de apólices"},
+               {"nome_logico": "TB_MEDICO", "descricao_basica": "Médicos credenciados"}]
+
+    def rodar(lista):
+        gerador = GeradorDescritivosTabelas()
+        for t in lista:
+            gerador.adicionar_tabela(t["nome_logico"], t["descricao_basica"])
+        return gerador.gerar_relatorio_incremental(str(saida))
+
+    assert rodar(tabelas)["regenerados"] == 3
+    antes = _assinatura(saida, manifesto)
+    assert rodar(tabelas) == {"total": 3, "regenerados": 0, "reaproveitados": 3, "removidos": 0}
+    assert _assinatura(saida, manifesto) == antes
+
+    alteradas = [dict(tabelas[0], descricao_basica="Dependentes e beneficiários"), *tabelas[1:]]
+    assert rodar(alteradas) == {"total": 3, "regenerados": 1, "reaproveitados": 2, "removidos": 0}
+    assert "dependentes e beneficiários" in saida.read_text(encoding="utf-8")
+
+    assert rodar(alteradas[:2]) == {"total": 2, "regenerados": 0, "reaproveitados": 2, "removidos": 1}
+    assert "TB_MEDICO" not in saida.read_text(encoding="utf-8")
+    assert set(json.loads(manifesto.read_text(encoding="utf-8"))["entradas"]) == {"DADOS_DEPENDENTE", "TB_FATURAMENTO"}
+
+    monkeypatch.setattr(gerar_descritivos_tabelas, "VERSAO_GERADOR", "99")
+    assert rodar(alteradas[:2])["regenerados"] == 2
+
+
+def _classificacao_anterior(nome_logico, descricao):
+    """Regras encadeadas em if/elif antes da tabela de regras, referência da classificação."""
+    nome, desc = nome_logico.lower(), descricao.lower()
+    ctx = {"tipo_entidade": "dados", "dominio": "geral", "relacionamentos": [], "importancia": "média"}
+    if "dependente" in nome or "dependente" in desc:
+        ctx["tipo_entidade"] = "entidade dependente"
+        ctx["relacionamentos"].append("relacionada a titular ou beneficiário principal")
+    if "endereco" in nome or "endereço" in desc:
+        ctx["tipo_entidade"] = "dados de localização"
+        ctx["relacionamentos"].append("pode estar vinculada a pessoas, empresas ou estabelecimentos")
+    if "faturamento" in nome or "fatura" in desc:
+        ctx.update(tipo_entidade="transação financeira", dominio="financeiro", importancia="alta")
+        ctx["relacionamentos"].append("relacionada a apólices e seguros")
+    if "medico" in nome or "médico" in desc:
+        ctx.update(tipo_entidade="cadastro de profissional", dominio="saúde")
+        ctx["relacionamentos"].append("referenciado em atendimentos e procedimentos")
+    if "apolice" in desc or "seguro" in desc:
+        ctx.update(dominio="seguros", importancia="alta")
+
+    regras = gerar_descritivos_tabelas.REGRAS_FINALIDADE
+    finalidades = next((list(regras[i]["finalidades"]) for i, palavra in
+                        enumerate(["dependente", "endereco", "faturamento", "medico"]) if palavra in nome),
+                       list(gerar_descritivos_tabelas.FINALIDADES_PADRAO))
+
+    cons = gerar_descritivos_tabelas.REGRAS_CONSIDERACOES
+    consideracoes = []
+    if any(p in nome or p in desc for p in ["faturamento", "financeiro", "pagamento"]):
+        consideracoes += cons[0]["consideracoes"]
+    if "medico" in nome or "profissional" in desc:
+        consideracoes += cons[1]["consideracoes"]
+    if "dependente" in nome:
+        consideracoes += cons[2]["consideracoes"]
+    if "faturamento" in nome:
+        consideracoes += cons[3]["consideracoes"]
+    if "endereco" in nome:
+        consideracoes += cons[4]["consideracoes"]
+    if any(p in nome for p in ["dependente", "medico"]):
+        consideracoes += cons[5]["consideracoes"]
+    return ctx, finalidades, consideracoes
+
+
+def _classificacao_atual(nome_logico, descricao):
+    gerador = GeradorDescritivosTabelas()
+    tabela = {"nome_logico": nome_logico, "descricao_basica": descricao}
+    return (gerador._inferir_contexto(nome_logico, descricao), gerador._gerar_finalidade_uso(tabela),
+            gerador._gerar_consideracoes_tecnicas(tabela))
+
+
+def test_classificacao_de_tabelas_representativas():
+    ctx, finalidades, consideracoes = _classificacao_atual("TB_FATURAMENTO", "Faturas de apólices de seguro")
+    assert (ctx["tipo_entidade"], ctx["dominio"], ctx["importancia"]) == ("transação financeira", "seguros", "alta")
+    assert finalidades[0] == "Registro de todas as transações de faturamento de apólices e seguros"
+    assert [c.split("**")[1] for c in consideracoes] == ["Segurança", "Performance", "Retenção"]
+
+    ctx, finalidades, consideracoes = _classificacao_atual("DADOS_MEDICO_DEPENDENTE", "Profissional de saúde")
+    assert (ctx["tipo_entidade"], ctx["dominio"], ctx["importancia"]) == ("cadastro de profissional", "saúde", "média")
+    assert len(ctx["relacionamentos"]) == 2
+    assert finalidades[0].startswith("Cadastro e gestão de dependentes")  # a primeira regra que dispara vence
+    assert [c.split("**")[1] for c in consideracoes] == ["Privacidade", "Privacidade", "Integridade Referencial"]
+
+    assert _classificacao_atual("TB_PRODUTO", "Catálogo de produtos") == (
+        {"tipo_entidade": "dados", "dominio": "geral", "relacionamentos": [], "importancia": "média"},
+        list(gerar_descritivos_tabelas.FINALIDADES_PADRAO), [])
+
+
+@pytest.mark.parametrize("nome_logico, descricao", [
+    ("TB_FATURAMENTO", "Faturamento mensal"),           # "fatura" contida em "faturamento"
+    ("TB_CLIENTE", "Fatura avulsa"),                     # só a palavra menor
+    ("TB_ENDERECOFATURAMENTO", "Endereço de cobrança"),  # palavras coladas no nome
+    ("TB_PAGAMENTO_FINANCEIRO", "Pagamentos"),
+    ("TB_MEDICO", "Cadastro de médicos e profissionais"),
+    ("TB_APOLICE", "Apólices"),                          # "apolice" só vale na descrição, e sem acento
+    ("TB_X", "apolice do seguro do dependente do médico com endereço"),
+    ("DEPENDENTE_ENDERECO_MEDICO_FATURAMENTO", ""),
+    ("", "dependentedependente fatura"),
+])
+def test_classificacao_igual_as_regras_anteriores(nome_logico, descricao):
+    assert _classificacao_atual(nome_logico, descricao) == _classificacao_anterior(nome_logico, descricao)
+
+
+def test_classificacao_igual_em_combinacoes_aleatorias():
+    rng = random.Random(0)
+    pedacos = ["dependente", "endereco", "endereço", "faturamento", "fatura", "medico", "médico", "apolice",
+               "seguro", "financeiro", "pagamento", "profissional", "TB_", "_", " ", "x", "DEPENDENTE", "Fatura"]
+    for _ in range(2_000):
+        nome = "".join(rng.choices(pedacos, k=rng.randint(0, 4)))
+        descricao = " ".join(rng.choices(pedacos, k=rng.randint(0, 4)))
+        assert _classificacao_atual(nome, descricao) == _classificacao_anterior(nome, descricao), (nome, descricao)
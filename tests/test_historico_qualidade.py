@@ -0,0 +1,82 @@
+import json
+import random
+from datetime import datetime, timedelta
+
+from src.historico_qualidade import SCORE, HistoricoQualidade
+
+INICIO = datetime(2025, 1, 6, 8)  # segunda-feira
+
+
+def _report(i, taxa, score=99.0, dataset="vendas", ts=None):
+    return {"dataset_name": dataset, "execution_id": f"exec-{i}", "overall_quality_score": score,
+            "execution_timestamp": (ts or INICIO + timedelta(hours=12 * i)).isoformat(),
+            "results": [{"rule_id": "nulos_cpf", "status": "FAIL" if taxa > 5 else "PASS",
+                         "violations_count": int(taxa * 10), "total_records": 1_000, "violation_percentage": taxa},
+                        {"rule_id": "schema", "status": "ERROR"}]}
+
+
+def test_rollups_diarios_e_semanais(tmp_path):
+    h = HistoricoQualidade(str(tmp_path))
+    for i, taxa in enumerate([1.0, 3.0, 2.0, 8.0]):  # dois por dia: 06/01 e 07/01
+        h.registrar(_report(i, taxa))
+    h.registrar(_report(4, 4.0, score=85.0, ts=INICIO + timedelta(days=7)))  # semana seguinte
+
+    diario = {(l["periodo"], l["regra"]): l for l in h.rollup("vendas", "D")}
+    assert diario[("2025-01-06", "nulos_cpf")]["media"] == 2.0
+    assert diario[("2025-01-07", "nulos_cpf")]["maximo"] == 8.0
+    assert diario[("2025-01-07", "nulos_cpf")]["falhas"] == 1
+    assert diario[("2025-01-07", "schema")]["erros"] == 2 and diario[("2025-01-07", "schema")]["media"] is None
+
+    semanal = h.rollup("vendas", "W", regra="nulos_cpf")
+    assert [(l["periodo"], l["execucoes"], l["violacoes"], l["total"]) for l in semanal] == \
+        [("2025-W02", 4, 140, 4_000), ("2025-W03", 1, 40, 1_000)]
+    score = h.rollup("vendas", "W", regra=SCORE)
+    assert score[0]["APPROVED"] == 4 and score[1]["WARNING"] == 1
+
+
+def test_drift_detectado_apos_mudanca_de_nivel(tmp_path):
+    rng = random.Random(0)
+    h = HistoricoQualidade(str(tmp_path))
+    taxas = [2.0 + rng.gauss(0, 0.3) for _ in range(30)] + [6.0 + rng.gauss(0, 0.3) for _ in range(10)]
+
+    alertas = [(i, a) for i, t in enumerate(taxas) for a in h.registrar(_report(i, t))]
+
+    assert all(i >= 30 for i, _ in alertas)
+    cpf = [a for _, a in alertas if a["regra"] == "nulos_cpf"]
+    assert {a["metodo"] for a in cpf} >= {"EWMA", "CUSUM+"}
+    assert all(a["piora"] for a in cpf)
+    assert min(i for i, a in alertas if a["regra"] == "nulos_cpf") <= 32
+    assert h.alertas("vendas") == [a for _, a in alertas] and h.alertas("outro") == []
+
+
+def test_importar_e_idempotente(tmp_path):
+    reports, results = [], []
+    for i, taxa in enumerate([1.0, 2.0, 3.0]):
+        r = _report(i, taxa)
+        results += [{**res, "execution_id": r["execution_id"]} for res in r.pop("results")]
+        reports.append(r)
+    h = HistoricoQualidade(str(tmp_path))
+
+    h.importar(list(reversed(reports)), results)  # fora de ordem: importar ordena por timestamp
+    estado = h.carregar("vendas")
+    h.importar(reports, results)
+    for i, taxa in enumerate([1.0, 2.0, 3.0]):
+        h.registrar(_report(i, taxa))
+
+    assert h.carregar("vendas") == estado
+    assert estado["ultimo_ts"] == reports[-1]["execution_timestamp"] and estado["execucoes_ultimo_ts"] == ["exec-2"]
+    assert h.rollup("vendas", "D", regra="nulos_cpf")[0]["execucoes"] == 2
+    with open(tmp_path / "vendas.pontos.jsonl", encoding="utf-8") as f:
+        pontos = [json.loads(l) for l in f]
+    assert len(pontos) == 9  # 3 execuções x (score + 2 regras), sem duplicatas
+
+
+def test_execucoes_no_mesmo_timestamp_e_score_ausente(tmp_path):
+    h = HistoricoQualidade(str(tmp_path))
+    h.registrar(_report(0, 1.0, ts=INICIO))
+    h.registrar(_report(1, 1.0, score=None, ts=INICIO))
+
+    estado = h.carregar("vendas")
+    assert estado["execucoes_ultimo_ts"] == ["exec-0", "exec-1"]
+    assert estado["deteccao"][SCORE]["n"] == 1 and estado["deteccao"]["nulos_cpf"]["n"] == 2
+    assert h.rollup("vendas", "D", regra=SCORE)[0]["execucoes"] == 1
@@ -0,0 +1,63 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+NOTEBOOKS = Path(__file__).resolve().parents[1] / "notebooks"
+
+# o custo de import é verificado pelos módulos carregados (`python -X importtime`) e, com folga
+# para a variação de carga da máquina, pelo tempo acumulado dos módulos importados no código
+ORCAMENTO_PACOTE_MS = 150
+ORCAMENTO_SRC_MS = 1500
+ORCAMENTO_DAG_MS = 4000
+PESADOS_SRC = ("matplotlib", "pandera")
+PESADOS_DAG = ("yfinance", "snowflake", "requests", "airflow.providers.snowflake")
+
+
+def _importtime(codigo: str) -> dict[str, int]:
+    """Executa `codigo` em um interpretador novo e devolve {módulo importado: µs acumulados}."""
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=NOTEBOOKS,
+                       capture_output=True, text=True, check=True)
+    modulos = {}
+    for linha in r.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(.+)$", linha)
+        if m:
+            modulos.setdefault(m.group(2).strip(), int(m.group(1)))
+    return modulos
+
+
+def _ms(modulos: dict[str, int], nomes: tuple[str, ...]) -> float:
+    """Tempo acumulado (ms) dos módulos pedidos no import, já incluindo suas dependências."""
+    return sum(modulos[n] for n in nomes) / 1000
+
+
+def _carregados(modulos: set[str], pesados: tuple[str, ...]) -> set[str]:
+    return {m for m in modulos if m.startswith(pesados)}
+
+
+def test_pacote_src_so_carrega_biblioteca_padrao():
+    modulos = _importtime("import src, src.instrumentacao")
+    terceiros = {m.split(".")[0] for m in modulos.keys() - _importtime("pass").keys()}  # sem os de site/.pth
+    terceiros -= set(sys.stdlib_module_names) | {"src"}
+    assert not terceiros, f"import de src carregou {sorted(terceiros)}"
+    ms = _ms(modulos, ("src", "src.instrumentacao"))
+    assert ms < ORCAMENTO_PACOTE_MS, f"import de src levou {ms:.0f} ms"
+
+
+def test_modulos_src_adiam_matplotlib_e_pandera():
+    pytest.importorskip("pandas")
+    nomes = ("src.visualizacao", "src.processamento_validado", "src.contrato")
+    modulos = _importtime(f"import {', '.join(nomes)}")
+    assert not _carregados(set(modulos), PESADOS_SRC)
+    ms = _ms(modulos, ("src", *nomes))
+    assert ms < ORCAMENTO_SRC_MS, f"import dos módulos de src levou {ms:.0f} ms"
+
+
+def test_parse_da_dag_sem_dependencias_das_tarefas():
+    pytest.importorskip("airflow")
+    modulos = _importtime("import yfinance_to_snowflake")
+    assert not _carregados(set(modulos), PESADOS_DAG)
+    ms = _ms(modulos, ("yfinance_to_snowflake",))
+    assert ms < ORCAMENTO_DAG_MS, f"parse da DAG levou {ms:.0f} ms"
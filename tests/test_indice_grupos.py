@@ -0,0 +1,66 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.indice_grupos import IndiceGrupos, filter_genero
+
+
+def _filter_genero_notebook(df, genero="Feminino", reset_index=False, case_sensitive=False):
+    """Versão por máscara do 15.analiseGenero, referência do índice."""
+    if genero is None:
+        result = df.copy()
+    else:
+        if case_sensitive:
+            mask = df['genero'] == genero
+        else:
+            mask = df['genero'].astype(str).str.lower() == str(genero).lower()
+        result = df[mask].copy()
+    if reset_index:
+        result = result.reset_index(drop=True)
+    return result
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    generos = np.array(["Feminino", "feminino", "FEMININO", "Masculino", "Straße", "STRASSE", "1", 1,
+                        None, np.nan], dtype=object)
+    n = 5_000
+    return pd.DataFrame({"genero": generos[rng.integers(0, len(generos), n)],
+                         "idade": np.where(rng.random(n) < 0.05, np.nan, rng.integers(18, 80, n).astype(float))},
+                        index=rng.permutation(n) * 3)
+
+
+@pytest.mark.parametrize("genero", ["Feminino", "feminino", "masculino", "straße", "strasse", "1", 1, True, 1.0,
+                                    "true", "nan", "None", "<NA>", np.nan, "Outro", None])
+@pytest.mark.parametrize("case_sensitive", [False, True])
+def test_igual_ao_filtro_por_mascara(df, genero, case_sensitive):
+    indice = IndiceGrupos(df, "genero")
+    for reset_index in (False, True):
+        esperado = _filter_genero_notebook(df, genero, reset_index, case_sensitive)
+        obtido = filter_genero(df, genero, reset_index, case_sensitive, indice=indice)
+        pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_cache_nao_mistura_valores_iguais_com_tipos_diferentes():
+    df = pd.DataFrame({"genero": pd.Series(["1", "true", "True", "x", 1.0], dtype=object)})
+    for ordem in ([True, 1.0, 1, "1"], [1, True, 1.0, "1"], [1.0, "1", True, 1]):
+        indice = IndiceGrupos(df, "genero")
+        for case_sensitive in (False, True):
+            for valor in ordem:
+                pd.testing.assert_frame_equal(filter_genero(df, valor, case_sensitive=case_sensitive, indice=indice),
+                                              _filter_genero_notebook(df, valor, case_sensitive=case_sensitive))
+
+
+def test_agregar_igual_ao_groupby(df):
+    df = df.assign(genero=df["genero"].map(lambda g: g if g is None or g != g else str(g)))
+    indice = IndiceGrupos(df, "genero")
+
+    obtido = indice.agregar("idade").sort_index()
+    esperado = df.groupby("genero")["idade"].agg(["count", "sum", "mean", "min", "max"])
+
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+    pd.testing.assert_series_equal(indice.value_counts().sort_index(), df["genero"].value_counts().sort_index())
+    pd.testing.assert_series_equal(indice.describe("idade", "Masculino"),
+                                   df.loc[df["genero"] == "Masculino", "idade"].describe())
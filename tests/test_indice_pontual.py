@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from src.indice_pontual import IndicePontual, hash_chaves
+
+
+def _gravar(pasta, nome, cpfs, **kwargs):
+    os.makedirs(pasta, exist_ok=True)
+    df = pd.DataFrame({"cpf": cpfs, "nome": [f"n{i}" for i in range(len(cpfs))]})
+    df.to_parquet(os.path.join(pasta, nome), row_group_size=kwargs.get("row_group_size", 50), index=False)
+
+
+def _cpfs(inicio, n):
+    return [f"{i:011d}" for i in range(inicio, inicio + n)]
+
+
+def test_normalizacao_cpf():
+    texto = hash_chaves(["123.456.789-01", "12345678901.0", " 12345678901 ", "", None, "00000000000"], "cpf")
+    numerico = hash_chaves(pd.Series([12345678901.0, np.nan]), "cpf")
+
+    assert texto[0] == texto[1] == texto[2] == numerico[0] != 0
+    assert texto[3] == texto[4] == numerico[1] == 0  # vazio e nulo não viram "00000000000"
+    assert texto[5] != 0
+
+
+def test_busca_acertos_erros_e_chaves_nulas(tmp_path):
+    dados = str(tmp_path / "dados")
+    _gravar(dados, "a.parquet", _cpfs(0, 200) + [None, ""])
+    _gravar(dados, "b.parquet", _cpfs(1_000, 200))
+    indice = IndicePontual(str(tmp_path / "idx"), dados, "cpf", "cpf")
+
+    assert indice.atualizar()["indexados"] == ["a.parquet", "b.parquet"]
+
+    achados = indice.buscar(["00000000007", "000.000.010-05", "99999999999", None, ""], colunas=["cpf", "nome"])
+    assert sorted(achados["cpf"]) == ["00000000007", "00000001005"]
+    assert (1, 0) in indice.row_groups_candidatos("00000001005")  # blooms podem ter falsos positivos
+    assert indice.buscar([None, ""]).empty
+
+
+def test_busca_so_com_blooms_sem_indice_consolidado(tmp_path):
+    dados = str(tmp_path / "dados")
+    _gravar(dados, "a.parquet", _cpfs(0, 200))
+    indice = IndicePontual(str(tmp_path / "idx"), dados, "cpf", "cpf")
+    indice.atualizar()
+    for nome in ("hashes", "arquivos", "row_groups", "linhas"):
+        os.remove(tmp_path / "idx" / f"{nome}.npy")
+
+    assert indice.buscar(["00000000150", "12345678900"])["cpf"].tolist() == ["00000000150"]
+
+
+def test_atualizacao_incremental_igual_a_reconstrucao(tmp_path):
+    dados = str(tmp_path / "dados")
+    _gravar(dados, "a.parquet", _cpfs(0, 300))
+    _gravar(dados, "b.parquet", _cpfs(1_000, 300))
+    indice = IndicePontual(str(tmp_path / "idx"), dados, "cpf", "cpf")
+    indice.atualizar()
+
+    _gravar(dados, "c.parquet", _cpfs(2_000, 100))                 # novo
+    _gravar(dados, "a.parquet", _cpfs(5_000, 50), row_group_size=7)  # alterado
+    os.remove(os.path.join(dados, "b.parquet"))                      # removido
+    os.utime(os.path.join(dados, "a.parquet"), ns=(1, 1))
+    r = IndicePontual(str(tmp_path / "idx"), dados, "cpf", "cpf").atualizar()
+
+    assert (r["indexados"], r["removidos"], r["arquivos"]) == (["a.parquet", "c.parquet"], ["b.parquet"], 2)
+    incremental = IndicePontual(str(tmp_path / "idx"), dados, "cpf", "cpf")
+    do_zero = IndicePontual(str(tmp_path / "idx2"), dados, "cpf", "cpf")
+    do_zero.atualizar()
+    for nome in ("hashes", "row_groups", "linhas"):
+        np.testing.assert_array_equal(np.sort(np.load(tmp_path / "idx" / f"{nome}.npy")),
+                                      np.sort(np.load(tmp_path / "idx2" / f"{nome}.npy")))
+    hashes = np.load(tmp_path / "idx" / "hashes.npy")
+    assert (hashes[1:] >= hashes[:-1]).all()
+    achados = incremental.buscar(["00000000010", "00000001010", "00000002010", "00000005010"])
+    assert sorted(achados["cpf"]) == ["00000002010", "00000005010"]
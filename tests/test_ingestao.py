@@ -0,0 +1,64 @@
+import datetime
+import os
+import pickle
+import zoneinfo
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.ingestao import ler_pickle_seguro
+
+
+def _texto(s: str) -> bytes:
+    return b"\x8c" + bytes([len(s.encode())]) + s.encode()  # SHORT_BINUNICODE
+
+
+def _global(modulo: str, nome: str) -> bytes:
+    """STACK_GLOBAL do protocolo 4: o nome pode conter '.' e navegar atributos."""
+    return _texto(modulo) + _texto(nome) + b"\x93"
+
+
+def _df():
+    return pd.DataFrame({
+        "i": [1, 2, 3], "f": [1.0, np.nan, 3.0], "o": ["a", None, "c"], "s": pd.array(["a", None, "c"], dtype="string"),
+        "c": pd.Categorical(["x", "y", "x"]), "I": pd.array([1, None, 3], dtype="Int64"),
+        "B": pd.array([True, None, False], dtype="boolean"), "d": pd.to_datetime(["2020-01-01", None, "2020-01-03"]),
+        "dz": pd.date_range("2020", periods=3, tz="America/Sao_Paulo"), "td": pd.to_timedelta([1, 2, 3], unit="D"),
+        "p": pd.period_range("2020-01", periods=3, freq="M"), "iv": pd.interval_range(0, 3),
+        "py": [datetime.date(2020, 1, 1), datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+               datetime.datetime(2020, 1, 1, tzinfo=zoneinfo.ZoneInfo("America/Sao_Paulo"))],
+    }, index=pd.date_range("2021-01-01", periods=3, freq="D"))
+
+
+@pytest.mark.parametrize("protocolo", [2, 4, 5])
+def test_le_dataframes_do_to_pickle(tmp_path, protocolo):
+    caminho = tmp_path / "df.pkl"
+    _df().to_pickle(caminho, protocol=protocolo)
+
+    pd.testing.assert_frame_equal(ler_pickle_seguro(str(caminho)), _df())
+
+
+@pytest.mark.parametrize("carga", [
+    _global("pandas.core.common", "builtins.eval") + _texto("__import__('os')") + b"\x85R.",  # eval via atributo
+    _global("pandas.core.frame", "DataFrame.to_csv") + _texto("/tmp") + b"\x85R.",
+    _global("os", "system") + _texto("true") + b"\x85R.",
+    _global("builtins", "eval") + _texto("1") + b"\x85R.",
+    _global("builtins", "getattr") + _global("builtins", "object") + _texto("__subclasses__") + b"\x86R.",
+])
+def test_pickle_malicioso_e_rejeitado(carga):
+    with pytest.raises(pickle.UnpicklingError):
+        ler_pickle_seguro(b"\x80\x04" + carga)
+
+
+def test_reduce_nao_executa_codigo(tmp_path):
+    marcador = tmp_path / "executou"
+
+    class Ataque:
+        def __reduce__(self):
+            return os.system, (f"touch {marcador}",)
+
+    with pytest.raises(pickle.UnpicklingError):
+        ler_pickle_seguro(pickle.dumps(pd.DataFrame({"x": [Ataque()]})))
+    assert not marcador.exists()
@@ -0,0 +1,59 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.faixas import IndiceFaixas
+from src.ipv4 import IndiceIP, cidr_para_faixa, ipv4_para_uint32, uint32_para_ipv4
+
+
+def _lista(valores):
+    return [None if pd.isna(v) else v for v in valores]
+
+
+def test_ida_e_volta_uint32():
+    ips = ["0.0.0.0", "10.1.2.3", " 192.168.0.1 ", "255.255.255.255", "256.1.1.1", "1.2.3", None]
+
+    valores = ipv4_para_uint32(ips)
+
+    assert _lista(valores) == [0, 167838211, 3232235521, 4294967295, None, None, None]
+    assert _lista(uint32_para_ipv4(valores)) == ["0.0.0.0", "10.1.2.3", "192.168.0.1", "255.255.255.255",
+                                                 None, None, None]
+
+
+def test_cidr_para_faixa():
+    inicio, fim, validos = cidr_para_faixa(["10.0.0.0/8", "192.168.1.77/24", "8.8.8.8", "0.0.0.0/0", "1.2.3.4/33"])
+
+    assert validos.tolist() == [True, True, True, True, False]
+    assert _lista(uint32_para_ipv4(inicio[:4])) == ["10.0.0.0", "192.168.1.0", "8.8.8.8", "0.0.0.0"]
+    assert _lista(uint32_para_ipv4(fim[:4])) == ["10.255.255.255", "192.168.1.255", "8.8.8.8", "255.255.255.255"]
+
+
+def test_cidr_mais_especifico_vence():
+    tabela = pd.DataFrame({"cidr": ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24", "20.0.0.0/8"],
+                           "asn": ["A", "B", "C", "D"]})
+    indice = IndiceIP.de_cidrs(tabela)
+
+    out = indice.enriquecer(pd.DataFrame({"ip": ["10.9.9.9", "10.1.9.9", "10.1.2.3", "10.1.3.0", "11.0.0.0",
+                                                 "20.255.255.255", "lixo"]}), "ip")
+
+    assert _lista(out["asn"]) == ["A", "B", "C", "B", None, "D", None]
+    assert indice.contem(["10.1.2.3", "11.0.0.0"]).tolist() == [True, False]
+
+
+def test_de_intervalos_ignora_invertidos():
+    tabela = pd.DataFrame({"de": ["1.0.0.0", "5.0.0.10", "9.0.0.0"], "ate": ["1.0.0.255", "5.0.0.1", "x"],
+                           "pais": ["BR", "AR", "CL"]})
+
+    indice = IndiceIP.de_intervalos(tabela, "de", "ate")
+
+    assert len(indice) == 1 and indice.resolver(["1.0.0.128", "5.0.0.5"]).tolist() == [0, -1]
+
+
+def test_faixas_sobrepostas_ficam_com_a_mais_estreita():
+    indice = IndiceFaixas.de_faixas(np.array([0, 10, 12]), np.array([100, 20, 14]),
+                                    pd.DataFrame({"nome": ["larga", "media", "estreita"]}))
+
+    nomes = indice.atributos(indice.posicoes(np.array([5, 10, 13, 15, 21, 101])))["nome"]
+
+    assert _lista(nomes) == ["larga", "media", "estreita", "media", "larga", None]
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("deltalake")
+import pandas as pd
+from deltalake import write_deltalake
+
+from src.manutencao_delta import aplicar_orcamento, executar_plano, planejar_manutencao, sobreposicao
+
+
+def _tabela(caminho, lotes_por_particao):
+    for particao, lotes in lotes_por_particao.items():
+        for i in range(lotes):
+            write_deltalake(caminho, pd.DataFrame({"uf": pd.Series([particao] * 3, dtype="object"),
+                                                   "id": [i * 10, i * 10 + 1, i * 10 + 2]}),
+                            partition_by=["uf"], mode="append")
+
+
+def test_sobreposicao():
+    assert sobreposicao(pd.Series([0, 10, 20]).to_numpy(), pd.Series([9, 19, 29]).to_numpy()) == 0.0
+    assert sobreposicao(pd.Series([0, 0, 0]).to_numpy(), pd.Series([9, 9, 9]).to_numpy()) == 1.0
+
+
+def test_planeja_compactacao_so_da_particao_fragmentada(tmp_path):
+    caminho = str(tmp_path / "vendas")
+    _tabela(caminho, {"SP": 5, "RJ": 1})
+
+    plano = planejar_manutencao(caminho, min_arquivos=4)
+
+    assert [(a["acao"], a["particao"], a["filtros"]) for a in plano] == [("compactar", "SP", [("uf", "=", "SP")])]
+    assert plano[0]["arquivos_antes"] == 5 and plano[0]["bytes"] > 0
+
+    registro, = executar_plano(plano)
+    assert registro["arquivos_depois"] == 1
+
+
+def test_particao_nula_fica_fora_do_plano(tmp_path):
+    caminho = str(tmp_path / "vendas")
+    _tabela(caminho, {"SP": 5, None: 5})
+
+    plano = planejar_manutencao(caminho, min_arquivos=4)
+
+    assert [a["filtros"] for a in plano] == [[("uf", "=", "SP")]]
+
+
+def test_orcamento_prioriza_e_corta():
+    planos = [{"acao": "compactar", "bytes": 60, "prioridade": 1.0},
+              {"acao": "zorder", "bytes": 50, "prioridade": 5.0},
+              {"acao": "compactar", "bytes": 40, "prioridade": 3.0},
+              {"acao": "vacuum", "bytes": 0, "prioridade": 0.5}]
+
+    selecionadas = aplicar_orcamento(planos, 100)
+
+    assert [(a["acao"], a["bytes"]) for a in selecionadas] == [("zorder", 50), ("compactar", 40), ("vacuum", 0)]
+    assert len(aplicar_orcamento(planos, None)) == 4
@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.memoria import aplicar_manifesto, ler_otimizado, otimizar_memoria, restaurar_dtypes
+
+
+def _df(ids, valores, n=100):
+    return pd.DataFrame({"id": ids, "valor": valores, "uf": (["SP", "RJ"] * n)[:len(ids)]})
+
+
+def test_otimiza_e_restaura():
+    df = _df(np.arange(100, dtype="int64"), np.linspace(0, 1, 100))
+
+    otimizado, manifesto = otimizar_memoria(df)
+
+    assert str(otimizado["id"].dtype) == "uint8" and str(otimizado["uf"].dtype) == "category"
+    assert manifesto["bytes_depois"] < manifesto["bytes_antes"]
+    pd.testing.assert_frame_equal(restaurar_dtypes(otimizado, manifesto), df)
+
+
+def test_manifesto_nao_trunca_arquivo_com_faixa_maior():
+    _, manifesto = otimizar_memoria(_df(np.arange(100, dtype="int64"), np.arange(100.0)))
+    assert manifesto["colunas"]["valor"]["otimizado"] == "UInt8"
+
+    segundo = _df(np.array([0, 70_000, -5], dtype="int64"), [1.5, 300.0, np.nan])
+    out = aplicar_manifesto(segundo, manifesto)
+
+    assert out["id"].tolist() == [0, 70_000, -5] and str(out["id"].dtype) == "int64"
+    assert out["valor"].tolist()[:2] == [1.5, 300.0] and str(out["valor"].dtype) == "float64"
+    assert str(out["uf"].dtype) == "category"
+
+
+def test_ler_otimizado_csv_reusa_manifesto_com_faixa_conferida(tmp_path):
+    manifesto = str(tmp_path / "vendas.dtypes.json")
+    _df(np.arange(100), np.arange(100.0)).to_csv(tmp_path / "jan.csv", index=False)
+    _df([1, 2, 100_000], [1.0, 2.0, 1e9]).to_csv(tmp_path / "fev.csv", index=False)
+
+    jan = ler_otimizado(str(tmp_path / "jan.csv"), manifesto)
+    fev = ler_otimizado(str(tmp_path / "fev.csv"), manifesto)
+
+    assert str(jan["id"].dtype) == "uint8"
+    assert fev["id"].tolist() == [1, 2, 100_000] and fev["valor"].tolist() == [1.0, 2.0, 1e9]
+    assert str(fev["uf"].dtype) == "category"
@@ -0,0 +1,24 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from src.outliers import DetectorOutliers
+
+
+def test_outlier_da_conta_e_global():
+    rng = np.random.default_rng(0)
+    detector = DetectorOutliers(["TransactionAmount"], min_eventos_conta=20)
+    for _ in range(5):
+        contas = rng.integers(0, 100, 10_000)
+        # conta 0 sempre gasta ~10 000; as demais ~100
+        valores = np.where(contas == 0, rng.normal(10_000, 1_000, len(contas)), rng.lognormal(4.6, 0.3, len(contas)))
+        detector.pontuar(pd.DataFrame({"AccountID": contas, "TransactionAmount": valores}))
+
+    lote = pd.DataFrame({"AccountID": [0, 1, 0, 999], "TransactionAmount": [10_500.0, 100.0, 100.0, 1e6]})
+    out = detector.pontuar(lote, atualizar=False)
+
+    assert out["outlier"].tolist() == [True, False, True, True]
+    assert abs(out.loc[0, "z_TransactionAmount_conta"]) < 3.5  # normal para a conta 0, mesmo alto no global
+    assert np.isnan(out.loc[3, "z_TransactionAmount_conta"])  # conta nova: sem histórico próprio
+    assert detector.eventos == 50_000 and len(detector.contas["TransactionAmount"]) == 100
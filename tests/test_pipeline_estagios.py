@@ -0,0 +1,108 @@
+import operator
+import random
+import threading
+import time
+
+import pytest
+
+from src.pipeline_estagios import Estagio, PipelineEstagios
+
+
+def _threads_do_pipeline():
+    return [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+def test_preserva_ordem_com_varios_trabalhadores():
+    def lento(x):
+        time.sleep(random.random() * 0.01)
+        return x * 10
+
+    estagios = [Estagio("a", lento, trabalhadores=4), Estagio("b", lambda x: x + 1, trabalhadores=3)]
+
+    assert PipelineEstagios(estagios).executar(range(100)) == [x * 10 + 1 for x in range(100)]
+    assert sorted(PipelineEstagios(estagios, ordenado=False).executar(range(100))) == [x * 10 + 1 for x in range(100)]
+
+
+def test_fila_cheia_bloqueia_a_fonte():
+    produzidos, liberar = [0], threading.Event()
+
+    def fonte():
+        for i in range(50):
+            produzidos[0] += 1
+            yield i
+
+    def travado(x):
+        liberar.wait()
+        return x
+
+    pipeline = PipelineEstagios([Estagio("travado", travado, capacidade=5)])
+    saida = []
+    consumidor = threading.Thread(target=lambda: saida.extend(pipeline.executar(fonte())))
+    consumidor.start()
+    time.sleep(0.3)
+    # 1 item no trabalhador + 5 na fila do estágio + 1 parado no put da fonte
+    assert produzidos[0] == 7
+    liberar.set()
+    consumidor.join(timeout=10)
+    assert saida == list(range(50))
+    assert [l["itens"] for l in pipeline.relatorio()] == [50, 50]
+
+
+def test_item_lento_nao_acumula_resultados_fora_de_ordem():
+    produzidos = [0]
+
+    def fonte():
+        for i in range(10_000):
+            produzidos[0] += 1
+            yield i
+
+    def primeiro_lento(x):
+        if x == 0:
+            time.sleep(0.5)
+        return x
+
+    pipeline = PipelineEstagios([Estagio("lento", primeiro_lento, trabalhadores=4, capacidade=2)], capacidade_saida=2)
+    iterador = pipeline.iterar(fonte())
+
+    assert next(iterador) == 0
+    # 2 na fila + 4 nos trabalhadores + 2 na saída/reordenação, mais 1 parado na fonte
+    assert produzidos[0] <= 9
+    assert list(iterador) == list(range(1, 10_000))
+
+
+def test_erro_em_um_estagio_cancela_e_e_relancado():
+    def infinita():
+        i = 0
+        while True:
+            yield i
+            i += 1
+
+    def falha(x):
+        if x == 5:
+            raise ValueError("item 5")
+        return x
+
+    pipeline = PipelineEstagios([Estagio("falha", falha, trabalhadores=3), Estagio("copia", lambda x: x, trabalhadores=2)])
+
+    with pytest.raises(ValueError, match="item 5"):
+        pipeline.executar(infinita())
+    assert _threads_do_pipeline() == []
+
+
+def test_consumidor_que_para_cedo_encerra_trabalhadores():
+    pipeline = PipelineEstagios([Estagio("a", lambda x: x, trabalhadores=4), Estagio("b", lambda x: x, trabalhadores=4)])
+    iterador = pipeline.iterar(range(1_000))
+
+    assert [next(iterador) for _ in range(3)] == [0, 1, 2]
+    iterador.close()
+    assert _threads_do_pipeline() == []
+
+
+def test_estagio_em_processos():
+    pipeline = PipelineEstagios([Estagio("negar", operator.neg, trabalhadores=2, modo="processo"),
+                                 Estagio("somar", lambda x: x + 1, trabalhadores=2)])
+
+    assert pipeline.executar(range(20)) == [1 - x for x in range(20)]
+    assert _threads_do_pipeline() == []
+    with pytest.raises(ValueError):
+        Estagio("x", abs, modo="fork")
@@ -0,0 +1,61 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from src.regras_estatisticas import _valor_particao, avaliar_regras
+
+REGRAS = [{"rule_id": "r1", "column_name": "valor", "rule_type": "non_negative"},
+          {"rule_id": "r2", "column_name": "valor", "rule_type": "not_null"},
+          {"rule_id": "r3", "column_name": "valor", "rule_type": "range", "parameters": {"min": 0, "max": 50}},
+          {"rule_id": "r4", "column_name": "valor", "rule_type": "regex"}]
+
+
+def test_parquet_decide_por_row_group_e_le_so_o_inconclusivo(tmp_path):
+    caminho = str(tmp_path / "v.parquet")
+    # row groups: [0..9] passa tudo; [10..19] com um nulo; [-5, 30..38] inconclusivo para r1
+    valores = list(range(10)) + [None] + list(range(11, 20)) + [-5] + list(range(30, 39))
+    pq.write_table(pa.table({"valor": pa.array(valores, pa.int64())}), caminho, row_group_size=10)
+
+    r1, r2, r3, r4 = avaliar_regras(caminho, REGRAS)
+
+    assert (r1["status"], r1["violacoes"], r1["por_metadados"], r1["varridas"]) == ("FAIL", 1, 2, 1)
+    assert (r2["status"], r2["violacoes"], r2["varridas"]) == ("FAIL", 1, 0)
+    assert (r3["status"], r3["violacoes"]) == ("FAIL", 1)
+    assert r4["status"] == "NAO_SUPORTADA"
+    assert r1["bytes_lidos"] > 0 and r3["bytes_lidos"] == 0  # unidade lida uma vez para as duas regras
+
+
+def test_contar_todas_false_encerra_na_primeira_falha(tmp_path):
+    caminho = str(tmp_path / "v.parquet")
+    pq.write_table(pa.table({"valor": pa.array([-1] * 10 + [-2] * 10, pa.int64())}), caminho, row_group_size=10)
+
+    r1, *_ = avaliar_regras(caminho, REGRAS[:1], contar_todas=False)
+
+    assert (r1["status"], r1["violacoes"], r1["exato"], r1["por_metadados"]) == ("FAIL", 10, False, 1)
+
+
+def test_delta_coluna_de_particao(tmp_path):
+    pytest.importorskip("deltalake")
+    from deltalake import write_deltalake
+
+    caminho = str(tmp_path / "t")
+    write_deltalake(caminho, pd.DataFrame({"ano": pd.array([2020, 2021, None], dtype="Int64"), "x": [1, 2, 3]}),
+                    partition_by=["ano"])
+    regras = [{"id": "nn", "coluna": "ano", "tipo": "nao_nulo"},
+              {"id": "faixa", "coluna": "ano", "tipo": "intervalo", "minimo": 2020, "maximo": 2020}]
+
+    nn, faixa = avaliar_regras(caminho, regras)
+
+    assert (nn["status"], nn["violacoes"], nn["varridas"]) == ("FAIL", 1, 0)
+    assert (faixa["status"], faixa["violacoes"], faixa["varridas"]) == ("FAIL", 1, 0)
+
+
+def test_valor_de_particao_em_texto_usa_o_tipo_do_schema():
+    import datetime
+
+    assert _valor_particao("2021", pa.int64()) == 2021
+    assert _valor_particao("2020-01-31", pa.date32()) == datetime.date(2020, 1, 31)
+    assert _valor_particao("007", pa.string()) == "007"
+    assert _valor_particao(float("nan"), pa.float64()) is None
@@ -0,0 +1,23 @@
+from regressao import comparar, relatorio_markdown
+
+
+def _resultado(**casos):
+    return {"ambiente": {}, "casos": {nome: {"10000": medida} for nome, medida in casos.items()}}
+
+
+def test_classifica_regressao_melhora_e_novos():
+    baseline = _resultado(a={"min_s": 1.0}, b={"min_s": 1.0}, c={"min_s": 1.0})
+    atual = _resultado(a={"min_s": 1.25}, b={"min_s": 0.5}, c={"min_s": 1.05}, d={"min_s": 2.0},
+                       e={"pulado": "ImportError: pandera"})
+
+    status = {l["caso"]: l["status"] for l in comparar(atual, baseline, limite=0.10)}
+
+    assert status == {"a": "regressao", "b": "melhora", "c": "ok", "d": "novo", "e": "pulado"}
+
+
+def test_relatorio_conta_regressoes():
+    linhas = comparar(_resultado(a={"min_s": 2.0}), _resultado(a={"min_s": 1.0}), limite=0.10)
+
+    texto = relatorio_markdown(linhas, 0.10)
+
+    assert "+100.0%" in texto and "**1 regressão(ões)** em 1 medições." in texto
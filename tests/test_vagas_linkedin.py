@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+from src.vagas_linkedin import ClienteHTTP, buscar_ids, extrair_vaga, link_vaga, raspar_vagas
+
+LISTAGEM = """
+<li><div class="base-card relative" data-entity-urn="urn:li:jobPosting:4334089683"></div></li>
+<li><div class="base-card relative" data-entity-urn="urn:li:jobPosting:4318640470"></div></li>
+<li><div class="base-card relative" data-entity-urn="urn:li:jobPosting:404"></div></li>
+<li><div class="base-card relative" data-entity-urn="urn:li:jobPosting:4334089683"></div></li>
+"""
+
+VAGA = """
+<section class="top-card-layout">
+  <h2 class="top-card-layout__title font-sans text-lg papabear:text-xl font-bold leading-open text-color-text mb-0 topcard__title">
+    CAS | Engenharia de Dados SR</h2>
+  <a class="topcard__org-name-link topcard__flavor--black-link" href="#">  Sicredi </a>
+  <span class="posted-time-ago__text topcard__flavor--metadata">3 days ago</span>
+  <span class="num-applicants__caption topcard__flavor--metadata topcard__flavor--bullet">38 <b>applicants</b></span>
+  <code id="applyUrl"><icon data-svg-class-name="apply-button__offsite-apply-icon-svg"></icon></code>
+</section>
+<ul class="description__job-criteria-list">
+  <li><span class="description__job-criteria-text description__job-criteria-text--criteria">Mid-Senior level</span></li>
+  <li><span class="description__job-criteria-text description__job-criteria-text--criteria">Full-time<br></span></li>
+</ul>
+"""
+
+
+@pytest.fixture
+def linkedin_local():
+    requisicoes, em_voo, pico, trava = [], [0], [0], threading.Lock()
+    falhas = {"/jobs-guest/jobs/api/jobPosting/4318640470": 1}  # um 503 antes de responder
+    cortes = {"/jobs-guest/jobs/api/jobPosting/4334089683": 1}  # uma resposta truncada (IncompleteRead)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            caminho = urlparse(self.path).path
+            with trava:
+                requisicoes.append(caminho)
+                em_voo[0] += 1; pico[0] = max(pico[0], em_voo[0])
+            try:
+                time.sleep(0.02)
+                if falhas.get(caminho):
+                    falhas[caminho] -= 1
+                    self.send_response(503); self.end_headers(); return
+                if caminho.endswith("/search"):
+                    corpo = LISTAGEM
+                elif caminho.startswith("/jobs-guest/jobs/api/jobPosting/") and not caminho.endswith("/404"):
+                    corpo = VAGA
+                else:
+                    self.send_response(404); self.end_headers(); return
+                dados = corpo.encode()
+                self.send_response(200)
+                if cortes.get(caminho):
+                    cortes[caminho] -= 1
+                    self.send_header("Content-Length", str(len(dados) + 100))
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    self.wfile.write(dados[:50])
+                    self.close_connection = True
+                    return
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+            finally:
+                with trava:
+                    em_voo[0] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_port}", requisicoes, pico
+    servidor.shutdown()
+
+
+def _cliente(concorrencia=2):
+    return ClienteHTTP(concorrencia=concorrencia, intervalo=0, tentativas=3, backoff=0.01)
+
+
+def test_extrai_campos_da_pagina_gravada():
+    vaga = extrair_vaga(VAGA, "4334089683")
+    assert vaga == {
+        "job_title": "CAS | Engenharia de Dados SR", "company_name": "Sicredi",
+        "experience_level": "Mid-Senior level", "type_of_contract": "Full-time", "easy_apply": False,
+        "time_posted": "3 days ago", "num_applicants": "38 applicants",
+        "job_link": "https://www.linkedin.com/jobs/view/4334089683/",
+    }
+
+
+def test_retry_descarta_404_e_limita_concorrencia(linkedin_local):
+    url, requisicoes, pico = linkedin_local
+
+    async def rodar():
+        cliente = _cliente(concorrencia=2)
+        ids = await buscar_ids(cliente, "engineer", "Brazil", 3, url)
+        return ids, await raspar_vagas(ids, cliente, base_url=url)
+
+    ids, vagas = asyncio.run(rodar())
+    assert ids == ["4334089683", "4318640470", "404"]
+    assert sorted(v["job_link"] for v in vagas) == sorted(link_vaga(i, url) for i in ids[:2])
+    assert requisicoes.count("/jobs-guest/jobs/api/jobPosting/4318640470") == 2
+    assert requisicoes.count("/jobs-guest/jobs/api/jobPosting/4334089683") == 2  # truncada, pedida de novo
+    assert requisicoes.count("/jobs-guest/jobs/api/jobPosting/404") == 1  # 404 não é retentado
+    assert pico[0] <= 2
+
+
+def test_vagas_ja_vistas_nao_sao_baixadas(linkedin_local):
+    url, requisicoes, _ = linkedin_local
+    vistos = {link_vaga("4334089683", url)}
+    vagas = asyncio.run(raspar_vagas(["4334089683", "4318640470"], _cliente(), vistos, url))
+    assert [v["job_link"] for v in vagas] == [link_vaga("4318640470", url)]
+    assert "/jobs-guest/jobs/api/jobPosting/4334089683" not in requisicoes
+
+
+def test_normaliza_tempo_e_candidatos():
+    pd = pytest.importorskip("pandas")
+    from src.vagas_linkedin import normalizar
+
+    df = pd.DataFrame({"time_posted": ["3 days ago", "2 weeks ago", "5 hours ago", None],
+                       "num_applicants": ["38 applicants", "Over 200 applicants", None, "Be among the first 25 applicants"],
+                       "easy_apply": [True, False, True, None]})
+    saida = normalizar(df, coletado_em="2025-12-03 12:00")
+    assert saida["horas_desde_postagem"].tolist()[:3] == [72.0, 336.0, 5.0]
+    assert saida["horas_desde_postagem"].isna().tolist()[3]
+    assert saida["data_postagem"].iloc[0] == pd.Timestamp("2025-11-30 12:00")
+    assert saida["candidatos"].tolist()[:2] == [38, 200] and saida["candidatos"].iloc[3] == 25
+    assert saida["candidatos_minimo"].tolist() == [False, True, False, True]
+
+
+def test_execucao_incremental_anexa_parquet(linkedin_local, tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    from src.vagas_linkedin import carregar_estado, executar
+
+    url, requisicoes, _ = linkedin_local
+    opcoes = {"concorrencia": 2, "intervalo": 0, "tentativas": 3, "backoff": 0.01}
+    primeira = asyncio.run(executar("engineer", "Brazil", 1, str(tmp_path), base_url=url, **opcoes))
+    antes = len(requisicoes)
+    segunda = asyncio.run(executar("engineer", "Brazil", 1, str(tmp_path), base_url=url, **opcoes))
+
+    assert primeira["novas"] == 2 and segunda["novas"] == 0 and segunda["arquivo"] is None
+    assert segunda["ausentes"] == 1
+    assert len(requisicoes) - antes == 1  # só a listagem: a vaga 404 ficou no estado como ausente
+    assert carregar_estado(str(tmp_path / "_estado.json"))[1] == {link_vaga("404", url)}
+    df = pd.read_parquet(primeira["arquivo"])
+    assert df["candidatos"].dtype == "Int64" and df["horas_desde_postagem"].tolist() == [72.0, 72.0]
@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("matplotlib")
+
+from src.visualizacao import (MAX_FLIERS, estatisticas_boxplot, indices_lttb, indices_minmax, plot_boxplot,
+                              plot_histograma, plot_series, renderizar_graficos)
+
+
+def test_lttb_mantem_extremos_e_tamanho():
+    x = np.arange(10_000, dtype="float64")
+    y = np.sin(x / 300)
+    y[4321] = 50.0  # pico isolado
+
+    sel = indices_lttb(x, y, 500)
+
+    assert len(sel) == 500 and sel[0] == 0 and sel[-1] == 9_999
+    assert np.all(np.diff(sel) > 0)
+    assert 4321 in sel
+
+
+def test_minmax_preserva_picos():
+    y = np.zeros(10_000)
+    y[[17, 5000]] = [-9.0, 9.0]
+
+    sel = indices_minmax(y, 100)
+
+    assert len(sel) <= 100 and {17, 5000} <= set(sel.tolist())
+
+
+def test_boxplot_igual_ao_numpy_e_limita_fliers():
+    rng = np.random.default_rng(0)
+    v = np.concatenate([rng.normal(0, 1, 100_000), rng.normal(0, 50, 5_000), [np.nan, np.inf]])
+
+    s = estatisticas_boxplot(v, "val")
+
+    finitos = v[np.isfinite(v)]
+    assert (s["q1"], s["med"], s["q3"]) == tuple(np.percentile(finitos, [25, 50, 75]))
+    assert len(s["fliers"]) == MAX_FLIERS and s["n_outliers"] > MAX_FLIERS
+    assert s["whislo"] >= s["q1"] - 1.5 * (s["q3"] - s["q1"])
+
+
+def test_graficos_headless_gravam_png_sem_figuras_abertas(tmp_path):
+    import matplotlib.pyplot as plt
+
+    df = pd.DataFrame({"val1": np.random.default_rng(1).normal(100, 15, 50_000), "val2": np.arange(50_000.0)})
+    abertas = len(plt.get_fignums())
+
+    plot_histograma(df, "val1", salvar_em=str(tmp_path / "h.png"), headless=True)
+    plot_series(df, "val1", salvar_em=str(tmp_path / "s.png"), max_pontos=1_000, headless=True)
+    plot_boxplot(df, ["val1", "val2"], salvar_em=str(tmp_path / "b.png"), headless=True)
+
+    assert len(plt.get_fignums()) == abertas
+    for nome in ("h.png", "s.png", "b.png"):
+        assert (tmp_path / nome).read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+
+def test_renderiza_em_processos_a_partir_de_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    caminho = str(tmp_path / "dados.parquet")
+    pd.DataFrame({"val1": np.arange(1_000.0), "val2": np.arange(1_000.0) % 7}).to_parquet(caminho)
+    tarefas = [{"grafico": "histograma", "fonte": caminho, "coluna": "val1", "salvar_em": str(tmp_path / "h.png")},
+               {"grafico": "boxplot", "fonte": caminho, "colunas": ["val1", "val2"], "salvar_em": str(tmp_path / "b.png")}]
+
+    assert renderizar_graficos(tarefas, processos=2) == [t["salvar_em"] for t in tarefas]
+    assert all((tmp_path / n).stat().st_size > 0 for n in ("h.png", "b.png"))
+    with pytest.raises(ValueError):
+        renderizar_graficos([{"grafico": "histograma", "fonte": caminho, "coluna": "val1"}])